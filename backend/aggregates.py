@@ -0,0 +1,263 @@
+"""
+Catalog Aggregates
+Summary statistics maintained incrementally as campsites are added and
+removed, so monitoring endpoints read them in O(1) instead of scanning
+
+Prices live in a Fenwick tree over whole-dollar buckets, so adding or
+removing a row and reading any percentile cost O(log buckets) rather
+than the O(n) shifting of a sorted list.
+"""
+import math
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+# Buckets start at $0-$1023 and double as higher prices arrive; anything
+# past the last bucket shares it, still ordered exactly within the bucket
+INITIAL_PRICE_BUCKETS = 1 << 10
+MAX_PRICE_BUCKETS = 1 << 20
+
+
+@dataclass(frozen=True)
+class CatalogSummary:
+    """Point-in-time copy of the aggregates, safe to read without locks"""
+    count: int
+    min_price: float
+    max_price: float
+    average_price: float
+    percentiles: Dict[str, float]
+    state_counts: Dict[str, int]
+
+    @property
+    def states(self) -> List[str]:
+        """Sorted distinct state names"""
+        return list(self.state_counts)
+
+
+class PriceMultiset:
+    """
+    Sorted multiset of prices with O(log buckets) updates and rank lookups
+
+    A Fenwick tree counts prices per whole-dollar bucket; each bucket keeps
+    its exact prices with their multiplicities. Finding the k-th price walks
+    the tree to its bucket and then orders that bucket's distinct prices,
+    of which there are at most a hundred at cent precision.
+    """
+
+    def __init__(self, prices: Iterable[float] = ()):
+        self._size = 0
+        self._buckets: Dict[int, Dict[float, int]] = {}
+        counts = [0] * INITIAL_PRICE_BUCKETS
+        for price in prices:
+            bucket = self._bucket(price)
+            while bucket >= len(counts):
+                counts.extend([0] * len(counts))
+            counts[bucket] += 1
+            values = self._buckets.setdefault(bucket, {})
+            values[price] = values.get(price, 0) + 1
+            self._size += 1
+        self._tree = self._build(counts)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _bucket(price: float) -> int:
+        """Bucket of a price; negative prices share bucket 0"""
+        return min(max(int(price), 0), MAX_PRICE_BUCKETS - 1)
+
+    @staticmethod
+    def _build(counts: List[int]) -> List[int]:
+        """Fenwick tree (1-based) over per-bucket counts, built in O(buckets)"""
+        tree = [0] + counts
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        return tree
+
+    def _grow(self, bucket: int) -> None:
+        """Double the bucket range until it covers `bucket`"""
+        capacity = len(self._tree) - 1
+        if bucket < capacity:
+            return
+        while bucket >= capacity:
+            capacity *= 2
+        counts = [0] * capacity
+        for index, values in self._buckets.items():
+            counts[index] = sum(values.values())
+        self._tree = self._build(counts)
+
+    def _update(self, bucket: int, delta: int) -> None:
+        index = bucket + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def add(self, price: float) -> None:
+        """Insert one occurrence of a price"""
+        bucket = self._bucket(price)
+        self._grow(bucket)
+        self._update(bucket, 1)
+        values = self._buckets.setdefault(bucket, {})
+        values[price] = values.get(price, 0) + 1
+        self._size += 1
+
+    def remove(self, price: float) -> None:
+        """
+        Remove one occurrence of a price
+
+        Raises:
+            KeyError: if the price is not in the multiset
+        """
+        bucket = self._bucket(price)
+        values = self._buckets[bucket]
+        count = values.pop(price)
+        if count > 1:
+            values[price] = count - 1
+        elif not values:
+            del self._buckets[bucket]
+        self._update(bucket, -1)
+        self._size -= 1
+
+    def kth(self, rank: int) -> float:
+        """
+        Price at a 1-based rank in ascending order
+
+        Raises:
+            IndexError: if the rank is outside 1..len(self)
+        """
+        if not 1 <= rank <= self._size:
+            raise IndexError("rank out of range")
+        # Descend the tree to the bucket holding the rank-th price
+        position, remaining = 0, rank
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] < remaining:
+                position = following
+                remaining -= self._tree[following]
+            step >>= 1
+        for price, count in sorted(self._buckets[position].items()):
+            if remaining <= count:
+                return price
+            remaining -= count
+        raise AssertionError("bucket counts out of sync with the tree")
+
+
+class CatalogAggregates:
+    """
+    Counts, price extremes, running price sum, per-state counts and
+    percentiles over a changing set of campsite rows
+
+    Prices are kept in a PriceMultiset, so a write costs O(log buckets)
+    and min, max and any percentile are rank lookups. State names are kept
+    sorted alongside their counts; only a state's first row or last removal
+    touches that list, which is O(states).
+    """
+
+    def __init__(self):
+        self._prices = PriceMultiset()
+        self._price_sum = 0.0
+        self._state_counts: Dict[str, int] = {}
+        self._states: List[str] = []
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "CatalogAggregates":
+        """Aggregate an existing collection of rows in O(n + buckets)"""
+        aggregates = cls()
+        prices = []
+        for row in rows:
+            prices.append(row["price_per_night"])
+            aggregates._count_state(row["state"])
+        aggregates._prices = PriceMultiset(prices)
+        aggregates._price_sum = sum(prices)
+        return aggregates
+
+    def _count_state(self, state: str) -> None:
+        count = self._state_counts.get(state, 0)
+        if not count:
+            insort(self._states, state)
+        self._state_counts[state] = count + 1
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Account for a new row"""
+        price = row["price_per_night"]
+        self._prices.add(price)
+        self._price_sum += price
+        self._count_state(row["state"])
+
+    def remove(self, row: Dict[str, Any]) -> None:
+        """Stop accounting for a row previously added"""
+        price = row["price_per_night"]
+        self._prices.remove(price)
+        # Reset when empty so rounding error cannot outlive the rows
+        self._price_sum = self._price_sum - price if self._prices else 0.0
+        state = row["state"]
+        count = self._state_counts[state] - 1
+        if count:
+            self._state_counts[state] = count
+        else:
+            del self._state_counts[state]
+            del self._states[bisect_left(self._states, state)]
+
+    @property
+    def count(self) -> int:
+        """Number of rows"""
+        return len(self._prices)
+
+    @property
+    def min_price(self) -> float:
+        """Lowest price, 0.0 when empty"""
+        return self._prices.kth(1) if self._prices else 0.0
+
+    @property
+    def max_price(self) -> float:
+        """Highest price, 0.0 when empty"""
+        return self._prices.kth(len(self._prices)) if self._prices else 0.0
+
+    @property
+    def average_price(self) -> float:
+        """Mean price, 0.0 when empty"""
+        return self._price_sum / len(self._prices) if self._prices else 0.0
+
+    def states(self) -> List[str]:
+        """Sorted distinct state names"""
+        return list(self._states)
+
+    def state_counts(self) -> Dict[str, int]:
+        """Number of rows per state, in state name order"""
+        return {state: self._state_counts[state] for state in self._states}
+
+    def percentile(self, percent: float) -> float:
+        """
+        Nearest-rank price percentile
+
+        Args:
+            percent: Percentile in (0, 100]
+
+        Returns:
+            Smallest price with at least `percent`% of prices at or below it
+        """
+        if not 0 < percent <= 100:
+            raise ValueError("Percentile must be in (0, 100]")
+        if not self._prices:
+            return 0.0
+        rank = math.ceil(percent / 100 * len(self._prices))
+        return self._prices.kth(max(rank, 1))
+
+    def percentiles(self, percents: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Several percentiles keyed "p25", "p50", ..."""
+        return {f"p{percent:g}": self.percentile(percent) for percent in percents}
+
+    def summary(self) -> CatalogSummary:
+        """Snapshot of every aggregate; costs O(states), not O(rows)"""
+        return CatalogSummary(
+            count=self.count,
+            min_price=self.min_price,
+            max_price=self.max_price,
+            average_price=self.average_price,
+            percentiles=self.percentiles(),
+            state_counts=self.state_counts()
+        )
@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Run from the backend directory, e.g. `python -m benchmarks.serialization`
+"""
@@ -0,0 +1,51 @@
+"""
+Synthetic Catalog Generator
+Deterministic campsite rows shaped like data.CAMPSITES, at any size
+"""
+import random
+from typing import Any, Dict, List
+
+STATES = (
+    "Arizona", "California", "Colorado", "Idaho", "Maine", "Montana",
+    "Nevada", "New Mexico", "Oregon", "Texas", "Utah", "Washington"
+)
+WORDS = (
+    "pine", "river", "lake", "desert", "mountain", "canyon", "meadow", "forest",
+    "sunset", "ridge", "creek", "valley", "hiking", "fishing", "swimming",
+    "kayaking", "camping", "climbing", "trails", "views", "shaded", "quiet"
+)
+KINDS = ("Campground", "Retreat", "Oasis", "Camp", "Outpost", "Sites")
+# Rough continental United States extent (south, west, north, east)
+REGION = (25.0, -124.5, 49.0, -67.0)
+
+
+def generate_campsites(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate campsite rows with ids 1..count
+
+    Args:
+        count: Number of rows
+        seed: Random seed; the same seed always yields the same rows
+
+    Returns:
+        List of row dicts with every catalog field
+    """
+    rng = random.Random(seed)
+    rows = []
+    for campsite_id in range(1, count + 1):
+        name = " ".join(rng.sample(WORDS[:12], 2)).title()
+        rows.append({
+            "id": campsite_id,
+            "name": f"{name} {rng.choice(KINDS)}",
+            "description": " ".join(rng.choices(WORDS, k=10)).capitalize() + ".",
+            "location": rng.choice(WORDS[:12]).title() + " City",
+            "state": rng.choice(STATES),
+            "has_water": rng.random() < 0.7,
+            "has_electricity": rng.random() < 0.5,
+            "has_restrooms": rng.random() < 0.75,
+            "price_per_night": float(rng.randint(8, 80)),
+            "image_url": f"https://images.example.com/campsites/{campsite_id}.jpg",
+            "latitude": round(rng.uniform(REGION[0], REGION[2]), 5),
+            "longitude": round(rng.uniform(REGION[1], REGION[3]), 5)
+        })
+    return rows
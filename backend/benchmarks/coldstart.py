@@ -0,0 +1,105 @@
+"""
+Cold Start Benchmark
+Time and memory to bring a catalog online from a Python literal module
+(like data.py), from JSON, and from a compact catalog file, each in a
+fresh interpreter
+
+Each format is loaded into the repository that serves it, then asked for
+one campsite and one price-ordered page. Memory is the growth of the
+process's resident set over the load; for the catalog file that counts
+only the pages actually touched, since the file is mapped rather than
+read.
+
+Usage: python -m benchmarks.coldstart [--rows N] [--repeat R]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+from benchmarks.catalog import generate_campsites
+from snapshot import write_catalog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter: load one format, then report timings (in
+# seconds) and resident-set growth (in bytes) as JSON
+PROBE = """
+import json, sys, time
+from query import PageRequest, QueryPlan
+import repositories
+
+def resident():
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * 4096
+
+fmt, path, probe_id = sys.argv[1], sys.argv[2], int(sys.argv[3])
+before = resident()
+started = time.perf_counter()
+if fmt == "literal":
+    sys.path.insert(0, path)
+    from catalog_literal import CAMPSITES
+    repository = repositories.InMemoryCampsiteRepository(CAMPSITES)
+elif fmt == "json":
+    with open(path, encoding="utf-8") as handle:
+        repository = repositories.InMemoryCampsiteRepository(json.load(handle))
+else:
+    repository = repositories.CatalogFileRepository(path)
+repository.warm_up()
+loaded = time.perf_counter()
+repository.get_by_id(probe_id)
+repository.execute_page(QueryPlan(), PageRequest(limit=50, order_by="price"))
+served = time.perf_counter()
+print(json.dumps({
+    "load_s": loaded - started, "first_query_s": served - loaded, "resident_bytes": resident() - before
+}))
+"""
+FORMATS = ("literal", "json", "catalog")
+
+
+def write_formats(rows, directory: str) -> Dict[str, str]:
+    """Write the catalog in every format, returning the path each loads from"""
+    with open(os.path.join(directory, "catalog_literal.py"), "w", encoding="utf-8") as handle:
+        handle.write(f"CAMPSITES = {rows!r}\n")
+    json_path = os.path.join(directory, "catalog.json")
+    with open(json_path, "w", encoding="utf-8") as handle:
+        json.dump(rows, handle)
+    catalog_path = os.path.join(directory, "campsites.catalog")
+    write_catalog(catalog_path, rows)
+    return {"literal": directory, "json": json_path, "catalog": catalog_path}
+
+
+def probe(fmt: str, path: str, probe_id: int) -> Dict[str, float]:
+    """Load one format in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, fmt, path, str(probe_id)],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Catalog size")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per format (best is kept)")
+    args = parser.parse_args()
+
+    rows = generate_campsites(args.rows, 0)
+    directory = tempfile.mkdtemp(prefix="campsite-coldstart-")
+    paths = write_formats(rows, directory)
+    print(f"{'format':<8} {'file MB':>9} {'load ms':>10} {'first query ms':>15} {'resident MB':>12}")
+    for fmt in FORMATS:
+        # The first literal import also compiles the module; later ones use its bytecode
+        runs = [probe(fmt, paths[fmt], args.rows // 2) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["load_s"])
+        size = os.path.getsize(os.path.join(paths[fmt], "catalog_literal.py") if fmt == "literal" else paths[fmt])
+        print(
+            f"{fmt:<8} {size / 1e6:>9.1f} {best['load_s'] * 1000:>10.1f} "
+            f"{best['first_query_s'] * 1000:>15.2f} {best['resident_bytes'] / 1e6:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
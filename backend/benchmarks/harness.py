@@ -0,0 +1,201 @@
+"""
+Benchmark Harness
+Timing, latency percentiles, repository fixtures over synthetic catalogs
+and stored baselines shared by the benchmark scripts
+"""
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from repositories import (
+    CampsiteRepositoryInterface, CatalogFileRepository, DatabaseCampsiteRepository,
+    IndexedCampsiteRepository, InMemoryCampsiteRepository
+)
+from snapshot import write_catalog
+
+REPOSITORY_KINDS = ("memory", "indexed", "database", "catalog")
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Slowdown beyond which a comparison flags a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def best_of(repeat: int, run: Callable[[], Any]) -> float:
+    """Fastest of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sample"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Iterable[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """
+    Latency summary of per-operation timings in seconds
+
+    Args:
+        samples: One duration per operation
+        elapsed: Wall-clock time the operations took together, for
+            throughput when they overlapped (defaults to their sum)
+
+    Returns:
+        ops, ops_per_s and mean/p50/p95/p99/max latency in microseconds
+    """
+    ordered = sorted(samples)
+    total = sum(ordered)
+    elapsed = total if elapsed is None else elapsed
+    return {
+        "ops": len(ordered),
+        "ops_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_us": round(total / len(ordered) * 1e6, 2) if ordered else 0.0,
+        "p50_us": round(percentile(ordered, 0.50) * 1e6, 2),
+        "p95_us": round(percentile(ordered, 0.95) * 1e6, 2),
+        "p99_us": round(percentile(ordered, 0.99) * 1e6, 2),
+        "max_us": round(ordered[-1] * 1e6, 2) if ordered else 0.0,
+    }
+
+
+def measure(
+    run: Callable[[], Any],
+    iterations: int,
+    min_seconds: float = 0.0,
+    max_seconds: float = 10.0
+) -> Dict[str, float]:
+    """
+    Time a callable once per iteration after one untimed warm-up call
+
+    Keeps going past `iterations` until min_seconds have been spent, so
+    fast operations still get a stable sample, and stops early (after at
+    least three runs) once max_seconds have been spent on slow ones
+    """
+    run()
+    samples: List[float] = []
+    clock = time.perf_counter
+    started = clock()
+    while True:
+        spent = clock() - started
+        if len(samples) >= iterations and spent >= min_seconds:
+            break
+        if len(samples) >= 3 and spent >= max_seconds:
+            break
+        begin = clock()
+        run()
+        samples.append(clock() - begin)
+    return summarize(samples)
+
+
+def create_repository(
+    kind: str,
+    rows: List[Dict[str, Any]],
+    directory: Optional[str] = None
+) -> CampsiteRepositoryInterface:
+    """
+    Build a repository of the given kind holding `rows`
+
+    Args:
+        kind: "memory", "indexed", "database" or "catalog"
+        rows: Catalog rows, e.g. from benchmarks.catalog.generate_campsites
+        directory: Where the SQLite file of a database repository, or the
+            catalog file, goes (defaults to a fresh temporary directory)
+    """
+    if kind == "memory":
+        repository = InMemoryCampsiteRepository(rows)
+    elif kind == "indexed":
+        repository = IndexedCampsiteRepository(rows)
+    elif kind == "database":
+        directory = directory or tempfile.mkdtemp(prefix="campsite-bench-")
+        path = os.path.join(directory, f"campsites-{len(rows)}.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        repository = DatabaseCampsiteRepository(f"sqlite:///{path}", seed_data=rows)
+    elif kind == "catalog":
+        directory = directory or tempfile.mkdtemp(prefix="campsite-bench-")
+        path = os.path.join(directory, f"campsites-{len(rows)}.catalog")
+        write_catalog(path, rows)
+        repository = CatalogFileRepository(path)
+    else:
+        raise ValueError(f"Unknown repository kind: {kind}")
+    repository.warm_up()
+    return repository
+
+
+def environment() -> Dict[str, str]:
+    """Where a result was measured, stored alongside it"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_results(path: str, results: Dict[str, Dict[str, float]], settings: Dict[str, Any]) -> None:
+    """Write results as a baseline file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(
+            {"environment": environment(), "settings": settings, "results": results},
+            handle, indent=2, sort_keys=True
+        )
+        handle.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    """Read the results of a baseline file"""
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)["results"]
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    metric: str = "p50_us",
+    tolerance: float = DEFAULT_TOLERANCE
+) -> List[Tuple[str, float, float, float, bool]]:
+    """
+    Compare results with a baseline on one latency metric
+
+    Returns:
+        (case, baseline value, current value, current/baseline ratio,
+        regressed) for every case present in both, regressed meaning the
+        ratio exceeds 1 + tolerance
+    """
+    rows = []
+    for case in sorted(results):
+        if case not in baseline or not baseline[case].get(metric):
+            continue
+        before, after = baseline[case][metric], results[case][metric]
+        ratio = after / before
+        rows.append((case, before, after, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_comparison(rows: List[Tuple[str, float, float, float, bool]], metric: str) -> int:
+    """Print a comparison table and return the number of regressions"""
+    if not rows:
+        print("No cases in common with the baseline")
+        return 0
+    width = max(len(case) for case, *_ in rows)
+    print(f"{'case':<{width}} {'baseline ' + metric:>18} {'current':>12} {'ratio':>7}")
+    regressions = 0
+    for case, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        regressions += regressed
+        print(f"{case:<{width}} {before:>18.2f} {after:>12.2f} {ratio:>6.2f}x{flag}")
+    return regressions
@@ -0,0 +1,212 @@
+"""
+In-Process HTTP Load Driver
+Concurrent requests against the ASGI app over a synthetic catalog,
+reporting throughput and p50/p95/p99 latency per route and overall
+
+Requests go through httpx's ASGI transport, so the full FastAPI stack
+(routing, validation, caching, serialization) is exercised without
+sockets or a server process. Each worker draws its requests from a
+weighted mix of routes with randomized parameters. httpx is a
+development dependency: install it with
+`pip install -r requirements-dev.txt`.
+
+Usage:
+    python -m benchmarks.load [--rows 10000]
+        [--repositories memory,indexed,database,catalog]
+        [--concurrency 16] [--duration 10]
+        [--save benchmarks/baselines/load.json]
+        [--compare benchmarks/baselines/load.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from benchmarks.catalog import REGION, STATES, WORDS, generate_campsites
+from benchmarks.harness import (
+    BASELINE_DIR, DEFAULT_TOLERANCE, REPOSITORY_KINDS,
+    compare, create_repository, load_results, print_comparison, save_results, summarize
+)
+import main as api
+
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "load.json")
+# (route label, weight): roughly read-heavy browsing traffic
+ROUTE_MIX = (
+    ("list.state", 20),
+    ("list.price", 15),
+    ("search", 10),
+    ("near", 10),
+    ("get", 25),
+    ("recommendations", 10),
+    ("quotes", 5),
+    ("stats", 5),
+)
+# Request: (label, method, url, json body)
+Request = Tuple[str, str, str, Optional[Dict[str, Any]]]
+
+
+def make_request(label: str, rng: random.Random, size: int) -> Request:
+    """Build one request of the given route with random parameters"""
+    if label == "list.state":
+        state = rng.choice(STATES)
+        return label, "GET", f"/campsites?state={state}&has_water=true&limit=50&offset={rng.randint(0, 10) * 50}", None
+    if label == "list.price":
+        low = rng.randint(8, 70)
+        return label, "GET", f"/campsites?min_price={low}&max_price={low + 10}&order_by=price&limit=50", None
+    if label == "search":
+        return label, "GET", f"/campsites?search={rng.choice(WORDS)}&ranked=true&limit=20", None
+    if label == "near":
+        latitude, longitude = rng.uniform(REGION[0], REGION[2]), rng.uniform(REGION[1], REGION[3])
+        return label, "GET", f"/campsites?near={latitude:.3f},{longitude:.3f}&radius_km=150&limit=20", None
+    if label == "get":
+        return label, "GET", f"/campsites/{rng.randint(1, size)}", None
+    if label == "recommendations":
+        return label, "POST", "/campsites/recommendations?limit=10", {
+            "preferred_state": rng.choice(STATES),
+            "max_budget": rng.randint(15, 60),
+            "required_amenities": ["water"],
+            "preferred_activities": [rng.choice(("hiking", "fishing", "swimming"))],
+        }
+    if label == "quotes":
+        check_in = date.today() + timedelta(days=rng.randint(1, 60))
+        return label, "POST", "/campsites/quotes", {"items": [
+            {"campsite_id": rng.randint(1, size), "nights": rng.randint(1, 7), "check_in": check_in.isoformat()}
+            for _ in range(20)
+        ]}
+    if label == "stats":
+        return label, "GET", "/stats", None
+    raise ValueError(f"Unknown route: {label}")
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    size: int,
+    deadline: float,
+    remaining: List[int],
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int]
+) -> None:
+    """Send requests until the deadline passes or the request budget is spent"""
+    labels = [label for label, _ in ROUTE_MIX]
+    weights = [weight for _, weight in ROUTE_MIX]
+    clock = time.perf_counter
+    while clock() < deadline and remaining[0] > 0:
+        remaining[0] -= 1
+        label, method, url, body = make_request(rng.choices(labels, weights)[0], rng, size)
+        started = clock()
+        response = await client.request(method, url, json=body)
+        samples[label].append(clock() - started)
+        if response.status_code >= 400:
+            errors[label] += 1
+
+
+async def drive(
+    size: int,
+    concurrency: int,
+    duration: float,
+    requests: int,
+    seed: int
+) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    """
+    Run the workers against the app, whose registry must already be started
+
+    Returns:
+        Latency samples and error counts per route, and the wall-clock time
+    """
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = [requests]
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(client, random.Random(seed + index), size, deadline, remaining, samples, errors)
+            for index in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return samples, errors, elapsed
+
+
+def run(
+    size: int,
+    kind: str,
+    concurrency: int,
+    duration: float,
+    requests: int,
+    seed: int
+) -> Dict[str, Dict[str, float]]:
+    """
+    Load-test the app over one repository kind
+
+    Returns:
+        Summaries keyed "<kind>/<rows>/<route>", plus "<kind>/<rows>/all"
+    """
+    api.registry.startup(create_repository(kind, generate_campsites(size, seed)))
+    try:
+        samples, errors, elapsed = asyncio.run(drive(size, concurrency, duration, requests, seed))
+    finally:
+        api.registry.shutdown()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for label in sorted(samples):
+        results[f"{kind}/{size}/{label}"] = dict(summarize(samples[label], elapsed), errors=errors[label])
+    everything = [sample for route in samples.values() for sample in route]
+    results[f"{kind}/{size}/all"] = dict(summarize(everything, elapsed), errors=sum(errors.values()))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000, help="Catalog size")
+    parser.add_argument("--repositories", default=",".join(REPOSITORY_KINDS),
+                        help="Comma-separated repository kinds, each loaded in turn")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run for")
+    parser.add_argument("--requests", type=int, default=sys.maxsize, help="Stop after this many requests")
+    parser.add_argument("--seed", type=int, default=0, help="Catalog and request seed")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="Store the results as a baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="Compare with a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed p95 slowdown before a route counts as a regression")
+    args = parser.parse_args()
+
+    kinds = [kind for kind in args.repositories.split(",") if kind]
+    unknown = set(kinds) - set(REPOSITORY_KINDS)
+    if unknown:
+        parser.error(f"unknown repository kinds: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for kind in kinds:
+        results.update(run(args.rows, kind, args.concurrency, args.duration, args.requests, args.seed))
+    print(f"{'route':<36} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for key, summary in results.items():
+        print(
+            f"{key:<36} {summary['ops_per_s']:>9.1f} {summary['p50_us'] / 1000:>9.2f} "
+            f"{summary['p95_us'] / 1000:>9.2f} {summary['p99_us'] / 1000:>9.2f} {summary['errors']:>7}"
+        )
+
+    regressions = 0
+    if args.compare:
+        print()
+        regressions = print_comparison(
+            compare(results, load_results(args.compare), "p95_us", args.tolerance), "p95_us"
+        )
+    if args.save:
+        save_results(args.save, results, {
+            "rows": args.rows, "repositories": kinds,
+            "concurrency": args.concurrency, "duration": args.duration, "seed": args.seed
+        })
+        print(f"\nBaseline written to {args.save}")
+    if regressions or any(results[f"{kind}/{args.rows}/all"]["errors"] for kind in kinds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
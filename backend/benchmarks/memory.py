@@ -0,0 +1,103 @@
+"""
+Memory Benchmark
+Bytes held per campsite by each in-process representation of a catalog
+loaded from JSON: plain dict rows, interned dict rows, dataclasses with
+and without slots, the Campsite domain object (slotted, with interned
+strings) and the catalog file
+
+Each representation is built from freshly decoded rows, which are then
+dropped, so the figure is what the representation keeps alive: its own
+objects plus every string and number it still references. Rows decoded
+separately never share strings, which is what interning recovers.
+
+Usage: python -m benchmarks.memory [--rows N]
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.catalog import generate_campsites
+from models import Campsite, DomainMapper, compact_row
+from snapshot import write_catalog
+
+
+@dataclass
+class DictCampsite:
+    """Campsite as a plain dataclass, with a per-instance __dict__"""
+    id: int
+    name: str
+    description: str
+    location: str
+    state: str
+    has_water: bool
+    has_electricity: bool
+    has_restrooms: bool
+    price_per_night: float
+    image_url: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+@dataclass(slots=True)
+class FlagsCampsite:
+    """Campsite as a slotted dataclass whose strings are not interned"""
+    id: int
+    name: str
+    description: str
+    location: str
+    state: str
+    has_water: bool
+    has_electricity: bool
+    has_restrooms: bool
+    price_per_night: float
+    image_url: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+REPRESENTATIONS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "dict row": lambda row: row,
+    "dict row, interned": compact_row,
+    "dataclass": lambda row: DictCampsite(**row),
+    "slotted dataclass": lambda row: FlagsCampsite(**row),
+    "Campsite (interned)": DomainMapper.dict_to_campsite,
+}
+
+
+def retained_bytes(blob: bytes, build: Callable[[Dict[str, Any]], Any]) -> int:
+    """Bytes still allocated after decoding `blob` and converting every row"""
+    gc.collect()
+    tracemalloc.start()
+    rows = json.loads(blob)
+    kept: List[Any] = [build(row) for row in rows]
+    del rows
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Catalog size")
+    args = parser.parse_args()
+
+    rows = generate_campsites(args.rows, 0)
+    blob = json.dumps(rows).encode("utf-8")
+    print(f"{'representation':<22} {'bytes/campsite':>15}")
+    for name, build in REPRESENTATIONS.items():
+        print(f"{name:<22} {retained_bytes(blob, build) / args.rows:>15.0f}")
+
+    path = os.path.join(tempfile.mkdtemp(prefix="campsite-memory-"), "campsites.catalog")
+    write_catalog(path, rows)
+    # Mapped, not allocated: this is page cache shared by every process
+    print(f"{'catalog file (mapped)':<22} {os.path.getsize(path) / args.rows:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Service and Repository Microbenchmarks
+Per-call latency of the repository methods and the CampsiteService
+operations behind each endpoint, for every repository kind over synthetic
+catalogs of increasing size
+
+Every call draws fresh random arguments (ids, states, search words, price
+bands, points) from a fixed seed, so runs are reproducible and no call can
+be answered from a previous one's result.
+
+Usage:
+    python -m benchmarks.micro [--rows 1000,10000,100000]
+        [--repositories memory,indexed,database,catalog] [--cases filter,search]
+        [--save benchmarks/baselines/micro.json]
+        [--compare benchmarks/baselines/micro.json]
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+from benchmarks.catalog import REGION, STATES, WORDS, generate_campsites
+from benchmarks.harness import (
+    BASELINE_DIR, DEFAULT_TOLERANCE, REPOSITORY_KINDS,
+    compare, create_repository, load_results, measure, print_comparison, save_results
+)
+from models import CampsiteFilter, UserPreferencesDomain
+from query import Predicate, PageRequest, QueryPlan
+from repositories import CampsiteRepositoryInterface
+from services import CampsiteService
+
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "micro.json")
+Case = Callable[[], Any]
+
+
+def build_cases(
+    repository: CampsiteRepositoryInterface,
+    service: CampsiteService,
+    size: int,
+    rng: random.Random
+) -> List[Tuple[str, Case]]:
+    """
+    The benchmarked operations as (name, zero-argument callable)
+
+    Repository cases are named repo.<method>; service cases are named after
+    the CampsiteService method they call
+    """
+    def random_id() -> int:
+        return rng.randint(1, size)
+
+    def random_point() -> Tuple[float, float]:
+        return rng.uniform(REGION[0], REGION[2]), rng.uniform(REGION[1], REGION[3])
+
+    def random_band() -> Tuple[float, float]:
+        low = float(rng.randint(8, 70))
+        return low, low + 10
+
+    def preferences() -> UserPreferencesDomain:
+        return UserPreferencesDomain(
+            preferred_state=rng.choice(STATES),
+            max_budget=float(rng.randint(15, 60)),
+            required_amenities=["water"],
+            preferred_activities=[rng.choice(("hiking", "fishing", "swimming"))]
+        )
+
+    def stays() -> List[Tuple[int, int, date]]:
+        start = date.today() + timedelta(days=rng.randint(1, 60))
+        return [(random_id(), rng.randint(1, 7), start) for _ in range(50)]
+
+    return [
+        ("repo.get_by_id", lambda: repository.get_by_id(random_id())),
+        ("repo.get_many", lambda: repository.get_many([random_id() for _ in range(50)])),
+        ("repo.search", lambda: repository.search(rng.choice(WORDS))),
+        ("repo.execute", lambda: repository.execute(QueryPlan(predicates=[
+            Predicate("state", rng.choice(STATES).casefold()), Predicate("has_water", True)
+        ]))),
+        ("repo.execute_page", lambda: repository.execute_page(
+            QueryPlan(predicates=[Predicate("price", random_band())]),
+            PageRequest(limit=50, order_by="price")
+        )),
+        ("filter_campsites", lambda: service.filter_campsites(
+            CampsiteFilter(state=rng.choice(STATES), has_electricity=True)
+        )),
+        ("filter_campsites_page", lambda: service.filter_campsites_page(
+            CampsiteFilter(has_water=True, min_price=random_band()[0]),
+            PageRequest(limit=50, order_by="id")
+        )),
+        ("filter_campsites_page.name", lambda: service.filter_campsite_rows_page(
+            CampsiteFilter(has_water=True), PageRequest(limit=50, order_by="name")
+        )),
+        ("filter_campsites_page.near", lambda: service.filter_campsite_rows_page(
+            CampsiteFilter(near=random_point(), radius_km=100.0),
+            PageRequest(limit=20, order_by="distance", origin=random_point())
+        )),
+        ("search_campsites", lambda: service.search_campsites(rng.choice(WORDS))),
+        ("search_campsites.ranked", lambda: service.search_campsites(
+            f"{rng.choice(WORDS)} {rng.choice(WORDS)}", ranked=True
+        )),
+        ("get_recommended_campsites", lambda: service.get_recommended_campsites(preferences())),
+        ("get_recommended_campsites.top10", lambda: service.get_recommended_campsites(preferences(), top_k=10)),
+        ("get_price_statistics", service.get_price_statistics),
+        ("quote_trips", lambda: service.quote_trips(stays())),
+    ]
+
+
+def run(
+    sizes: List[int],
+    kinds: List[str],
+    only: List[str],
+    iterations: int,
+    max_seconds: float,
+    seed: int
+) -> Dict[str, Dict[str, float]]:
+    """
+    Run every selected case for every size and repository kind
+
+    Returns:
+        Latency summaries keyed "<kind>/<rows>/<case>"
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for size in sizes:
+        rows = generate_campsites(size, seed)
+        for kind in kinds:
+            repository = create_repository(kind, rows)
+            service = CampsiteService(repository)
+            try:
+                for name, case in build_cases(repository, service, size, random.Random(seed)):
+                    if only and not any(part in name for part in only):
+                        continue
+                    key = f"{kind}/{size}/{name}"
+                    results[key] = measure(case, iterations, max_seconds=max_seconds)
+                    summary = results[key]
+                    print(
+                        f"{key:<52} {summary['p50_us']:>12.1f} {summary['p95_us']:>12.1f} "
+                        f"{summary['p99_us']:>12.1f} {summary['ops']:>6}",
+                        flush=True
+                    )
+            finally:
+                repository.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="1000,10000,100000",
+                        help="Comma-separated catalog sizes (10^3 to 10^6)")
+    parser.add_argument("--repositories", default=",".join(REPOSITORY_KINDS),
+                        help="Comma-separated repository kinds")
+    parser.add_argument("--cases", default="", help="Only run cases whose name contains one of these")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per case")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Time budget per slow case")
+    parser.add_argument("--seed", type=int, default=0, help="Catalog and argument seed")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="Store the results as a baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="Compare with a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed p50 slowdown before a case counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.rows.split(",") if size]
+    kinds = [kind for kind in args.repositories.split(",") if kind]
+    unknown = set(kinds) - set(REPOSITORY_KINDS)
+    if unknown:
+        parser.error(f"unknown repository kinds: {', '.join(sorted(unknown))}")
+    only = [part for part in args.cases.split(",") if part]
+
+    print(f"{'case':<52} {'p50 us':>12} {'p95 us':>12} {'p99 us':>12} {'ops':>6}")
+    results = run(sizes, kinds, only, args.iterations, args.max_seconds, args.seed)
+
+    regressions = 0
+    if args.compare:
+        print()
+        regressions = print_comparison(
+            compare(results, load_results(args.compare), tolerance=args.tolerance), "p50_us"
+        )
+    if args.save:
+        save_results(args.save, results, {
+            "rows": sizes, "repositories": kinds, "iterations": args.iterations, "seed": args.seed
+        })
+        print(f"\nBaseline written to {args.save}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
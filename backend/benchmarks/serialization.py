@@ -0,0 +1,71 @@
+"""
+Serialization Benchmark
+Per-row cost of rendering a /campsites list body: the original path
+(dict copy -> Campsite -> CampsiteResponse -> CampsiteListResponse ->
+jsonable_encoder -> json) against serialization.py's trusted row
+fragments, cold and with every fragment cached
+
+Usage: python -m benchmarks.serialization [--rows N] [--repeat R]
+"""
+import argparse
+import json
+from typing import Any, Dict, List
+from fastapi.encoders import jsonable_encoder
+from benchmarks.catalog import generate_campsites
+from benchmarks.harness import best_of
+from models import DomainMapper
+from schemas import CampsiteListResponse, CampsiteResponse
+from serialization import FragmentCache, list_response_body
+
+
+def render_models(rows: List[Dict[str, Any]]) -> bytes:
+    """The /campsites rendering path before trusted fragments"""
+    campsites = [DomainMapper.dict_to_campsite(dict(row)) for row in rows]
+    response = CampsiteListResponse(
+        campsites=[CampsiteResponse(**DomainMapper.campsite_to_dict(campsite)) for campsite in campsites],
+        total_count=len(rows),
+        filtered_count=len(rows)
+    )
+    return json.dumps(
+        jsonable_encoder(response, exclude_none=True),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def render_fragments(rows: List[Dict[str, Any]], fragments: FragmentCache) -> bytes:
+    """The current /campsites rendering path"""
+    return list_response_body(
+        [fragments.fragment(row) for row in rows],
+        total_count=len(rows),
+        filtered_count=len(rows)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the best is reported")
+    args = parser.parse_args()
+
+    rows = generate_campsites(args.rows)
+    warm = FragmentCache(max_entries=args.rows)
+    if render_models(rows) != render_fragments(rows, warm):
+        raise SystemExit("Rendering paths disagree; benchmark aborted")
+
+    cases = [
+        ("models", lambda: render_models(rows)),
+        ("fragments (cold)", lambda: render_fragments(rows, FragmentCache(max_entries=args.rows))),
+        ("fragments (warm)", lambda: render_fragments(rows, warm)),
+    ]
+    baseline = None
+    print(f"{'path':<18} {'us/row':>8} {'speedup':>8}")
+    for name, run in cases:
+        per_row = best_of(args.repeat, run) / len(rows) * 1e6
+        baseline = baseline or per_row
+        print(f"{name:<18} {per_row:>8.2f} {baseline / per_row:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Integer Bitmaps
+Sets of small non-negative integers (row slots, campsite ids) stored as
+Python ints, so intersections and unions are single big-integer operations
+"""
+from typing import Iterable, List
+
+
+def bitmap_from_slots(slots: Iterable[int], size: int) -> int:
+    """Build an integer bitmap with one bit set per slot below `size`"""
+    buffer = bytearray((size + 7) // 8)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def slots_from_bitmap(bitmap: int) -> List[int]:
+    """Expand an integer bitmap into its set slot positions, ascending"""
+    bits = bin(bitmap)[:1:-1]
+    slots = []
+    position = bits.find("1")
+    while position != -1:
+        slots.append(position)
+        position = bits.find("1", position + 1)
+    return slots
@@ -0,0 +1,207 @@
+"""
+Bulk Import and Export
+Streams catalog rows in and out as NDJSON or CSV. Imports validate each
+record with CampsiteCreate in fixed-size batches and stream them into one
+all-or-nothing repository write; exports serialize rows a chunk at a time.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from anyio import from_thread
+from pydantic import ValidationError
+from query import CAMPSITE_FIELDS
+from repositories import CampsiteRepositoryInterface
+from schemas import CampsiteCreate
+
+FORMATS = ("ndjson", "csv")
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MEDIA_TYPES = {"ndjson": NDJSON_MEDIA_TYPE, "csv": "text/csv"}
+EXPORT_FIELDS = CAMPSITE_FIELDS
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_ERRORS = 100
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import"""
+    imported: int = 0
+    failed: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+
+class ChunkStream(io.RawIOBase):
+    """
+    Readable binary stream over an iterator of byte chunks
+    The next chunk is only pulled when the reader needs more bytes, so the
+    producer is throttled to the consumer's pace
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_text(chunks: Iterable[bytes]) -> io.TextIOBase:
+    """Decode streamed UTF-8 bytes as text, leaving newlines untranslated for csv"""
+    return io.TextIOWrapper(io.BufferedReader(ChunkStream(chunks)), encoding="utf-8", newline="")
+
+
+def read_records(text: Iterable[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Parse NDJSON or CSV text into raw records
+
+    Yields:
+        (line number, record); records that cannot be parsed are yielded as
+        the exception so the caller can report them and carry on
+    """
+    if fmt == "ndjson":
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+    elif fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _error_message(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        )
+    return str(exc)
+
+
+def validate_batches(
+    records: Iterable[Tuple[int, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]]:
+    """
+    Validate raw records through CampsiteCreate, a batch at a time
+
+    Yields:
+        (valid rows, [(line number, error)]) for every batch of records
+    """
+    rows: List[Dict[str, Any]] = []
+    errors: List[Tuple[int, str]] = []
+    seen = 0
+    for line_number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("Record must be an object")
+            rows.append(CampsiteCreate(**record).dict())
+        except (ValidationError, ValueError, TypeError) as exc:
+            errors.append((line_number, _error_message(exc)))
+        seen += 1
+        if seen == batch_size:
+            yield rows, errors
+            rows, errors, seen = [], [], 0
+    if seen:
+        yield rows, errors
+
+
+def import_records(
+    repository: CampsiteRepositoryInterface,
+    records: Iterable[Tuple[int, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_errors: int = DEFAULT_MAX_ERRORS
+) -> ImportReport:
+    """
+    Validate records in batches and add the valid ones to a repository
+
+    Records are pulled one batch at a time, so a streamed source is read no
+    faster than it is validated. Valid batches go to the repository's
+    bulk_create_batches as they are produced, inside one write (a single
+    transaction or index rebuild), so the import is never held here whole.
+
+    Args:
+        repository: Repository to write to
+        records: (line number, raw record) pairs, e.g. from read_records
+        batch_size: Records validated per batch
+        max_errors: Error details kept in the report (all are counted)
+
+    Returns:
+        ImportReport with counts and the first max_errors errors
+    """
+    report = ImportReport()
+
+    def valid_batches() -> Iterator[List[Dict[str, Any]]]:
+        for rows, errors in validate_batches(records, batch_size):
+            report.failed += len(errors)
+            report.errors.extend(errors[:max_errors - len(report.errors)])
+            if rows:
+                yield rows
+
+    report.imported = repository.bulk_create_batches(valid_batches())
+    return report
+
+
+def export_chunks(
+    batches: Iterable[List[Dict[str, Any]]],
+    fmt: str,
+    fields: Sequence[str] = EXPORT_FIELDS
+) -> Iterator[str]:
+    """
+    Serialize batches of rows as NDJSON or CSV, one text chunk per batch
+
+    Args:
+        batches: Lists of row dicts
+        fmt: "ndjson" or "csv"
+        fields: Columns to write, in order
+    """
+    if fmt == "ndjson":
+        for batch in batches:
+            yield "".join(
+                json.dumps({name: row.get(name) for name in fields}) + "\n" for row in batch
+            )
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for batch in batches:
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def iterate_blocking(chunks: AsyncIterable[bytes]) -> Iterator[bytes]:
+    """
+    Consume an async byte stream from a worker thread started with
+    anyio.to_thread, pulling each chunk through the event loop on demand
+    """
+    iterator = chunks.__aiter__()
+    while True:
+        try:
+            yield from_thread.run(iterator.__anext__)
+        except StopAsyncIteration:
+            return
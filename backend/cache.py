@@ -0,0 +1,110 @@
+"""
+Response Cache
+Bounded LRU/TTL cache of rendered JSON responses for read endpoints
+Entries are tagged with the repository data version they were computed
+from, so any write makes them stale without explicit purging
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+from metrics import CACHE_LOOKUPS
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 60.0
+# Clients may store responses but must revalidate them with If-None-Match
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A rendered response body and its validator"""
+    body: bytes
+    etag: str
+    version: int
+    expires_at: float
+
+
+def make_etag(body: bytes) -> str:
+    """Strong entity tag derived from the response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against an entity tag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    client echoing W/"..." still revalidates
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_key(path: str, params: Iterable[Tuple[str, str]]) -> str:
+    """Normalize a route and its query parameters into a cache key"""
+    return path + "?" + "&".join(f"{name}={value}" for name, value in sorted(params))
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and data-version invalidation
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays fresh; bounds staleness for data
+                sources whose version cannot observe every change
+        """
+        if max_entries < 1:
+            raise ValueError("Response cache needs room for at least one entry")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, version: int) -> Optional[CachedResponse]:
+        """Fresh entry for a key at the given data version, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.version != version or entry.expires_at <= time.monotonic()):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        CACHE_LOOKUPS.inc("response", "miss" if entry is None else "hit")
+        return entry
+
+    def put(self, key: str, version: int, body: bytes) -> CachedResponse:
+        """Store a rendered body, evicting the least recently used entries"""
+        entry = CachedResponse(
+            body=body,
+            etag=make_etag(body),
+            version=version,
+            expires_at=time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
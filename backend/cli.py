@@ -0,0 +1,97 @@
+"""
+Catalog Command Line Interface
+Bulk import and export against a configured repository, e.g.
+
+    CAMPSITE_DATABASE_URL=sqlite:///campsites.db python cli.py import sites.ndjson
+    python cli.py export --format csv > campsites.csv
+    python cli.py catalog campsites.catalog
+"""
+import argparse
+import os
+import sys
+from bulk import DEFAULT_BATCH_SIZE, FORMATS, read_records
+from registry import REPOSITORY_TYPE_ENV
+from repositories import CampsiteRepositoryInterface, RepositoryFactory
+from services import CampsiteService
+from snapshot import write_catalog
+
+DEFAULT_CLI_REPOSITORY = "database"
+
+
+def _format_for(path: str, requested: str) -> str:
+    """Explicit --format, else the file extension, else NDJSON"""
+    if requested:
+        return requested
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return extension if extension in FORMATS else "ndjson"
+
+
+def run_import(service: CampsiteService, args: argparse.Namespace) -> int:
+    """Import a file (or '-' for stdin) and print a summary"""
+    fmt = _format_for(args.path, args.format)
+    if args.path == "-":
+        report = service.import_campsites(read_records(sys.stdin, fmt), args.batch_size)
+    else:
+        with open(args.path, newline="", encoding="utf-8") as source:
+            report = service.import_campsites(read_records(source, fmt), args.batch_size)
+    print(f"Imported {report.imported} campsites, rejected {report.failed}", file=sys.stderr)
+    for line, error in report.errors:
+        print(f"  line {line}: {error}", file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+def run_export(service: CampsiteService, args: argparse.Namespace) -> int:
+    """Write the catalog to a file (or stdout) chunk by chunk"""
+    fmt = _format_for(args.output or "", args.format)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as target:
+            target.writelines(service.export_campsites(fmt, args.batch_size))
+    else:
+        sys.stdout.writelines(service.export_campsites(fmt, args.batch_size))
+    return 0
+
+
+def run_catalog(repository: CampsiteRepositoryInterface, args: argparse.Namespace) -> int:
+    """Write the catalog as a compact catalog file for the "catalog" repository"""
+    rows = repository.get_all()
+    write_catalog(args.path, rows)
+    print(f"Wrote {len(rows)} campsites to {args.path}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import/export campsites")
+    parser.add_argument(
+        "--repository",
+        default=os.environ.get(REPOSITORY_TYPE_ENV, DEFAULT_CLI_REPOSITORY),
+        help="Repository type (default: CAMPSITE_REPOSITORY or 'database')"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Validate and add campsites from NDJSON or CSV")
+    import_parser.add_argument("path", help="Input file, or '-' for stdin")
+    import_parser.add_argument("--format", choices=FORMATS)
+
+    export_parser = commands.add_parser("export", help="Write every campsite as NDJSON or CSV")
+    export_parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    export_parser.add_argument("--format", choices=FORMATS)
+
+    catalog_parser = commands.add_parser("catalog", help="Write every campsite to a memory-mappable catalog file")
+    catalog_parser.add_argument("path", help="Catalog file to write (see CAMPSITE_CATALOG_PATH)")
+
+    args = parser.parse_args(argv)
+    repository = RepositoryFactory.create_campsite_repository(args.repository)
+    try:
+        service = CampsiteService(repository)
+        if args.command == "import":
+            return run_import(service, args)
+        if args.command == "catalog":
+            return run_catalog(repository, args)
+        return run_export(service, args)
+    finally:
+        repository.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+Columnar Catalog Snapshot
+Column-oriented copy of the catalog so filters and recommendation scoring
+run as batched NumPy operations instead of one Python object at a time
+NumPy is optional: without it repositories simply report no snapshot
+"""
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from facets import FacetRequest, Facets
+from models import AMENITY_BITS
+from query import ORDERINGS, TEXT_FIELDS, PageRequest, Predicate
+from spatial import EARTH_RADIUS_KM
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+AMENITY_FIELD_BITS = {f"has_{amenity}": bit for amenity, bit in AMENITY_BITS.items()}
+
+# Activities common enough to precompute description masks at build time
+KNOWN_ACTIVITIES = ("hiking", "fishing", "swimming", "kayaking", "camping", "climbing")
+
+# Sort key columns of each stored page ordering, major first, mirroring the
+# keys in query.ORDERINGS; a leading "-" sorts that column descending
+ORDERING_COLUMNS = {
+    "id": ("ids",),
+    "price": ("prices", "ids"),
+    "-price": ("-prices", "ids"),
+    "name": ("names", "ids"),
+    "state": ("states", "names", "ids"),
+}
+
+
+def numpy_available() -> bool:
+    """Whether the columnar snapshot can be built in this environment"""
+    return np is not None
+
+
+def ordering_permutation(order_by: str, columns: Dict[str, Any]) -> Any:
+    """
+    Every row position in a stored page ordering
+
+    Args:
+        order_by: A key of ORDERING_COLUMNS
+        columns: "ids", "prices", "names" and "states" arrays in catalog
+            order (strings as NumPy unicode arrays, which compare by code
+            point like Python strings)
+
+    Returns:
+        int64 positions, first row of the ordering first
+    """
+    keys = [
+        -columns[name[1:]] if name.startswith("-") else columns[name]
+        for name in ORDERING_COLUMNS[order_by]
+    ]
+    return np.lexsort(keys[::-1]).astype(np.int64)
+
+
+class ColumnarCatalog:
+    """
+    Immutable columnar snapshot of a list of campsite rows
+
+    Columns:
+        ids: int64
+        prices: float64 (the row values exactly, so budget comparisons and
+            ratios match the per-object scoring bit for bit)
+        amenities: uint8 bitfield (water=1, electricity=2, restrooms=4)
+        state_codes: int32 codes into the distinct state names
+        latitudes / longitudes: float64 degrees, NaN for unlocated rows
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], version: int = 0):
+        """
+        Build the columns
+
+        Args:
+            rows: Campsite rows in catalog order
+            version: Data version of the source the snapshot was taken from
+        """
+        if np is None:
+            raise RuntimeError("Columnar snapshots require the 'numpy' package")
+        self.version = version
+        self.rows = list(rows)
+        self.ids = np.fromiter((row["id"] for row in self.rows), dtype=np.int64, count=len(self.rows))
+        self.prices = np.fromiter(
+            (row["price_per_night"] for row in self.rows), dtype=np.float64, count=len(self.rows)
+        )
+        self.amenities = np.fromiter(
+            (sum(bit for field, bit in AMENITY_FIELD_BITS.items() if row[field]) for row in self.rows),
+            dtype=np.uint8,
+            count=len(self.rows)
+        )
+        self._state_lookup: Dict[str, int] = {}
+        self.state_codes = np.fromiter(
+            (self._state_lookup.setdefault(row["state"], len(self._state_lookup))
+             for row in self.rows),
+            dtype=np.int32,
+            count=len(self.rows)
+        )
+        self.latitudes = self._coordinate_column("latitude")
+        self.longitudes = self._coordinate_column("longitude")
+        self._lowered = {
+            name: [row[name].lower() for row in self.rows] for name in TEXT_FIELDS
+        }
+        self._activity_masks: Dict[str, Any] = {}
+        for activity in KNOWN_ACTIVITIES:
+            self.activity_mask(activity)
+        # Page orderings, sorted on first use and kept for the snapshot's life
+        self._orderings: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _coordinate_column(self, name: str) -> Any:
+        """One coordinate of every row, NaN unless the row has both"""
+        return np.fromiter(
+            (np.nan if row.get("latitude") is None or row.get("longitude") is None else row[name]
+             for row in self.rows),
+            dtype=np.float64,
+            count=len(self.rows)
+        )
+
+    def _contains(self, field: str, needle: str) -> Any:
+        """Boolean mask of rows whose lower-cased field contains needle"""
+        return np.fromiter(
+            (needle in value for value in self._lowered[field]), dtype=bool, count=len(self.rows)
+        )
+
+    def activity_mask(self, activity: str) -> Any:
+        """
+        Rows whose description mentions an activity
+
+        Only KNOWN_ACTIVITIES are cached; any other activity comes from a
+        request body and is scanned per call, so clients cannot grow the
+        snapshot with masks of arbitrary strings
+        """
+        key = activity.lower()
+        mask = self._activity_masks.get(key)
+        if mask is None:
+            mask = self._contains("description", key)
+            if key in KNOWN_ACTIVITIES:
+                self._activity_masks[key] = mask
+        return mask
+
+    def _state_mask(self, state: str, fold=str.casefold) -> Any:
+        """Rows whose state equals `state` after applying `fold` to both sides"""
+        wanted = fold(state)
+        codes = [code for name, code in self._state_lookup.items() if fold(name) == wanted]
+        return np.isin(self.state_codes, codes)
+
+    def distances(self, lat: float, lon: float) -> Any:
+        """Great-circle km from a point to every row (NaN for unlocated rows)"""
+        phi1 = np.radians(lat)
+        phi2 = np.radians(self.latitudes)
+        half_dphi = (phi2 - phi1) / 2
+        half_dlambda = np.radians(self.longitudes - lon) / 2
+        a = np.sin(half_dphi) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(half_dlambda) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def _spatial_mask(self, predicate: Predicate) -> Any:
+        """Rows satisfying a near or bbox predicate; unlocated rows never do"""
+        if predicate.field == "near":
+            lat, lon, radius_km = predicate.value
+            if radius_km is None:
+                return ~np.isnan(self.latitudes)
+            return self.distances(lat, lon) <= radius_km
+        box = predicate.value
+        mask = (self.latitudes >= box.south) & (self.latitudes <= box.north)
+        if box.wraps:
+            return mask & ((self.longitudes >= box.west) | (self.longitudes <= box.east))
+        return mask & (self.longitudes >= box.west) & (self.longitudes <= box.east)
+
+    def _predicate_mask(self, predicate: Predicate) -> Any:
+        if predicate.field == "state":
+            mask = self._state_mask(predicate.value)
+        elif predicate.field in AMENITY_FIELD_BITS:
+            has_amenity = (self.amenities & AMENITY_FIELD_BITS[predicate.field]) != 0
+            mask = has_amenity if predicate.value else ~has_amenity
+        elif predicate.field == "price":
+            min_price, max_price = predicate.value
+            mask = np.ones(len(self.rows), dtype=bool)
+            if min_price is not None:
+                mask &= self.prices >= min_price
+            if max_price is not None:
+                mask &= self.prices <= max_price
+        elif predicate.field == "text":
+            mask = np.zeros(len(self.rows), dtype=bool)
+            for name in TEXT_FIELDS:
+                mask |= self._contains(name, predicate.value)
+        elif predicate.field == "ids":
+            mask = np.isin(self.ids, np.fromiter(predicate.value, dtype=np.int64, count=len(predicate.value)))
+        elif predicate.field in ("near", "bbox"):
+            mask = self._spatial_mask(predicate)
+        else:
+            mask = np.fromiter(
+                (predicate.matches(row) for row in self.rows), dtype=bool, count=len(self.rows)
+            )
+            return mask
+        return ~mask if predicate.negate else mask
+
+    def mask(self, predicates: Sequence[Predicate]) -> Any:
+        """Boolean mask of the rows satisfying every predicate"""
+        mask = np.ones(len(self.rows), dtype=bool)
+        for predicate in predicates:
+            mask &= self._predicate_mask(predicate)
+        return mask
+
+    def filter(self, predicates: Sequence[Predicate]) -> List[Dict[str, Any]]:
+        """Rows satisfying every predicate, in catalog order"""
+        rows = self.rows
+        return [rows[position] for position in np.flatnonzero(self.mask(predicates))]
+
+    def ordering(self, order_by: str) -> Optional[Any]:
+        """Every row position in a stored page ordering, or None for other orderings"""
+        if order_by not in ORDERING_COLUMNS:
+            return None
+        ordering = self._orderings.get(order_by)
+        if ordering is None:
+            states = np.array(list(self._state_lookup), dtype=str)
+            ordering = ordering_permutation(order_by, {
+                "ids": self.ids,
+                "prices": self.prices,
+                "names": np.array([row["name"] for row in self.rows], dtype=str),
+                "states": states[self.state_codes] if len(states) else np.array([], dtype=str),
+            })
+            self._orderings[order_by] = ordering
+        return ordering
+
+    def ordered_window(self, mask: Any, page: PageRequest) -> Tuple[Any, int, Optional[Tuple]]:
+        """
+        Positions of one page in a stored ordering, without sorting
+
+        The cursor is found by binary search over the permutation (decoding
+        only the rows probed) and the permutation past it is cut to the
+        masked rows, so a sorted page costs one vectorized pass instead of
+        sorting the whole match set
+
+        Returns:
+            (positions in page order, total matches, keyset of the next page)
+        """
+        ordering = self.ordering(page.order_by)
+        sort_key = ORDERINGS[page.order_by]
+        rows = self.rows
+        if page.after is not None:
+            start = bisect_right(ordering, page.after, key=lambda position: sort_key(rows[position]))
+            ordering = ordering[start:]
+        positions = ordering[mask[ordering]]
+        stop = None if page.limit is None else page.offset + page.limit
+        next_after = None
+        if stop is not None and len(positions) > stop:
+            next_after = sort_key(rows[positions[stop - 1]])
+        return positions[page.offset:stop], int(np.count_nonzero(mask)), next_after
+
+    def facets(self, mask: Any, request: FacetRequest) -> Facets:
+        """Facet counts of the masked rows, one bincount or popcount per facet"""
+        edges = request.price_edges
+        facets = Facets(total=int(np.count_nonzero(mask)), price_edges=edges)
+        if request.wants("state"):
+            counts = np.bincount(self.state_codes[mask], minlength=len(self._state_lookup))
+            facets.states = {
+                name: int(counts[code]) for name, code in self._state_lookup.items() if counts[code]
+            }
+        if request.wants("amenities"):
+            amenities = self.amenities[mask]
+            facets.amenities = {
+                field: int(np.count_nonzero(amenities & bit)) for field, bit in AMENITY_FIELD_BITS.items()
+            }
+        if request.wants("price"):
+            buckets = np.searchsorted(np.asarray(edges, dtype=np.float64), self.prices[mask], side="right")
+            facets.price_buckets = np.bincount(buckets, minlength=len(edges) + 1).tolist()
+        return facets
+
+    def score(
+        self,
+        preferred_state: Optional[str],
+        max_budget: Optional[float],
+        required_amenities: Sequence[str],
+        preferred_activities: Sequence[str],
+        top_k: Optional[int] = None
+    ) -> List[Tuple[Dict[str, Any], float, List[str]]]:
+        """
+        Batched recommendation scoring
+
+        Applies the same rules, bonuses and criteria wording as
+        CampsiteService._score_campsite, but as whole-column operations.
+        Criteria strings are only built for the rows that are returned.
+
+        Returns:
+            (row, score, matching_criteria) for rows scoring above zero,
+            best first; ties keep catalog order, or id order with top_k
+        """
+        size = len(self.rows)
+        scores = np.zeros(size, dtype=np.float64)
+
+        state_match = None
+        if preferred_state:
+            state_match = self._state_mask(preferred_state, str.lower)
+            scores += np.where(state_match, 3.0, 0.0)
+
+        within_budget = great_value = None
+        if max_budget:
+            within_budget = self.prices <= max_budget
+            great_value = within_budget & (self.prices / max_budget < 0.7)
+            scores += np.where(within_budget, 2.0, 0.0) + np.where(great_value, 1.0, 0.0)
+
+        all_amenities = matched_amenities = None
+        if required_amenities:
+            matched_amenities = np.zeros(size, dtype=np.int64)
+            for amenity in required_amenities:
+                bit = AMENITY_BITS.get(amenity, 0)
+                if bit:
+                    matched_amenities += (self.amenities & bit) != 0
+            all_amenities = matched_amenities == len(required_amenities)
+            scores += np.where(
+                all_amenities, len(required_amenities) * 1.5, matched_amenities * 0.5
+            )
+
+        activity_masks = [
+            (activity, self.activity_mask(activity)) for activity in preferred_activities
+        ]
+        for _, mask in activity_masks:
+            scores += np.where(mask, 0.5, 0.0)
+
+        positive = np.flatnonzero(scores > 0)
+        if top_k is None:
+            order = positive[np.argsort(-scores[positive], kind="stable")]
+        else:
+            order = positive[np.lexsort((self.ids[positive], -scores[positive]))][:top_k]
+
+        results = []
+        for position in order:
+            criteria = []
+            if state_match is not None and state_match[position]:
+                criteria.append("Preferred state match")
+            if within_budget is not None and within_budget[position]:
+                criteria.append("Within budget")
+                if great_value[position]:
+                    criteria.append("Great value")
+            if all_amenities is not None:
+                if all_amenities[position]:
+                    criteria.append(f"All {len(required_amenities)} required amenities")
+                elif matched_amenities[position] > 0:
+                    criteria.append(f"{int(matched_amenities[position])} of {len(required_amenities)} amenities")
+            for activity, mask in activity_masks:
+                if mask[position]:
+                    criteria.append(f"Offers {activity}")
+            results.append((self.rows[position], float(scores[position]), criteria))
+        return results
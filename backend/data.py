@@ -10,7 +10,9 @@ CAMPSITES = [
         "has_electricity": True,
         "has_restrooms": True,
         "price_per_night": 25.00,
-        "image_url": "https://images.unsplash.com/photo-1504280390367-361c6d9f38f4?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80"
+        "image_url": "https://images.unsplash.com/photo-1504280390367-361c6d9f38f4?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
+        "latitude": 37.3861,
+        "longitude": -122.0839
     },
     {
         "id": 2,
@@ -22,7 +24,9 @@ CAMPSITES = [
         "has_electricity": False,
         "has_restrooms": True,
         "price_per_night": 20.00,
-        "image_url": "https://images.unsplash.com/photo-1537905569824-f89f14cceb68?ixlib=rb-1.2.1&auto=format&fit=crop&w=1347&q=80"
+        "image_url": "https://images.unsplash.com/photo-1537905569824-f89f14cceb68?ixlib=rb-1.2.1&auto=format&fit=crop&w=1347&q=80",
+        "latitude": 42.9446,
+        "longitude": -122.109
     },
     {
         "id": 3,
@@ -34,7 +38,9 @@ CAMPSITES = [
         "has_electricity": True,
         "has_restrooms": False,
         "price_per_night": 15.00,
-        "image_url": "https://images.unsplash.com/photo-1566405901254-27b6e518c6b6?ixlib=rb-1.2.1&auto=format&fit=crop&w=1349&q=80"
+        "image_url": "https://images.unsplash.com/photo-1566405901254-27b6e518c6b6?ixlib=rb-1.2.1&auto=format&fit=crop&w=1349&q=80",
+        "latitude": 34.8697,
+        "longitude": -111.761
     },
     {
         "id": 4,
@@ -46,7 +52,9 @@ CAMPSITES = [
         "has_electricity": False,
         "has_restrooms": True,
         "price_per_night": 18.00,
-        "image_url": "https://images.unsplash.com/photo-1510312305653-8ed496efae75?ixlib=rb-1.2.1&auto=format&fit=crop&w=1267&q=80"
+        "image_url": "https://images.unsplash.com/photo-1510312305653-8ed496efae75?ixlib=rb-1.2.1&auto=format&fit=crop&w=1267&q=80",
+        "latitude": 39.1178,
+        "longitude": -106.4454
     },
     {
         "id": 5,
@@ -58,6 +66,8 @@ CAMPSITES = [
         "has_electricity": True,
         "has_restrooms": True,
         "price_per_night": 30.00,
-        "image_url": "https://images.unsplash.com/photo-1536431311719-398b6704d4cc?ixlib=rb-1.2.1&auto=format&fit=crop&w=1267&q=80"
+        "image_url": "https://images.unsplash.com/photo-1536431311719-398b6704d4cc?ixlib=rb-1.2.1&auto=format&fit=crop&w=1267&q=80",
+        "latitude": 47.7511,
+        "longitude": -120.7401
     }
 ]
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Database Connectivity
+Pluggable SQL drivers and a bounded connection pool used by the
+database-backed repository
+"""
+import json
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+
+class DatabaseDriver(ABC):
+    """Abstract SQL driver: connection creation and dialect details"""
+
+    placeholder = "?"
+    # Primary key the database fills in itself when an insert omits it
+    id_column = "INTEGER PRIMARY KEY"
+    # Exceptions raised when a write violates a key or constraint
+    integrity_errors: Tuple[type, ...] = (sqlite3.IntegrityError,)
+
+    @abstractmethod
+    def connect(self) -> Any:
+        """Open a new DB-API connection"""
+        pass
+
+    def prepare(self, sql: str) -> str:
+        """Rewrite a statement written with '?' placeholders for this dialect"""
+        return sql if self.placeholder == "?" else sql.replace("?", self.placeholder)
+
+    def execute(self, connection: Any, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Execute a prepared statement and return its cursor"""
+        return connection.execute(sql, params)
+
+    def execute_many(self, connection: Any, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        """Execute a prepared statement once per parameter row, batched by the driver"""
+        connection.cursor().executemany(sql, rows)
+
+    def membership_sql(self, column: str, values: Iterable[int]) -> Tuple[str, List[Any]]:
+        """
+        WHERE fragment testing whether an integer column is one of `values`
+
+        The whole set is bound as one JSON array parameter, so the statement
+        text (and the prepared statement) stays the same whatever its size
+        """
+        return f"{column} IN (SELECT value FROM json_each(?))", [json.dumps(sorted(values))]
+
+    def sync_ids(self, connection: Any, table: str) -> None:
+        """
+        Make the next database-assigned id follow rows inserted with
+        explicit ids; SQLite always assigns max(id) + 1, so nothing to do
+        """
+        pass
+
+    def column_names(self, connection: Any, table: str) -> List[str]:
+        """Names of an existing table's columns"""
+        cursor = connection.execute(f"SELECT * FROM {table} LIMIT 0")
+        return [column[0] for column in cursor.description]
+
+
+class SQLiteDriver(DatabaseDriver):
+    """
+    SQLite driver for local files
+    Compiled statements are cached per connection, so reusing the same SQL
+    text on a pooled connection skips re-parsing
+    """
+
+    def __init__(self, path: str, cached_statements: int = 128):
+        self.path = path
+        self.cached_statements = cached_statements
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+
+class PostgresDriver(DatabaseDriver):
+    """PostgreSQL driver using psycopg 3 server-side prepared statements"""
+
+    placeholder = "%s"
+    id_column = "INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY"
+
+    def __init__(self, dsn: str):
+        try:
+            import psycopg
+        except ImportError as exc:
+            raise RuntimeError("PostgreSQL support requires the 'psycopg' package") from exc
+        self._psycopg = psycopg
+        self.dsn = dsn
+        self.integrity_errors = (psycopg.IntegrityError,)
+
+    def connect(self) -> Any:
+        return self._psycopg.connect(self.dsn)
+
+    def execute(self, connection: Any, sql: str, params: Sequence[Any] = ()) -> Any:
+        return connection.execute(sql, params, prepare=True)
+
+    def membership_sql(self, column: str, values: Iterable[int]) -> Tuple[str, List[Any]]:
+        return f"{column} = ANY(?)", [sorted(values)]
+
+    def sync_ids(self, connection: Any, table: str) -> None:
+        """Move the identity sequence past ids inserted explicitly"""
+        connection.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+        )
+
+
+def create_driver(database_url: str) -> DatabaseDriver:
+    """
+    Create a driver from a database URL
+
+    Args:
+        database_url: "sqlite:///path/to/file.db" or "postgresql://..."
+
+    Returns:
+        DatabaseDriver for the URL scheme
+    """
+    if database_url.startswith("sqlite:///"):
+        return SQLiteDriver(database_url[len("sqlite:///"):])
+    if database_url.startswith(("postgresql://", "postgres://")):
+        return PostgresDriver(database_url)
+    raise ValueError(f"Unsupported database URL: {database_url}")
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections
+    Connections are opened lazily up to max_size; callers block for up to
+    `timeout` seconds when every connection is checked out
+    """
+
+    def __init__(self, driver: DatabaseDriver, max_size: int = 5, timeout: float = 30.0):
+        if max_size < 1:
+            raise ValueError("Connection pool size must be at least 1")
+        self.driver = driver
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    def _acquire(self) -> Any:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection available within {self.timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.driver.connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: Any) -> None:
+        if self._closed:
+            connection.close()
+        else:
+            self._idle.put(connection)
+        self._slots.release()
+
+    def warm_up(self, count: int = 1) -> None:
+        """Open up to `count` connections ahead of the first request"""
+        connections = [self._acquire() for _ in range(min(count, self.max_size))]
+        for connection in connections:
+            self._release(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection, committing on success and rolling back on error"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        connection = self._acquire()
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self._release(connection)
+
+    def close(self) -> None:
+        """Close every idle connection; checked-out ones close on release"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
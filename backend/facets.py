@@ -0,0 +1,137 @@
+"""
+Faceted Counts
+Per-state, per-amenity and price-bucket counts of a query's matches, shown
+next to a list of campsites
+
+Repositories compute every requested facet together, over one match set:
+indexed catalogs intersect the match bitmap with their state, amenity and
+price bitmaps, columnar catalogs count masked columns, the database groups
+in a single statement, and anything else counts the matching rows in one
+pass. A full sidebar then costs about one query instead of one per count.
+"""
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+FACET_NAMES = ("state", "amenities", "price")
+# Amenity facets are counted per row field, under the filter's own names
+AMENITY_FACETS = ("has_water", "has_electricity", "has_restrooms")
+# Price bucket boundaries: buckets are [edge_i, edge_i+1), open at both ends
+DEFAULT_PRICE_EDGES = (20.0, 40.0, 60.0, 80.0)
+MAX_PRICE_EDGES = 20
+
+
+@dataclass(slots=True)
+class FacetRequest:
+    """Which facet counts to compute alongside a query"""
+    names: Tuple[str, ...] = FACET_NAMES
+    price_edges: Tuple[float, ...] = DEFAULT_PRICE_EDGES
+
+    def wants(self, name: str) -> bool:
+        """Whether a facet was requested"""
+        return name in self.names
+
+
+@dataclass(slots=True)
+class Facets:
+    """
+    Facet counts of a query's matches; facets that were not requested
+    stay None
+
+    Attributes:
+        total: Number of matching campsites
+        price_edges: Bucket boundaries; a price on an edge counts in the
+            bucket above it
+        states: Matches per state, states without matches left out
+        amenities: Matches offering each amenity, keyed by row field
+        price_buckets: Matches per price bucket, one more count than
+            there are price_edges (below the first edge first)
+    """
+    total: int
+    price_edges: Tuple[float, ...] = DEFAULT_PRICE_EDGES
+    states: Optional[Dict[str, int]] = None
+    amenities: Optional[Dict[str, int]] = None
+    price_buckets: Optional[List[int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API shape: requested facets only, open bucket ends omitted"""
+        body: Dict[str, Any] = {}
+        if self.states is not None:
+            body["states"] = dict(sorted(self.states.items()))
+        if self.amenities is not None:
+            body["amenities"] = self.amenities
+        if self.price_buckets is not None:
+            bounds = (None,) + self.price_edges + (None,)
+            body["price_buckets"] = [
+                {
+                    key: value for key, value in (
+                        ("min_price", bounds[index]), ("max_price", bounds[index + 1]), ("count", count)
+                    ) if value is not None
+                }
+                for index, count in enumerate(self.price_buckets)
+            ]
+        return body
+
+
+def count_facets(rows: Iterable[Dict[str, Any]], request: FacetRequest) -> Facets:
+    """Count the requested facets of matching rows in a single pass"""
+    want_states, want_amenities, want_price = (request.wants(name) for name in FACET_NAMES)
+    edges = request.price_edges
+    states: Dict[str, int] = {}
+    amenities = dict.fromkeys(AMENITY_FACETS, 0)
+    buckets = [0] * (len(edges) + 1)
+    total = 0
+    for row in rows:
+        total += 1
+        if want_states:
+            states[row["state"]] = states.get(row["state"], 0) + 1
+        if want_amenities:
+            for name in AMENITY_FACETS:
+                if row[name]:
+                    amenities[name] += 1
+        if want_price:
+            buckets[bisect_right(edges, row["price_per_night"])] += 1
+    return Facets(
+        total=total,
+        price_edges=edges,
+        states=states if want_states else None,
+        amenities=amenities if want_amenities else None,
+        price_buckets=buckets if want_price else None
+    )
+
+
+def parse_facets(text: str) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated facet list ("all" for every facet)
+
+    Raises:
+        ValueError: on an unknown facet name
+    """
+    names = tuple(dict.fromkeys(part.strip() for part in text.split(",") if part.strip()))
+    if names == ("all",):
+        return FACET_NAMES
+    unknown = [name for name in names if name not in FACET_NAMES]
+    if unknown or not names:
+        raise ValueError(f"facets must be 'all' or a list of {', '.join(FACET_NAMES)}")
+    return names
+
+
+def parse_price_edges(text: str) -> Tuple[float, ...]:
+    """
+    Parse comma-separated, strictly increasing price bucket edges
+
+    Raises:
+        ValueError: if the edges are not numbers, not increasing, or too many
+    """
+    try:
+        edges = tuple(float(part) for part in text.split(",") if part.strip())
+    except ValueError:
+        raise ValueError("price_buckets must be comma-separated numbers") from None
+    if not all(math.isfinite(edge) for edge in edges):
+        raise ValueError("price_buckets edges must be finite")
+    if not edges or len(edges) > MAX_PRICE_EDGES:
+        raise ValueError(f"price_buckets takes 1 to {MAX_PRICE_EDGES} edges")
+    if any(low >= high for low, high in zip(edges, edges[1:])):
+        raise ValueError("price_buckets edges must be strictly increasing")
+    return edges
@@ -0,0 +1,97 @@
+"""
+Concurrency Primitives
+Reader-writer lock guarding in-process indexes: reads share the lock and
+run concurrently, writes are exclusive and apply all index changes at once
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterator, Optional
+
+
+class ReadWriteLock:
+    """
+    Writer-preferring reader-writer lock
+
+    A waiting writer blocks new readers so writes are not starved. A thread
+    that already holds the lock (for reading or writing) may take a read
+    lock again, so nested reads never deadlock.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer: Optional[int] = None
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock shared for the duration of the block"""
+        depth = getattr(self._local, "depth", 0)
+        thread = threading.get_ident()
+        with self._condition:
+            if depth == 0 and self._writer != thread:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock exclusively for the duration of the block"""
+        thread = threading.get_ident()
+        with self._condition:
+            if self._writer == thread:
+                raise RuntimeError("Write lock is not reentrant")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = thread
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
+
+
+def reading(method):
+    """Run a method while holding its instance's `_lock` for reading"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def writing(method):
+    """Run a method while holding its instance's `_lock` for writing"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def serialized(method):
+    """
+    Run a method while holding its instance's `_write_lock`, a plain mutex
+    that orders writers without blocking readers
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
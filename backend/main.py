@@ -2,20 +2,54 @@
 FastAPI Application - Refactored to use Domain Models
 Complete file with all imports and initialization
 """
-from fastapi import FastAPI, HTTPException, Query, Path, Depends, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Path, Depends, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List
-from services import CampsiteService
-from repositories import RepositoryFactory
+from fastapi.responses import JSONResponse, StreamingResponse
+from anyio import to_thread
+from datetime import date
+from typing import Any, Optional, List, Tuple
+from bulk import (
+    DEFAULT_BATCH_SIZE, MEDIA_TYPES, NDJSON_MEDIA_TYPE,
+    export_chunks, iterate_blocking, open_text, read_records
+)
+from cache import CACHE_CONTROL, CachedResponse, cache_key, etag_matches
+from facets import DEFAULT_PRICE_EDGES, FacetRequest, parse_facets, parse_price_edges
+from metrics import METRICS, PROMETHEUS_CONTENT_TYPE, SERIALIZATION_DURATION, TimingMiddleware, span
+from services import AsyncCampsiteService, CampsiteService
+from registry import ServiceRegistry
 from models import (
-    CampsiteFilter, UserPreferencesDomain, DomainMapper
+    CampsiteFilter, Reservation, UserPreferencesDomain, DomainMapper, stay_length
+)
+from query import (
+    CAMPSITE_FIELDS, RELEVANCE_SORT, PageRequest, decode_cursor, encode_cursor, parse_bbox, parse_fields, parse_point
 )
+from pricing import PricingRule, Season
+from repositories import ReadOnlyRepositoryError
+from reservations import ReservationConflict
+from spatial import MAX_DISTANCE_KM
+from serialization import dumps, list_response_body, projection_fragment
 from schemas import (
     CampsiteResponse, CampsiteListResponse, UserPreferences, 
+    CampsiteCreate, CampsiteUpdate, ImportErrorDetail, ImportResponse,
+    ReservationCreate, ReservationResponse, AvailabilityResponse,
+    PricingRuleSchema, QuoteLine, QuoteRequest, QuoteResponse,
     RecommendationResponse, HealthResponse, StatsResponse,
     MessageResponse, ErrorResponse
 )
 
+# Application-scoped repository and service
+registry = ServiceRegistry()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the shared repository on startup and release it on shutdown"""
+    registry.startup()
+    app.state.registry = registry
+    yield
+    registry.shutdown()
+
 # Create FastAPI application
 app = FastAPI(
     title="🏕️ Campsite Reservation API",
@@ -23,6 +57,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
     responses={
         404: {"model": ErrorResponse, "description": "Resource not found"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
@@ -36,25 +71,89 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# Outermost, so request latency covers every other middleware
+app.add_middleware(TimingMiddleware)
 
 # Dependency injection for service layer
-def get_campsite_service() -> CampsiteService:
-    """Dependency injection for campsite service"""
-    repository = RepositoryFactory.create_campsite_repository("memory")
-    return CampsiteService(repository)
+def get_campsite_service() -> AsyncCampsiteService:
+    """Dependency injection for the shared async campsite service"""
+    return registry.get_async_service()
+
+def get_blocking_campsite_service() -> CampsiteService:
+    """Dependency for the shared synchronous service, used from worker threads"""
+    return registry.get_service()
+
+def read_only_error(exc: ReadOnlyRepositoryError) -> HTTPException:
+    """405 for a write against a read-only catalog deployment"""
+    return HTTPException(
+        status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+        detail=str(exc),
+        headers={"Allow": "GET, HEAD"}
+    )
+
+# Response caching for read endpoints
+def cached_response(request: Request, entry: CachedResponse) -> Response:
+    """Render a cache entry, answering a matching If-None-Match with 304"""
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def lookup_response(
+    request: Request, 
+    service: AsyncCampsiteService,
+    depends_on_bookings: bool = False
+) -> Tuple[str, int, Optional[Response]]:
+    """
+    Look up the cached response for a request
+    
+    Args:
+        depends_on_bookings: Whether the response also changes with
+            reservations (e.g. availability searches); other responses
+            stay cached while bookings are made
+    
+    Returns:
+        (cache key, data version, response or None); the version is read
+        before computing so a concurrent write invalidates the new entry
+    """
+    key = cache_key(request.url.path, request.query_params.multi_items())
+    version = service.data_version
+    if depends_on_bookings:
+        version += service.availability_version
+    entry = registry.response_cache.get(key, version)
+    return key, version, cached_response(request, entry) if entry else None
+
+def store_response(
+    request: Request, 
+    key: str, 
+    version: int, 
+    content: Any, 
+    exclude_none: bool = False
+) -> Response:
+    """Render content as JSON, cache it under the key and respond"""
+    with span("serialization", SERIALIZATION_DURATION, "json"):
+        body = dumps(jsonable_encoder(content, exclude_none=exclude_none))
+    return store_body(request, key, version, body)
+
+def store_body(request: Request, key: str, version: int, body: bytes) -> Response:
+    """Cache an already-rendered JSON body under the key and respond"""
+    return cached_response(request, registry.response_cache.put(key, version, body))
 
 @app.get("/", response_model=MessageResponse, tags=["General"])
-def read_root():
+async def read_root():
     """Welcome endpoint - confirms API is running"""
     return MessageResponse(message="Welcome to Campsite Reservation API")
 
 @app.get("/campsites", 
          response_model=CampsiteListResponse, 
+         response_model_exclude_none=True,
          tags=["Campsites"],
          summary="Get filtered campsites",
          description="Retrieve campsites with optional filtering by state, amenities, price range, and search query")
-def get_campsites(
+async def get_campsites(
+    request: Request,
     state: Optional[str] = Query(None, description="Filter by state (e.g., 'California')"),
     has_water: Optional[bool] = Query(None, description="Filter by water availability"),
     has_electricity: Optional[bool] = Query(None, description="Filter by electricity availability"),
@@ -62,15 +161,53 @@ def get_campsites(
     search: Optional[str] = Query(None, min_length=1, description="Search by name, description, or location"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price per night"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price per night"),
-    service: CampsiteService = Depends(get_campsite_service)
+    ranked: bool = Query(False, description="Order search results by relevance instead of catalog order"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of campsites to return"),
+    offset: int = Query(0, ge=0, description="Number of campsites to skip"),
+    near: Optional[str] = Query(None, description="Only located campsites, nearest first from 'latitude,longitude'"),
+    radius_km: Optional[float] = Query(None, gt=0, le=MAX_DISTANCE_KM, description="Maximum distance from `near` in kilometres"),
+    bbox: Optional[str] = Query(None, description="Bounding box 'min_lon,min_lat,max_lon,max_lat'"),
+    sort: Optional[str] = Query(None, pattern="^(price|-price|name|state|score)$", description="Result order: 'price', '-price' (highest first), 'name', 'state' or 'score' (search relevance)"),
+    order_by: Optional[str] = Query(None, pattern="^(id|price|-price|name|state|distance)$", description="Sort order for paging: 'id', 'price', '-price', 'name', 'state' or 'distance' (from `near`)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    check_in: Optional[date] = Query(None, description="Only campsites free from this night (requires check_out)"),
+    check_out: Optional[date] = Query(None, description="Departure date of the stay to check availability for"),
+    facets: Optional[str] = Query(None, description="Counts to add for the whole filtered set: 'all' or a list of 'state', 'amenities', 'price'"),
+    price_buckets: Optional[str] = Query(None, description="Comma-separated price bucket edges for the price facet (default 20,40,60,80)"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
 ):
     """
-    Demonstrates the two-DTO pattern:
-    1. API receives raw parameters
-    2. Converts to domain model (CampsiteFilter)
-    3. Service returns domain models (List[Campsite])
-    4. Converts back to API DTOs (CampsiteResponse)
+    API parameters are converted to a domain filter (CampsiteFilter), but
+    the matching rows are not: they were validated when written, so each
+    is rendered straight to JSON (reusing its cached fragment) instead of
+    passing through Campsite, CampsiteResponse and jsonable_encoder.
+    The body has the CampsiteListResponse shape.
+    
+    `near` restricts results to campsites with coordinates (within
+    `radius_km` when given) and orders them nearest first unless another
+    order_by or relevance ranking is requested.
+    
+    Clients sending `Accept: application/x-ndjson` instead get one JSON
+    object per line, serialized straight from repository rows as the
+    response streams; counts and the next cursor are sent as headers
+    
+    `check_in`/`check_out` keep only campsites with no booking on any
+    night of that stay, resolved from the reservation calendars
+    
+    `sort` picks the result order: stored orderings are read from the
+    repository's pre-sorted permutations (so a first page never sorts the
+    whole match set) and page with cursors like order_by; 'score' ranks
+    search results by relevance
+    
+    `facets` adds counts over every campsite matching the filter (not
+    just the page), computed by the repository in one call alongside it
     """
+    streaming = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    if not streaming:
+        key, version, cached = lookup_response(request, service, depends_on_bookings=check_in is not None)
+        if cached:
+            return cached
     try:
         # Validate price range at API level
         if min_price is not None and max_price is not None and min_price > max_price:
@@ -79,6 +216,24 @@ def get_campsites(
                 detail="min_price cannot be greater than max_price"
             )
         
+        origin = parse_point(near) if near else None
+        if radius_km is not None and origin is None:
+            raise ValueError("radius_km requires near")
+        if (check_in is None) != (check_out is None):
+            raise ValueError("check_in and check_out must be given together")
+        if check_in is not None:
+            stay_length(check_in, check_out)
+        if price_buckets is not None and facets is None:
+            raise ValueError("price_buckets requires facets")
+        facet_request = None
+        if facets is not None:
+            if streaming:
+                raise ValueError("facets are not available for NDJSON responses")
+            facet_request = FacetRequest(
+                names=parse_facets(facets),
+                price_edges=parse_price_edges(price_buckets) if price_buckets else DEFAULT_PRICE_EDGES
+            )
+        
         # Convert API parameters to domain filter model
         filter_criteria = DomainMapper.api_filter_to_domain(
             state=state,
@@ -87,36 +242,83 @@ def get_campsites(
             has_restrooms=has_restrooms,
             search=search,
             min_price=min_price,
-            max_price=max_price
+            max_price=max_price,
+            near=origin,
+            radius_km=radius_km,
+            bbox=parse_bbox(bbox) if bbox else None,
+            check_in=check_in,
+            check_out=check_out
         )
         
-        # Service layer works with domain models
-        campsite_domains = service.filter_campsites(filter_criteria)
-        total_count = service.get_campsite_count()
+        if sort is not None:
+            if order_by is not None or ranked:
+                raise ValueError("sort cannot be combined with order_by or ranked")
+            if sort == RELEVANCE_SORT:
+                if not search:
+                    raise ValueError("sort=score requires search")
+                ranked = True
+            else:
+                order_by = sort
+        
+        # Resolve paging: a cursor carries its own ordering, and paging
+        # without an explicit order defaults to id order so cursors work
+        after = None
+        if cursor:
+            cursor_order, after = decode_cursor(cursor)
+            if order_by is not None and order_by != cursor_order:
+                raise ValueError("cursor was issued for a different order_by")
+            order_by = cursor_order
+        elif order_by is None and origin is not None and not ranked:
+            order_by = "distance"
+        elif order_by is None and limit is not None and not ranked:
+            order_by = "id"
+        if order_by == "distance" and origin is None:
+            raise ValueError("order_by=distance requires near")
+        page_request = PageRequest(
+            limit=limit,
+            offset=offset,
+            order_by=order_by,
+            after=after,
+            fields=parse_fields(fields),
+            origin=origin
+        )
         
-        # Convert domain models back to API DTOs
-        campsite_responses = [
-            CampsiteResponse(
-                id=campsite.id,
-                name=campsite.name,
-                description=campsite.description,
-                location=campsite.location,
-                state=campsite.state,
-                has_water=campsite.has_water,
-                has_electricity=campsite.has_electricity,
-                has_restrooms=campsite.has_restrooms,
-                price_per_night=campsite.price_per_night,
-                image_url=campsite.image_url
+        if streaming:
+            stream = await service.stream_campsites_page(filter_criteria, page_request, ranked=ranked)
+            headers = {
+                "X-Total-Count": str(await service.get_campsite_count()),
+                "X-Filtered-Count": str(stream.total)
+            }
+            if stream.next_after:
+                headers["X-Next-Cursor"] = encode_cursor(order_by, stream.next_after)
+            return StreamingResponse(
+                export_chunks(stream.batches, "ndjson", page_request.fields or CAMPSITE_FIELDS),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers=headers
             )
-            for campsite in campsite_domains
-        ]
         
-        return CampsiteListResponse(
-            campsites=campsite_responses,
-            total_count=total_count,
-            filtered_count=len(campsite_responses)
-        )
+        page = await service.filter_campsite_rows_page(filter_criteria, page_request, ranked=ranked)
+        total_count = await service.get_campsite_count()
+        facet_counts = None
+        if facet_request is not None:
+            facet_counts = await service.get_facets(filter_criteria, facet_request)
         
+        with span("serialization", SERIALIZATION_DURATION, "fragments"):
+            if page_request.fields is not None:
+                fragments = [projection_fragment(row) for row in page.items]
+            else:
+                fragments = registry.fragments.fragments(page.items)
+            body = list_response_body(
+                fragments,
+                total_count=total_count,
+                filtered_count=page.total,
+                next_cursor=encode_cursor(order_by, page.next_after) if page.next_after else None,
+                facets=facet_counts.to_dict() if facet_counts is not None else None
+            )
+        return store_body(request, key, version, body)
+        
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -128,21 +330,91 @@ def get_campsites(
             detail=f"Error retrieving campsites: {str(e)}"
         )
 
+@app.get("/campsites/export", 
+         response_class=StreamingResponse,
+         tags=["Bulk"],
+         summary="Export the catalog",
+         description="Stream every campsite as NDJSON or CSV")
+async def export_campsites(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: 'ndjson' or 'csv'"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000, description="Rows serialized per chunk"),
+    service: CampsiteService = Depends(get_blocking_campsite_service)
+):
+    """
+    Rows are fetched and serialized one batch at a time (in a worker
+    thread), so the full export is never held in memory
+    """
+    return StreamingResponse(
+        service.export_campsites(format, batch_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=campsites.{format}"}
+    )
+
+@app.post("/campsites/import", 
+          response_model=ImportResponse, 
+          tags=["Bulk"],
+          summary="Import campsites",
+          description="Bulk-add campsites from an NDJSON or CSV request body")
+async def import_campsites(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Body format: 'ndjson' or 'csv'"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=100000, description="Records validated per batch"),
+    service: CampsiteService = Depends(get_blocking_campsite_service)
+):
+    """
+    The body is parsed and validated in a worker thread that pulls request
+    chunks only as fast as it validates them; valid rows are written batch
+    by batch inside one bulk write and invalid ones are reported by line
+    number
+    """
+    body = request.stream()
+    
+    def run_import():
+        text = open_text(iterate_blocking(body))
+        return service.import_campsites(read_records(text, format), batch_size)
+    
+    try:
+        report = await to_thread.run_sync(run_import)
+    except ReadOnlyRepositoryError as e:
+        raise read_only_error(e)
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Import body is not valid UTF-8: {e}"
+        )
+    except ValueError as e:
+        # Ids that repeat or already exist: nothing was imported
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error importing campsites: {str(e)}"
+        )
+    
+    return ImportResponse(
+        imported=report.imported,
+        failed=report.failed,
+        errors=[ImportErrorDetail(line=line, error=error) for line, error in report.errors]
+    )
+
 @app.get("/campsites/{campsite_id}", 
          response_model=CampsiteResponse, 
          tags=["Campsites"],
          summary="Get campsite by ID",
          description="Retrieve detailed information for a specific campsite")
-def get_campsite(
+async def get_campsite(
     campsite_id: int = Path(..., gt=0, description="Unique campsite identifier"),
-    service: CampsiteService = Depends(get_campsite_service)
+    service: AsyncCampsiteService = Depends(get_campsite_service)
 ):
     """
     Shows domain model usage for single entity retrieval
     """
     try:
         # Service returns domain model
-        campsite_domain = service.get_campsite_by_id(campsite_id)
+        campsite_domain = await service.get_campsite_by_id(campsite_id)
         
         if not campsite_domain:
             raise HTTPException(
@@ -161,7 +433,9 @@ def get_campsite(
             has_electricity=campsite_domain.has_electricity,
             has_restrooms=campsite_domain.has_restrooms,
             price_per_night=campsite_domain.price_per_night,
-            image_url=campsite_domain.image_url
+            image_url=campsite_domain.image_url,
+            latitude=campsite_domain.latitude,
+            longitude=campsite_domain.longitude
         )
     
     except HTTPException:
@@ -172,14 +446,107 @@ def get_campsite(
             detail=f"Error retrieving campsite: {str(e)}"
         )
 
+@app.post("/campsites", 
+          response_model=CampsiteResponse, 
+          status_code=status.HTTP_201_CREATED,
+          tags=["Campsites"],
+          summary="Create a campsite",
+          description="Add a new campsite to the catalog")
+async def create_campsite(
+    campsite: CampsiteCreate,
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Writes go through the repository, which updates its indexes and
+    aggregates atomically and bumps the data version (invalidating cached
+    responses)
+    """
+    try:
+        created = await service.create_campsite(campsite.dict())
+        return CampsiteResponse(**DomainMapper.campsite_to_dict(created))
+    except ReadOnlyRepositoryError as e:
+        raise read_only_error(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating campsite: {str(e)}"
+        )
+
+@app.patch("/campsites/{campsite_id}", 
+           response_model=CampsiteResponse, 
+           tags=["Campsites"],
+           summary="Update a campsite",
+           description="Change some fields of an existing campsite")
+async def update_campsite(
+    changes: CampsiteUpdate,
+    campsite_id: int = Path(..., gt=0, description="Unique campsite identifier"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Only the fields present in the request body are changed
+    """
+    try:
+        updated = await service.update_campsite(campsite_id, changes.dict(exclude_none=True))
+    except ReadOnlyRepositoryError as e:
+        raise read_only_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating campsite: {str(e)}"
+        )
+    
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campsite with ID {campsite_id} not found"
+        )
+    return CampsiteResponse(**DomainMapper.campsite_to_dict(updated))
+
+@app.delete("/campsites/{campsite_id}", 
+            status_code=status.HTTP_204_NO_CONTENT,
+            response_class=Response,
+            tags=["Campsites"],
+            summary="Delete a campsite",
+            description="Remove a campsite from the catalog")
+async def delete_campsite(
+    campsite_id: int = Path(..., gt=0, description="Unique campsite identifier"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Delete a campsite; answers 204 with no body
+    """
+    try:
+        deleted = await service.delete_campsite(campsite_id)
+    except ReadOnlyRepositoryError as e:
+        raise read_only_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting campsite: {str(e)}"
+        )
+    
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campsite with ID {campsite_id} not found"
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @app.post("/campsites/recommendations", 
           response_model=RecommendationResponse, 
           tags=["Recommendations"],
           summary="Get personalized recommendations",
           description="Get campsite recommendations based on user preferences")
-def get_recommendations(
+async def get_recommendations(
     preferences: UserPreferences,  # API DTO from client
-    service: CampsiteService = Depends(get_campsite_service)
+    top_k: Optional[int] = Query(None, ge=1, le=1000, description="Return only the best top_k recommendations"),
+    sort: str = Query(RELEVANCE_SORT, pattern="^(price|-price|name|state|score)$", description="Order of the recommendations: 'score' (best first), 'price', '-price', 'name' or 'state'"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
 ):
     """
     Complex example showing full DTO transformation:
@@ -187,6 +554,9 @@ def get_recommendations(
     2. Transform to domain model (UserPreferencesDomain)
     3. Service returns domain recommendations
     4. Transform back to API response
+    
+    top_k keeps the best scores whatever the sort; other sorts reorder
+    them through the repository's pre-sorted orderings
     """
     try:
         # Convert API DTO to domain model
@@ -198,7 +568,7 @@ def get_recommendations(
         )
         
         # Service works with domain models
-        recommendations = service.get_recommended_campsites(domain_preferences)
+        recommendations = await service.get_recommended_campsites(domain_preferences, top_k=top_k, sort=sort)
         
         # Convert domain recommendations to API format
         recommendation_dicts = []
@@ -224,15 +594,21 @@ def get_recommendations(
          tags=["Monitoring"],
          summary="Health check",
          description="Check API health and get system statistics")
-def health_check(service: CampsiteService = Depends(get_campsite_service)):
+async def health_check(
+    request: Request,
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
     """
     Health check endpoint for monitoring and system information
     """
+    key, version, cached = lookup_response(request, service)
+    if cached:
+        return cached
     try:
-        total_campsites = service.get_campsite_count()
-        price_stats = service.get_price_statistics()
+        total_campsites = await service.get_campsite_count()
+        price_stats = await service.get_price_statistics()
         
-        return HealthResponse(
+        response = HealthResponse(
             status="healthy",
             total_campsites=total_campsites,
             price_range={
@@ -240,24 +616,43 @@ def health_check(service: CampsiteService = Depends(get_campsite_service)):
                 "max_price": price_stats.max_price
             }
         )
+        return store_response(request, key, version, response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Health check failed: {str(e)}"
         )
 
+@app.get("/metrics", 
+         response_class=Response,
+         tags=["Monitoring"],
+         summary="Prometheus metrics",
+         description="Request latency per route, repository, cache and serialization metrics in the Prometheus text format")
+async def get_metrics():
+    """
+    Histograms are cumulative since process start; send an X-Server-Timing
+    request header to any endpoint for that request's own breakdown
+    """
+    return Response(content=METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/states", 
          response_model=List[str], 
          tags=["Reference Data"],
          summary="Get available states",
          description="Get list of all states that have campsites")
-def get_states(service: CampsiteService = Depends(get_campsite_service)):
+async def get_states(
+    request: Request,
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
     """
     Get list of all states with available campsites
     """
+    key, version, cached = lookup_response(request, service)
+    if cached:
+        return cached
     try:
-        states = service.get_available_states()
-        return states
+        states = await service.get_available_states()
+        return store_response(request, key, version, states)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -269,19 +664,26 @@ def get_states(service: CampsiteService = Depends(get_campsite_service)):
          tags=["Statistics"],
          summary="Get campsite statistics",
          description="Get comprehensive statistics about available campsites")
-def get_statistics(service: CampsiteService = Depends(get_campsite_service)):
+async def get_statistics(
+    request: Request,
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
     """
     Shows how domain models can provide calculated values
     """
+    key, version, cached = lookup_response(request, service)
+    if cached:
+        return cached
     try:
-        total_count = service.get_campsite_count()
-        states = service.get_available_states()
+        total_count = await service.get_campsite_count()
+        states = await service.get_available_states()
         
         # Get domain model with calculated statistics
-        price_stats = service.get_price_statistics()
+        price_stats = await service.get_price_statistics()
+        state_counts = await service.get_state_counts()
         
         # Convert domain statistics to API format
-        return StatsResponse(
+        response = StatsResponse(
             total_campsites=total_count,
             available_states=len(states),
             states=states,
@@ -289,8 +691,11 @@ def get_statistics(service: CampsiteService = Depends(get_campsite_service)):
                 "min_price": price_stats.min_price,
                 "max_price": price_stats.max_price,
                 "average_price": price_stats.average_price
-            }
+            },
+            price_percentiles=price_stats.percentiles,
+            campsites_per_state=state_counts
         )
+        return store_response(request, key, version, response)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -299,15 +704,15 @@ def get_statistics(service: CampsiteService = Depends(get_campsite_service)):
 
 # Additional endpoint showing domain model business logic
 @app.get("/campsites/{campsite_id}/calculate-cost", tags=["Campsites"])
-def calculate_trip_cost(
+async def calculate_trip_cost(
     campsite_id: int = Path(..., gt=0),
     nights: int = Query(..., gt=0, le=30),
-    service: CampsiteService = Depends(get_campsite_service)
+    service: AsyncCampsiteService = Depends(get_campsite_service)
 ):
     """
     New endpoint leveraging domain model methods
     """
-    total_cost = service.calculate_trip_cost(campsite_id, nights)
+    total_cost = await service.calculate_trip_cost(campsite_id, nights)
     
     if total_cost is None:
         raise HTTPException(
@@ -322,6 +727,216 @@ def calculate_trip_cost(
         "currency": "USD"
     }
 
+def pricing_rule(schema: Optional[PricingRuleSchema]) -> Optional[PricingRule]:
+    """
+    Convert an API pricing rule to the domain rule
+    
+    Raises:
+        ValueError: if a season names a date that does not exist
+    """
+    if schema is None:
+        return None
+    return PricingRule(
+        weekend_multiplier=schema.weekend_multiplier,
+        seasons=tuple(
+            Season(
+                start=tuple(int(part) for part in season.start.split("-")),
+                end=tuple(int(part) for part in season.end.split("-")),
+                multiplier=season.multiplier
+            )
+            for season in schema.seasons
+        )
+    )
+
+@app.post("/campsites/quotes", 
+          response_model=QuoteResponse, 
+          response_model_exclude_none=True,
+          tags=["Campsites"],
+          summary="Price many stays",
+          description="Quote the cost of many (campsite, nights) stays in one request, optionally with weekend and seasonal pricing")
+async def quote_trips(
+    request: QuoteRequest,
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Every campsite in the batch is fetched with one repository multi-get,
+    and the pricing rule is evaluated once per distinct stay rather than
+    once per campsite. Unknown campsites are reported with found=false
+    instead of failing the whole batch.
+    """
+    try:
+        quotes = await service.quote_trips(
+            [(item.campsite_id, item.nights, item.check_in) for item in request.items],
+            pricing_rule(request.pricing)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error pricing stays: {str(e)}"
+        )
+    
+    return QuoteResponse(
+        quotes=[
+            QuoteLine(
+                campsite_id=quote.campsite_id,
+                nights=quote.nights,
+                check_in=quote.check_in,
+                found=quote.found,
+                price_per_night=quote.price_per_night,
+                total_cost=quote.total_cost
+            )
+            for quote in quotes
+        ],
+        total_cost=sum(quote.total_cost for quote in quotes if quote.found),
+        currency="USD"
+    )
+
+@app.get("/campsites/{campsite_id}/availability", 
+         response_model=AvailabilityResponse, 
+         tags=["Reservations"],
+         summary="Get campsite availability",
+         description="List the booked nights of a campsite between two dates")
+async def get_availability(
+    campsite_id: int = Path(..., gt=0, description="Unique campsite identifier"),
+    start: date = Query(..., description="First night to report"),
+    end: date = Query(..., description="Night after the last one to report"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    The returned version can be sent as expected_version when booking, so
+    the booking fails rather than succeeding against a calendar the client
+    has not seen
+    """
+    if (end - start).days > 366:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Availability can be listed for at most 366 nights"
+        )
+    try:
+        availability = await service.get_availability(campsite_id, start, end)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if availability is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campsite with ID {campsite_id} not found"
+        )
+    return AvailabilityResponse(
+        campsite_id=availability.campsite_id,
+        start=availability.start,
+        end=availability.end,
+        available=availability.is_available,
+        booked_nights=availability.booked_nights,
+        version=availability.version
+    )
+
+def reservation_response(reservation: Reservation) -> ReservationResponse:
+    """Convert a Reservation domain model to its API DTO"""
+    return ReservationResponse(
+        id=reservation.id,
+        campsite_id=reservation.campsite_id,
+        check_in=reservation.check_in,
+        check_out=reservation.check_out,
+        nights=reservation.nights,
+        guest_name=reservation.guest_name,
+        total_cost=reservation.total_cost,
+        created_at=reservation.created_at
+    )
+
+@app.post("/reservations", 
+          response_model=ReservationResponse, 
+          status_code=status.HTTP_201_CREATED,
+          tags=["Reservations"],
+          summary="Book a campsite",
+          description="Reserve a campsite for a stay; fails with 409 if any night is already taken")
+async def create_reservation(
+    booking: ReservationCreate,
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Bookings are committed with optimistic concurrency against the site's
+    calendar version, so two overlapping stays can never both succeed
+    """
+    try:
+        reservation = await service.book_campsite(
+            booking.campsite_id,
+            booking.check_in,
+            booking.check_out,
+            booking.guest_name,
+            expected_version=booking.expected_version
+        )
+    except ReservationConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating reservation: {str(e)}"
+        )
+    
+    if reservation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campsite with ID {booking.campsite_id} not found"
+        )
+    return reservation_response(reservation)
+
+@app.get("/reservations/{reservation_id}", 
+         response_model=ReservationResponse, 
+         tags=["Reservations"],
+         summary="Get reservation by ID",
+         description="Retrieve a booked stay")
+async def get_reservation(
+    reservation_id: int = Path(..., gt=0, description="Unique reservation identifier"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Look up a single reservation
+    """
+    reservation = await service.get_reservation(reservation_id)
+    if reservation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Reservation with ID {reservation_id} not found"
+        )
+    return reservation_response(reservation)
+
+@app.delete("/reservations/{reservation_id}", 
+            status_code=status.HTTP_204_NO_CONTENT,
+            response_class=Response,
+            tags=["Reservations"],
+            summary="Cancel a reservation",
+            description="Cancel a booked stay, freeing its nights")
+async def cancel_reservation(
+    reservation_id: int = Path(..., gt=0, description="Unique reservation identifier"),
+    service: AsyncCampsiteService = Depends(get_campsite_service)
+):
+    """
+    Cancel a reservation; answers 204 with no body
+    """
+    if not await service.cancel_reservation(reservation_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Reservation with ID {reservation_id} not found"
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 # Custom exception handlers
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
@@ -334,9 +949,12 @@ async def value_error_handler(request, exc):
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
     """Handle 404 errors with custom response"""
-    return ErrorResponse(
-        detail="The requested resource was not found",
-        error_code="RESOURCE_NOT_FOUND"
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content=jsonable_encoder(ErrorResponse(
+            detail="The requested resource was not found",
+            error_code="RESOURCE_NOT_FOUND"
+        ))
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,418 @@
+"""
+Metrics
+Process-wide counters and latency histograms rendered in the Prometheus
+text format, plus per-request timings broken down by layer
+
+Every request gets a RequestTimings in a context variable, so the layers it
+passes through (repository, service, serialization) add their time to it
+without any of them being handed the request. Context variables follow
+work offloaded with anyio.to_thread, so repository calls in worker threads
+are attributed to the request that made them.
+"""
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Request header opting a single request into a Server-Timing response header
+SERVER_TIMING_REQUEST_HEADER = b"x-server-timing"
+# Set to 1 to send Server-Timing on every response
+SERVER_TIMING_ENV = "CAMPSITE_SERVER_TIMING"
+# Latency buckets in seconds, from 100us repository lookups to slow requests
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Layers reported in Server-Timing, with their metric names and descriptions
+PHASES = (
+    ("repository", "repo", "Repository"),
+    ("service", "service", "Service (includes repository)"),
+    ("serialization", "serialize", "Serialization"),
+)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with one value per combination of label values"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Add to the counter
+
+        Args:
+            labels: One value per label name, in order
+            amount: Non-negative increment
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current value for the given label values"""
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram of observed values (Prometheus semantics:
+    a value lands in every bucket whose upper bound is >= the value)
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        if list(buckets) != sorted(buckets):
+            raise ValueError("Histogram buckets must be sorted")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: [count per bucket (non-cumulative, +Inf last), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one value for the given label values"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[labels] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        """Number of observations for the given label values"""
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted(
+                (labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()
+            )
+        lines = []
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: T) -> T:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset every metric to zero (e.g. between benchmark runs)"""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+METRICS = MetricsRegistry()
+HTTP_REQUESTS = METRICS.counter(
+    "campsite_http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status")
+)
+HTTP_DURATION = METRICS.histogram(
+    "campsite_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")
+)
+SERVICE_DURATION = METRICS.histogram(
+    "campsite_service_call_duration_seconds", "Service operation latency", ("operation",)
+)
+REPOSITORY_CALLS = METRICS.counter(
+    "campsite_repository_calls_total", "Repository method calls", ("method",)
+)
+REPOSITORY_DURATION = METRICS.histogram(
+    "campsite_repository_call_duration_seconds", "Repository method latency", ("method",)
+)
+ROWS_SCANNED = METRICS.counter(
+    "campsite_repository_rows_scanned_total",
+    "Rows a repository examined (or fetched from the database) to answer calls", ("method",)
+)
+ROWS_RETURNED = METRICS.counter(
+    "campsite_repository_rows_returned_total", "Rows repository calls returned", ("method",)
+)
+CACHE_LOOKUPS = METRICS.counter(
+    "campsite_cache_lookups_total", "Response and fragment cache lookups", ("cache", "result")
+)
+SERIALIZATION_DURATION = METRICS.histogram(
+    "campsite_serialization_duration_seconds", "Time spent rendering response bodies", ("kind",)
+)
+
+
+class RequestTimings:
+    """Seconds one request spent in each layer"""
+
+    __slots__ = ("started", "phases", "active")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {phase: 0.0 for phase, _, _ in PHASES}
+        # Phases with a span open, so nested spans are not counted twice
+        self.active: set = set()
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        entries = [
+            f'{metric};dur={self.phases[phase] * 1000:.3f};desc="{description}"'
+            for phase, metric, description in PHASES
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+_scans: ContextVar[Optional[List[int]]] = ContextVar("repository_scans", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, if any"""
+    return _timings.get()
+
+
+@contextmanager
+def span(phase: str, histogram: Optional[Histogram] = None, *labels: str) -> Iterator[None]:
+    """
+    Time a block, adding it to the current request's phase total and
+    optionally observing it in a histogram
+
+    Only the outermost span of a phase counts towards the request, so a
+    service operation calling another is not counted twice
+    """
+    timings = _timings.get()
+    outermost = timings is not None and phase not in timings.active
+    if outermost:
+        timings.active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if outermost:
+            timings.active.discard(phase)
+            timings.phases[phase] += elapsed
+        if histogram is not None:
+            histogram.observe(elapsed, *labels)
+
+
+def timed_operation(function: Callable[..., T]) -> Callable[..., T]:
+    """Decorator timing a (sync or async) service method as the service phase"""
+    name = function.__name__
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            with span("service", SERVICE_DURATION, name):
+                return await function(*args, **kwargs)
+    else:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span("service", SERVICE_DURATION, name):
+                return function(*args, **kwargs)
+    return wrapper
+
+
+def record_scan(rows: int) -> None:
+    """
+    Report rows examined inside a repository call
+
+    Repositories call this where they scan or fetch rows; outside an
+    instrumented call it does nothing
+    """
+    tally = _scans.get()
+    if tally is not None:
+        tally.append(rows)
+
+
+def repository_call(
+    method: str,
+    function: Callable[..., T],
+    *args: Any,
+    rows: Optional[Callable[[T], int]] = None
+) -> T:
+    """
+    Call a repository method, timing it as the repository phase
+
+    Args:
+        method: Method name used as the metric label
+        function: Bound method to call with args
+        rows: Counts the rows in the result; when given, rows returned and
+            rows scanned are recorded. Calls that report no scan through
+            record_scan (e.g. lookups by id) are taken to have examined
+            only the rows they returned.
+    """
+    tally: List[int] = []
+    token = _scans.set(tally)
+    try:
+        with span("repository", REPOSITORY_DURATION, method):
+            result = function(*args)
+    finally:
+        _scans.reset(token)
+    REPOSITORY_CALLS.inc(method)
+    if rows is not None:
+        returned = rows(result)
+        ROWS_RETURNED.inc(method, amount=returned)
+        ROWS_SCANNED.inc(method, amount=sum(tally) if tally else returned)
+    return result
+
+
+def server_timing_enabled() -> bool:
+    """Whether Server-Timing is sent on every response"""
+    return os.environ.get(SERVER_TIMING_ENV, "").lower() in ("1", "true", "yes")
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware recording request counts and latency per route
+    template, and adding a Server-Timing header when asked to
+
+    Server-Timing is sent when the request carries an X-Server-Timing
+    header or the middleware is built with always=True. It is written with
+    the response headers, so a streamed body's own serialization time is
+    not included.
+    """
+
+    def __init__(self, app, always: Optional[bool] = None):
+        """
+        Initialize middleware
+
+        Args:
+            app: Wrapped ASGI application
+            always: Send Server-Timing on every response; defaults to the
+                CAMPSITE_SERVER_TIMING environment variable
+        """
+        self.app = app
+        self.always = server_timing_enabled() if always is None else always
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        wanted = self.always or any(
+            name == SERVER_TIMING_REQUEST_HEADER for name, _ in scope.get("headers", ())
+        )
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if wanted:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            elapsed = time.perf_counter() - timings.started
+            # FastAPI records the matched route in the scope; templates keep
+            # label cardinality bounded (/campsites/{campsite_id}, not ids)
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_DURATION.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
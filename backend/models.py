@@ -3,14 +3,70 @@ Domain Models - Business Logic DTOs
 These models are used internally between the API and Service layers
 They are independent of external API contracts
 """
-from dataclasses import dataclass
-from typing import List, Optional
-from datetime import datetime
+from dataclasses import dataclass, field
+from sys import intern
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime
+from spatial import BoundingBox, haversine_km
 
+# Longest stay that can be booked or searched for
+MAX_STAY_NIGHTS = 30
+# Amenity flags as bits of Campsite.amenities and the columnar amenity column
+AMENITY_BITS = {"water": 1, "electricity": 2, "restrooms": 4}
+# Row strings that many campsites share, interned when rows are stored
+INTERNED_FIELDS = ("state", "location")
 
-@dataclass
+
+def normalize_state(state: str) -> str:
+    """
+    Stored spelling of a state name: trimmed and title-cased
+
+    Every repository stores states this way, so grouping by the stored
+    string (facets, state counts) agrees with case-insensitive filtering
+    """
+    return state.strip().title()
+
+
+def compact_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a catalog row with its state normalized and its shared strings
+    (state, location) interned
+    """
+    compact = dict(row)
+    if type(compact.get("state")) is str:
+        compact["state"] = normalize_state(compact["state"])
+    for name in INTERNED_FIELDS:
+        value = compact.get(name)
+        if type(value) is str:
+            compact[name] = intern(value)
+    return compact
+
+
+def stay_length(check_in: date, check_out: date) -> int:
+    """
+    Number of nights from check_in to check_out
+    
+    Raises:
+        ValueError: if check_out is not after check_in or the stay is
+            longer than MAX_STAY_NIGHTS
+    """
+    nights = (check_out - check_in).days
+    if nights < 1:
+        raise ValueError("check_out must be after check_in")
+    if nights > MAX_STAY_NIGHTS:
+        raise ValueError(f"Stays are limited to {MAX_STAY_NIGHTS} nights")
+    return nights
+
+
+@dataclass(slots=True)
 class Campsite:
-    """Domain model representing a campsite in the business layer"""
+    """
+    Domain model representing a campsite in the business layer
+
+    Instances are built per request for every row a service looks at, so
+    they are kept small: slots only, and the state and location strings
+    interned so that campsites sharing them hold one string between them
+    """
     id: int
     name: str
     description: str
@@ -21,15 +77,42 @@ class Campsite:
     has_restrooms: bool
     price_per_night: float
     image_url: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    def __post_init__(self):
+        self.location = intern(self.location)
+        self.state = intern(self.state)
+
+    @property
+    def amenities(self) -> int:
+        """The amenity flags as an AMENITY_BITS bitfield"""
+        return (
+            (AMENITY_BITS["water"] if self.has_water else 0)
+            | (AMENITY_BITS["electricity"] if self.has_electricity else 0)
+            | (AMENITY_BITS["restrooms"] if self.has_restrooms else 0)
+        )
+    
+    @property
+    def is_located(self) -> bool:
+        """Whether the campsite has map coordinates"""
+        return self.latitude is not None and self.longitude is not None
+    
+    def distance_km(self, latitude: float, longitude: float) -> Optional[float]:
+        """Great-circle distance to a point, None when the campsite is not located"""
+        if not self.is_located:
+            return None
+        return haversine_km(latitude, longitude, self.latitude, self.longitude)
     
     def has_all_amenities(self, required_amenities: List[str]) -> bool:
-        """Check if campsite has all required amenities"""
-        amenity_map = {
-            'water': self.has_water,
-            'electricity': self.has_electricity,
-            'restrooms': self.has_restrooms
-        }
-        return all(amenity_map.get(amenity, False) for amenity in required_amenities)
+        """Check if campsite has all required amenities (unknown ones never match)"""
+        required = 0
+        for amenity in required_amenities:
+            bit = AMENITY_BITS.get(amenity)
+            if bit is None:
+                return False
+            required |= bit
+        return self.amenities & required == required
     
     def calculate_total_cost(self, nights: int) -> float:
         """Calculate total cost for multiple nights"""
@@ -40,7 +123,7 @@ class Campsite:
         return self.price_per_night <= max_budget
 
 
-@dataclass
+@dataclass(slots=True)
 class CampsiteFilter:
     """Domain model for filtering criteria used in business logic"""
     state: Optional[str] = None
@@ -50,9 +133,24 @@ class CampsiteFilter:
     min_price: Optional[float] = None
     max_price: Optional[float] = None
     search_query: Optional[str] = None
+    near: Optional[Tuple[float, float]] = None
+    radius_km: Optional[float] = None
+    bbox: Optional[BoundingBox] = None
+    check_in: Optional[date] = None
+    check_out: Optional[date] = None
+    
+    @property
+    def has_stay(self) -> bool:
+        """Whether results are restricted to sites free for a stay"""
+        return self.check_in is not None and self.check_out is not None
     
     def matches_campsite(self, campsite: Campsite) -> bool:
-        """Check if a campsite matches this filter"""
+        """
+        Check if a campsite matches this filter
+        
+        Availability for check_in/check_out depends on bookings, which the
+        campsite itself does not know about, so it is not checked here
+        """
         if self.state and campsite.state.lower() != self.state.lower():
             return False
         if self.has_water is not None and campsite.has_water != self.has_water:
@@ -65,10 +163,68 @@ class CampsiteFilter:
             return False
         if self.max_price and campsite.price_per_night > self.max_price:
             return False
+        if self.near is not None:
+            distance = campsite.distance_km(*self.near)
+            if distance is None or (self.radius_km is not None and distance > self.radius_km):
+                return False
+        if self.bbox is not None:
+            if not campsite.is_located or not self.bbox.contains(campsite.latitude, campsite.longitude):
+                return False
         return True
 
 
-@dataclass
+@dataclass(slots=True)
+class Reservation:
+    """Domain model for a booked stay at a campsite"""
+    id: int
+    campsite_id: int
+    check_in: date
+    check_out: date
+    guest_name: str
+    total_cost: float
+    created_at: datetime
+    
+    @property
+    def nights(self) -> int:
+        """Number of nights booked"""
+        return (self.check_out - self.check_in).days
+    
+    def overlaps(self, check_in: date, check_out: date) -> bool:
+        """Check if the stay shares a night with [check_in, check_out)"""
+        return self.check_in < check_out and self.check_out > check_in
+
+
+@dataclass(slots=True)
+class Availability:
+    """Domain model for a campsite's booked nights over a date range"""
+    campsite_id: int
+    start: date
+    end: date
+    booked_nights: List[date]
+    version: int
+    
+    @property
+    def is_available(self) -> bool:
+        """Whether every night in the range is free"""
+        return not self.booked_nights
+
+
+@dataclass(slots=True)
+class TripQuote:
+    """Domain model for the price of a stay at one campsite"""
+    campsite_id: int
+    nights: int
+    check_in: Optional[date] = None
+    price_per_night: Optional[float] = None
+    total_cost: Optional[float] = None
+    
+    @property
+    def found(self) -> bool:
+        """Whether the campsite exists (and so the quote has a price)"""
+        return self.total_cost is not None
+
+
+@dataclass(slots=True)
 class UserPreferencesDomain:
     """Domain model for user preferences used in recommendation logic"""
     preferred_state: Optional[str] = None
@@ -83,7 +239,7 @@ class UserPreferencesDomain:
             self.preferred_activities = []
 
 
-@dataclass
+@dataclass(slots=True)
 class CampsiteRecommendation:
     """Domain model for campsite recommendations with scoring"""
     campsite: Campsite
@@ -95,12 +251,13 @@ class CampsiteRecommendation:
         return self.score < other.score
 
 
-@dataclass
+@dataclass(slots=True)
 class PriceStatistics:
     """Domain model for price statistics"""
     min_price: float
     max_price: float
     average_price: float
+    percentiles: Dict[str, float] = field(default_factory=dict)
     
     @classmethod
     def from_campsites(cls, campsites: List[Campsite]) -> 'PriceStatistics':
@@ -133,7 +290,22 @@ class DomainMapper:
             has_electricity=data['has_electricity'],
             has_restrooms=data['has_restrooms'],
             price_per_night=data['price_per_night'],
-            image_url=data['image_url']
+            image_url=data['image_url'],
+            latitude=data.get('latitude'),
+            longitude=data.get('longitude')
+        )
+    
+    @staticmethod
+    def dict_to_reservation(data: dict) -> Reservation:
+        """Convert dictionary to Reservation domain model"""
+        return Reservation(
+            id=data['id'],
+            campsite_id=data['campsite_id'],
+            check_in=data['check_in'],
+            check_out=data['check_out'],
+            guest_name=data['guest_name'],
+            total_cost=data['total_cost'],
+            created_at=data['created_at']
         )
     
     @staticmethod
@@ -149,7 +321,9 @@ class DomainMapper:
             'has_electricity': campsite.has_electricity,
             'has_restrooms': campsite.has_restrooms,
             'price_per_night': campsite.price_per_night,
-            'image_url': campsite.image_url
+            'image_url': campsite.image_url,
+            'latitude': campsite.latitude,
+            'longitude': campsite.longitude
         }
     
     @staticmethod
@@ -159,7 +333,12 @@ class DomainMapper:
                            has_restrooms: Optional[bool] = None,
                            search: Optional[str] = None,
                            min_price: Optional[float] = None,
-                           max_price: Optional[float] = None) -> CampsiteFilter:
+                           max_price: Optional[float] = None,
+                           near: Optional[Tuple[float, float]] = None,
+                           radius_km: Optional[float] = None,
+                           bbox: Optional[BoundingBox] = None,
+                           check_in: Optional[date] = None,
+                           check_out: Optional[date] = None) -> CampsiteFilter:
         """Convert API parameters to domain filter model"""
         return CampsiteFilter(
             state=state,
@@ -168,5 +347,10 @@ class DomainMapper:
             has_restrooms=has_restrooms,
             min_price=min_price,
             max_price=max_price,
-            search_query=search
+            search_query=search,
+            near=near,
+            radius_km=radius_km,
+            bbox=bbox,
+            check_in=check_in,
+            check_out=check_out
         )
\ No newline at end of file
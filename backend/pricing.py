@@ -0,0 +1,107 @@
+"""
+Per-Night Pricing Rules
+Weekday/weekend and seasonal multipliers applied to a campsite's base
+nightly price
+
+A rule only depends on the calendar, not on the campsite, so the sum of its
+multipliers over a stay is computed once per distinct (check-in, nights)
+and every site quoted for that stay is priced with a single multiplication.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Nights starting on Friday and Saturday (date.weekday() numbering)
+DEFAULT_WEEKEND_NIGHTS = (4, 5)
+
+
+@dataclass(frozen=True, slots=True)
+class Season:
+    """
+    A yearly date range with its own price multiplier
+
+    start/end are (month, day), both inclusive; a season whose end comes
+    before its start wraps over the new year (e.g. Dec 15 - Jan 5)
+    """
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+    multiplier: float
+
+    def __post_init__(self):
+        for month, day in (self.start, self.end):
+            try:
+                # Validate against a leap year so Feb 29 is accepted
+                date(2000, month, day)
+            except ValueError:
+                raise ValueError(f"Invalid season date {month:02d}-{day:02d}")
+        if self.multiplier < 0:
+            raise ValueError("Season multipliers cannot be negative")
+
+    def contains(self, night: date) -> bool:
+        """Whether a night falls inside the season"""
+        key = (night.month, night.day)
+        if self.start <= self.end:
+            return self.start <= key <= self.end
+        return key >= self.start or key <= self.end
+
+
+@dataclass(frozen=True, slots=True)
+class PricingRule:
+    """
+    Multipliers applied to the base price of each night
+
+    A night's multiplier is the weekend multiplier (for weekend nights)
+    times that of the first matching season
+    """
+    weekend_multiplier: float = 1.0
+    weekend_nights: Tuple[int, ...] = DEFAULT_WEEKEND_NIGHTS
+    seasons: Tuple[Season, ...] = field(default_factory=tuple)
+
+    def __post_init__(self):
+        if self.weekend_multiplier < 0:
+            raise ValueError("Weekend multiplier cannot be negative")
+
+    def multiplier(self, night: date) -> float:
+        """Price multiplier for a single night"""
+        factor = self.weekend_multiplier if night.weekday() in self.weekend_nights else 1.0
+        for season in self.seasons:
+            if season.contains(night):
+                return factor * season.multiplier
+        return factor
+
+    def nightly_multipliers(self, check_in: date, nights: int) -> List[float]:
+        """Multiplier of every night of a stay, in order"""
+        return [self.multiplier(check_in + timedelta(days=offset)) for offset in range(nights)]
+
+
+def stay_factor(rule: Optional[PricingRule], check_in: Optional[date], nights: int) -> float:
+    """
+    Total of a stay's nightly multipliers, so total cost = price * factor
+
+    Without a rule every night costs the base price and the factor is just
+    the number of nights
+
+    Raises:
+        ValueError: if a rule is given without a check-in date
+    """
+    if rule is None:
+        return nights
+    if check_in is None:
+        raise ValueError("check_in is required to apply a pricing rule")
+    return sum(rule.nightly_multipliers(check_in, nights))
+
+
+class StayFactors:
+    """Memo of stay_factor per (check_in, nights) for one rule"""
+
+    def __init__(self, rule: Optional[PricingRule]):
+        self.rule = rule
+        self._factors: Dict[Tuple[Optional[date], int], float] = {}
+
+    def __call__(self, check_in: Optional[date], nights: int) -> float:
+        key = (check_in, nights)
+        factor = self._factors.get(key)
+        if factor is None:
+            factor = stay_factor(self.rule, check_in, nights)
+            self._factors[key] = factor
+        return factor
@@ -0,0 +1,381 @@
+"""
+Query Planning Layer
+Translates domain filters into repository predicates so that filtering is
+pushed down into the data access layer instead of running over every row
+"""
+import base64
+import binascii
+import json
+import math
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from models import CampsiteFilter
+from spatial import BoundingBox, haversine_km
+
+# Fallback selectivity guesses for repositories that cannot estimate counts
+DEFAULT_SELECTIVITY = {
+    "state": 0.02,
+    "has_water": 0.5,
+    "has_electricity": 0.5,
+    "has_restrooms": 0.5,
+    "price": 0.3,
+    "text": 0.1,
+    "near": 0.05,
+    "bbox": 0.05,
+}
+
+TEXT_FIELDS = ("name", "description", "location")
+
+CAMPSITE_FIELDS = (
+    "id", "name", "description", "location", "state",
+    "has_water", "has_electricity", "has_restrooms",
+    "price_per_night", "image_url", "latitude", "longitude"
+)
+
+# Sort keys for each supported ordering; every key ends with the id so
+# orderings are total and can be resumed from a keyset cursor
+ORDERINGS: Dict[str, Callable[[Dict[str, Any]], Tuple]] = {
+    "id": lambda row: (row["id"],),
+    "price": lambda row: (row["price_per_night"], row["id"]),
+    "-price": lambda row: (-row["price_per_night"], row["id"]),
+    "name": lambda row: (row["name"], row["id"]),
+    "state": lambda row: (row["state"], row["name"], row["id"]),
+}
+# Orderings relative to the query point of a PageRequest (its origin)
+ORIGIN_ORDERINGS = ("distance",)
+ORDER_OPTIONS = tuple(ORDERINGS) + ORIGIN_ORDERINGS
+# Types of each ordering's key columns, checked when a cursor is decoded
+_NUMBER = (int, float)
+CURSOR_KEY_TYPES: Dict[str, Tuple[Tuple[type, ...], ...]] = {
+    "id": ((int,),),
+    "price": (_NUMBER, (int,)),
+    "-price": (_NUMBER, (int,)),
+    "name": ((str,), (int,)),
+    "state": ((str,), (str,), (int,)),
+    "distance": (_NUMBER, (int,)),
+}
+# Client-facing sort options: stored orderings plus search relevance
+RELEVANCE_SORT = "score"
+SORT_OPTIONS = ("price", "-price", "name", "state", RELEVANCE_SORT)
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """
+    A single pushed-down filter condition
+
+    Fields and values:
+        state: case-folded state name
+        has_water / has_electricity / has_restrooms: required boolean
+        price: (min_price, max_price) inclusive, either bound may be None
+        text: lower-cased substring matched against name, description, location
+        near: (latitude, longitude, radius_km) - rows with coordinates within
+            radius_km of the point; a None radius accepts any located row
+        bbox: BoundingBox the row's coordinates must lie in
+        ids: frozenset of campsite ids the row's id must be in (negated to
+            exclude them, e.g. sites already booked for a stay)
+
+    A negated predicate selects exactly the rows the plain one rejects
+    """
+    field: str
+    value: Any
+    negate: bool = False
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Evaluate the predicate against a raw campsite row"""
+        return self._matches(row) != self.negate
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        if self.field == "state":
+            return row["state"].casefold() == self.value
+        if self.field == "price":
+            min_price, max_price = self.value
+            price = row["price_per_night"]
+            if min_price is not None and price < min_price:
+                return False
+            if max_price is not None and price > max_price:
+                return False
+            return True
+        if self.field == "text":
+            return any(self.value in row[name].lower() for name in TEXT_FIELDS)
+        if self.field == "ids":
+            return row["id"] in self.value
+        if self.field in ("near", "bbox"):
+            lat, lon = row.get("latitude"), row.get("longitude")
+            if lat is None or lon is None:
+                return False
+            if self.field == "bbox":
+                return self.value.contains(lat, lon)
+            origin_lat, origin_lon, radius_km = self.value
+            return radius_km is None or haversine_km(origin_lat, origin_lon, lat, lon) <= radius_km
+        return row[self.field] == self.value
+
+
+@dataclass
+class QueryPlan:
+    """Predicates ordered from most to least selective, with their estimates"""
+    predicates: List[Predicate] = field(default_factory=list)
+    estimates: List[int] = field(default_factory=list)
+
+    def explain(self) -> List[Tuple[str, Any, int]]:
+        """Describe the plan as (field, value, estimated rows) tuples"""
+        return [
+            (predicate.field, predicate.value, estimate)
+            for predicate, estimate in zip(self.predicates, self.estimates)
+        ]
+
+
+class QueryPlanner:
+    """Builds selectivity-ordered query plans against a repository"""
+
+    def __init__(self, repository):
+        """
+        Initialize planner for a repository
+
+        Args:
+            repository: CampsiteRepositoryInterface used for cardinality estimates
+        """
+        self.repository = repository
+
+    @staticmethod
+    def predicates_for(filter_criteria: CampsiteFilter) -> List[Predicate]:
+        """
+        Translate a domain filter into predicates
+
+        Mirrors CampsiteFilter.matches_campsite plus the search query, so
+        falsy state, price bounds and search terms are ignored
+        """
+        predicates = []
+        if filter_criteria.state:
+            predicates.append(Predicate("state", filter_criteria.state.casefold()))
+        for name in ("has_water", "has_electricity", "has_restrooms"):
+            wanted: Optional[bool] = getattr(filter_criteria, name)
+            if wanted is not None:
+                predicates.append(Predicate(name, wanted))
+        min_price = filter_criteria.min_price or None
+        max_price = filter_criteria.max_price or None
+        if min_price is not None or max_price is not None:
+            predicates.append(Predicate("price", (min_price, max_price)))
+        if filter_criteria.search_query:
+            predicates.append(Predicate("text", filter_criteria.search_query.lower()))
+        if filter_criteria.near is not None:
+            lat, lon = filter_criteria.near
+            predicates.append(Predicate("near", (lat, lon, filter_criteria.radius_km)))
+        if filter_criteria.bbox is not None:
+            predicates.append(Predicate("bbox", filter_criteria.bbox))
+        return predicates
+
+    def plan(self, filter_criteria: CampsiteFilter, extra: Sequence[Predicate] = ()) -> QueryPlan:
+        """
+        Build a query plan for a domain filter
+
+        Args:
+            filter_criteria: CampsiteFilter domain object
+            extra: Predicates the filter cannot express on its own, such as
+                excluding sites booked for the requested stay
+
+        Returns:
+            QueryPlan with predicates sorted by estimated result size
+        """
+        predicates = self.predicates_for(filter_criteria) + list(extra)
+        estimated = sorted(
+            (self.repository.estimate(predicate), index, predicate)
+            for index, predicate in enumerate(predicates)
+        )
+        return QueryPlan(
+            predicates=[predicate for _, _, predicate in estimated],
+            estimates=[estimate for estimate, _, _ in estimated]
+        )
+
+
+@dataclass
+class PageRequest:
+    """
+    Which slice of a query result to return
+
+    order_by: one of ORDER_OPTIONS, or None for catalog order
+    after: keyset position (a sort key from ordering_key) to resume after
+    fields: columns to return; None returns full rows
+    origin: (latitude, longitude) that "distance" ordering measures from
+    """
+    limit: Optional[int] = None
+    offset: int = 0
+    order_by: Optional[str] = None
+    after: Optional[Tuple] = None
+    fields: Optional[Tuple[str, ...]] = None
+    origin: Optional[Tuple[float, float]] = None
+
+
+def ordering_key(page: PageRequest) -> Callable[[Dict[str, Any]], Tuple]:
+    """
+    Sort key for a page's ordering
+
+    "distance" keys are (km from the origin, id); rows without coordinates
+    sort last
+
+    Raises:
+        ValueError: if the ordering needs an origin the page lacks
+    """
+    if page.order_by != "distance":
+        return ORDERINGS[page.order_by]
+    if page.origin is None:
+        raise ValueError("order_by=distance requires a point to measure from")
+    origin_lat, origin_lon = page.origin
+
+    def distance_key(row: Dict[str, Any]) -> Tuple:
+        lat, lon = row.get("latitude"), row.get("longitude")
+        if lat is None or lon is None:
+            return (math.inf, row["id"])
+        return (haversine_km(origin_lat, origin_lon, lat, lon), row["id"])
+    return distance_key
+
+
+@dataclass
+class Page:
+    """One page of query results"""
+    items: List[Any]
+    total: int
+    next_after: Optional[Tuple] = None
+
+
+@dataclass
+class PageStream:
+    """
+    A page of query results delivered in batches, for streaming responses
+    total and next_after are known up front; rows are read as batches are
+    consumed
+    """
+    batches: Iterator[List[Dict[str, Any]]]
+    total: int
+    next_after: Optional[Tuple] = None
+
+
+def batched(rows: List[Any], size: int) -> Iterator[List[Any]]:
+    """Split a list into consecutive chunks of at most `size` items"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated projection, always keeping the id
+
+    Raises:
+        ValueError: if a field name is unknown
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CAMPSITE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid options: {', '.join(CAMPSITE_FIELDS)}")
+    return tuple(dict.fromkeys(["id"] + names))
+
+
+def parse_point(text: str) -> Tuple[float, float]:
+    """
+    Parse "latitude,longitude" in decimal degrees
+
+    Raises:
+        ValueError: if the text is not a valid coordinate pair
+    """
+    try:
+        lat, lon = (float(part) for part in text.split(","))
+    except ValueError:
+        raise ValueError("near must be 'latitude,longitude'")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("near is outside the valid latitude/longitude range")
+    return lat, lon
+
+
+def parse_bbox(text: str) -> BoundingBox:
+    """
+    Parse "min_lon,min_lat,max_lon,max_lat" (GeoJSON order); a min_lon
+    greater than max_lon selects a box crossing the antimeridian
+
+    Raises:
+        ValueError: if the text is not a valid bounding box
+    """
+    try:
+        west, south, east, north = (float(part) for part in text.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+    return BoundingBox(south=south, west=west, north=north, east=east)
+
+
+def project(row: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Restrict a row to the requested fields"""
+    if fields is None:
+        return row
+    return {name: row.get(name) for name in fields}
+
+
+def encode_cursor(order_by: str, key: Tuple) -> str:
+    """Encode an ordering and keyset position as an opaque cursor"""
+    payload = json.dumps([order_by, list(key)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Tuple]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    The key must have the arity and column types of its ordering, so a
+    forged cursor is rejected here instead of failing inside a keyset seek
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order_by, key = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    types = CURSOR_KEY_TYPES.get(order_by) if isinstance(order_by, str) else None
+    if types is None or not isinstance(key, list) or len(key) != len(types):
+        raise ValueError("Invalid cursor")
+    for value, allowed in zip(key, types):
+        # bool is an int subclass, but never a valid key column
+        if isinstance(value, bool) or not isinstance(value, allowed):
+            raise ValueError("Invalid cursor")
+    return order_by, tuple(key)
+
+
+def after_position(entries: List[Tuple], after: Optional[Tuple]) -> int:
+    """
+    First position in sorted (key..., slot) entries strictly after a keyset
+
+    Keys end with the unique id, so padding with +inf skips exactly the
+    entry the cursor was taken from
+    """
+    return 0 if after is None else bisect_right(entries, after + (math.inf,))
+
+
+def paginate(rows: List[Dict[str, Any]], page: PageRequest) -> Page:
+    """
+    Slice, order and project an already-filtered list of rows
+
+    Used by repositories without native paging and for orderings computed
+    in the service layer (e.g. relevance)
+    """
+    total = len(rows)
+    if page.order_by is not None:
+        sort_key = ordering_key(page)
+        entries = sorted((sort_key(row) + (position,) for position, row in enumerate(rows)))
+        start = after_position(entries, page.after)
+        ordered = [rows[entry[-1]] for entry in entries[start:]]
+    else:
+        ordered = rows
+
+    window = ordered[page.offset:]
+    next_after = None
+    if page.limit is not None and len(window) > page.limit:
+        window = window[:page.limit]
+        if page.order_by is not None:
+            next_after = sort_key(window[-1])
+    return Page(
+        items=[project(row, page.fields) for row in window],
+        total=total,
+        next_after=next_after
+    )
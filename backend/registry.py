@@ -0,0 +1,99 @@
+"""
+Service Registry
+Owns the application-scoped repositories and services so that indexes,
+calendars and connection pools are built once at startup instead of once
+per request
+"""
+import os
+import threading
+from typing import Optional
+from cache import ResponseCache
+from serialization import FragmentCache
+from repositories import (
+    AsyncRepositoryAdapter, CampsiteRepositoryInterface, InstrumentedCampsiteRepository, RepositoryFactory
+)
+from reservations import (
+    AsyncReservationAdapter, ReservationRepositoryFactory, ReservationRepositoryInterface
+)
+from services import AsyncCampsiteService, CampsiteService
+
+REPOSITORY_TYPE_ENV = "CAMPSITE_REPOSITORY"
+DEFAULT_REPOSITORY_TYPE = "indexed"
+
+
+class ServiceRegistry:
+    """Lifespan-scoped holder for the shared repositories, services and response cache"""
+
+    def __init__(self, repo_type: Optional[str] = None):
+        """
+        Initialize registry
+
+        Args:
+            repo_type: Repository type for RepositoryFactory; defaults to the
+                CAMPSITE_REPOSITORY environment variable, then "indexed"
+        """
+        self.repo_type = repo_type or os.environ.get(REPOSITORY_TYPE_ENV, DEFAULT_REPOSITORY_TYPE)
+        self.repository: Optional[CampsiteRepositoryInterface] = None
+        self.reservations: Optional[ReservationRepositoryInterface] = None
+        self.service: Optional[CampsiteService] = None
+        self.async_service: Optional[AsyncCampsiteService] = None
+        self.response_cache = ResponseCache()
+        self.fragments = FragmentCache()
+        self._lock = threading.Lock()
+
+    def startup(self, repository: Optional[CampsiteRepositoryInterface] = None) -> None:
+        """
+        Create the repositories, warm up the catalog and build the shared services
+        
+        Args:
+            repository: Campsite repository to serve instead of creating one
+                from repo_type (e.g. a synthetic catalog for load tests)
+        """
+        with self._lock:
+            if self.service is not None:
+                return
+            if repository is None:
+                repository = RepositoryFactory.create_campsite_repository(self.repo_type)
+            repository.warm_up()
+            reservations = ReservationRepositoryFactory.create_reservation_repository(repository)
+            # Services see the repository through the metrics decorator
+            instrumented = InstrumentedCampsiteRepository(repository)
+            self.repository = repository
+            self.reservations = reservations
+            self.service = CampsiteService(instrumented, reservations)
+            self.async_service = AsyncCampsiteService(
+                AsyncRepositoryAdapter(instrumented), AsyncReservationAdapter(reservations)
+            )
+
+    def shutdown(self) -> None:
+        """Release the repositories' resources"""
+        with self._lock:
+            if self.reservations is not None:
+                self.reservations.close()
+            if self.repository is not None:
+                self.repository.close()
+            self.repository = None
+            self.reservations = None
+            self.service = None
+            self.async_service = None
+            self.response_cache.clear()
+            self.fragments.clear()
+
+    def get_service(self) -> CampsiteService:
+        """
+        Shared service instance, starting the registry on first use when the
+        application lifespan has not run (e.g. scripts and ad-hoc clients)
+        """
+        service = self.service
+        if service is None:
+            self.startup()
+            service = self.service
+        return service
+
+    def get_async_service(self) -> AsyncCampsiteService:
+        """Shared async service instance, starting the registry on first use"""
+        service = self.async_service
+        if service is None:
+            self.startup()
+            service = self.async_service
+        return service
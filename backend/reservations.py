@@ -0,0 +1,522 @@
+"""
+Reservations and Availability
+Stores bookings behind a repository interface and keeps per-site booking
+calendars so "which sites are free from D1 to D2" never scans the catalog
+
+Bookings are written with optimistic concurrency: every site's calendar
+carries a version, a booking is checked against a snapshot of the calendar
+without holding any lock, and it is committed only if the version is still
+the one it was checked against. A booking that loses the race re-reads the
+calendar and is checked again, so two overlapping stays can never both
+commit.
+"""
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from anyio import to_thread
+from bitmaps import slots_from_bitmap
+from database import ConnectionPool, DatabaseDriver
+from repositories import CampsiteRepositoryInterface, DatabaseCampsiteRepository, SnapshotCampsiteRepository
+
+# Optimistic attempts before a booking gives up under contention
+MAX_BOOKING_ATTEMPTS = 10
+
+
+class ReservationConflict(Exception):
+    """The requested nights overlap an existing booking"""
+
+
+class StaleCalendarError(ReservationConflict):
+    """The site's calendar changed since the version the client last read"""
+
+
+def stay_nights_range(check_in: date, check_out: date) -> List[date]:
+    """Every night of a stay: check_in up to, but excluding, check_out"""
+    return [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+
+
+@dataclass(frozen=True, slots=True)
+class SiteCalendar:
+    """
+    Immutable snapshot of one site's bookings
+
+    booked: bitset of booked nights, bit n being the night n days after
+        the store's epoch
+    version: bumped by every booking and cancellation at the site
+    """
+    booked: int = 0
+    version: int = 0
+
+
+EMPTY_CALENDAR = SiteCalendar()
+
+
+class ReservationRepositoryInterface(ABC):
+    """Abstract interface for reservation storage and availability lookups"""
+
+    # Whether methods block on I/O and should run off the event loop
+    blocking_io = False
+
+    @property
+    def version(self) -> int:
+        """Data version, changing whenever any booking is made or cancelled"""
+        return 0
+
+    @abstractmethod
+    def get(self, reservation_id: int) -> Optional[Dict[str, Any]]:
+        """Get a reservation by ID"""
+        pass
+
+    @abstractmethod
+    def for_campsite(self, campsite_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+        """Reservations at a site overlapping the nights from start to end, by check-in"""
+        pass
+
+    @abstractmethod
+    def calendar_version(self, campsite_id: int) -> int:
+        """Current version of a site's calendar"""
+        pass
+
+    def booked_nights(self, campsite_id: int, start: date, end: date) -> List[date]:
+        """Booked nights at a site from start up to, but excluding, end"""
+        nights = set()
+        for reservation in self.for_campsite(campsite_id, start, end):
+            nights.update(stay_nights_range(
+                max(reservation["check_in"], start), min(reservation["check_out"], end)
+            ))
+        return sorted(nights)
+
+    @abstractmethod
+    def booked_campsites(self, check_in: date, check_out: date) -> FrozenSet[int]:
+        """IDs of sites with at least one booked night in [check_in, check_out)"""
+        pass
+
+    @abstractmethod
+    def book(self, data: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Book a stay
+
+        Args:
+            data: campsite_id, check_in, check_out, guest_name and total_cost
+            expected_version: Calendar version the client saw; the booking
+                is refused if the site's calendar has changed since
+
+        Returns:
+            The stored reservation with its id and created_at
+
+        Raises:
+            ReservationConflict: if a requested night is already booked
+            StaleCalendarError: if expected_version is no longer current
+        """
+        pass
+
+    @abstractmethod
+    def cancel(self, reservation_id: int) -> bool:
+        """Cancel a reservation, freeing its nights; True if it existed"""
+        pass
+
+    def close(self) -> None:
+        """Release resources held by the repository"""
+        pass
+
+
+class InMemoryReservationRepository(ReservationRepositoryInterface):
+    """
+    In-memory reservations with bitset calendars
+
+    Two views of the same bookings are kept:
+      - per site, an immutable SiteCalendar whose bitset answers "is any
+        of these nights taken" with one AND
+      - per night, a bitmap of booked sites, so the sites busy during a
+        stay are the OR of at most one bitmap per night. Bits are dense
+        slots handed out on a site's first booking, so bitmaps are as wide
+        as the number of booked sites, not the largest campsite id
+    Readers never lock: both views only ever hold immutable values that
+    are replaced whole. The lock covers just the version compare and the
+    swap at commit.
+    """
+
+    def __init__(self, epoch: Optional[date] = None):
+        """
+        Initialize an empty store
+
+        Args:
+            epoch: First night calendars can represent (defaults to today)
+        """
+        self.epoch = epoch or date.today()
+        self._reservations: Dict[int, Dict[str, Any]] = {}
+        self._by_site: Dict[int, Tuple[int, ...]] = {}
+        self._calendars: Dict[int, SiteCalendar] = {}
+        self._nights: Dict[int, int] = {}
+        self._slot_by_site: Dict[int, int] = {}
+        self._site_by_slot: List[int] = []
+        self._next_id = 1
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Monotonic data version, bumped on every booking and cancellation"""
+        return self._version
+
+    def _night_mask(self, check_in: date, check_out: date) -> Tuple[int, int]:
+        """
+        (offset of check_in from the epoch, bitset of the stay's nights)
+
+        Raises:
+            ValueError: if the stay starts before the epoch
+        """
+        offset = (check_in - self.epoch).days
+        if offset < 0:
+            raise ValueError(f"Dates before {self.epoch.isoformat()} cannot be booked")
+        return offset, ((1 << (check_out - check_in).days) - 1) << offset
+
+    def get(self, reservation_id: int) -> Optional[Dict[str, Any]]:
+        """Get a reservation by ID"""
+        return self._reservations.get(reservation_id)
+
+    def for_campsite(self, campsite_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+        """Reservations at a site overlapping [start, end), by check-in"""
+        reservations = self._reservations
+        found = (reservations.get(reservation_id) for reservation_id in self._by_site.get(campsite_id, ()))
+        return sorted(
+            (row for row in found
+             if row is not None and row["check_in"] < end and row["check_out"] > start),
+            key=lambda row: (row["check_in"], row["id"])
+        )
+
+    def calendar_version(self, campsite_id: int) -> int:
+        """Current version of a site's calendar"""
+        return self._calendars.get(campsite_id, EMPTY_CALENDAR).version
+
+    def booked_nights(self, campsite_id: int, start: date, end: date) -> List[date]:
+        """Booked nights at a site in [start, end), read from its bitset"""
+        booked = self._calendars.get(campsite_id, EMPTY_CALENDAR).booked
+        first = max(start, self.epoch)
+        if not booked or first >= end:
+            return []
+        offset, mask = self._night_mask(first, end)
+        return [first + timedelta(days=night - offset) for night in slots_from_bitmap(booked & mask)]
+
+    def booked_campsites(self, check_in: date, check_out: date) -> FrozenSet[int]:
+        """OR of the per-night site bitmaps over the stay"""
+        nights = self._nights
+        busy = 0
+        for night in range(check_in.toordinal(), check_out.toordinal()):
+            busy |= nights.get(night, 0)
+        sites = self._site_by_slot
+        return frozenset(sites[slot] for slot in slots_from_bitmap(busy))
+
+    def _site_slot(self, campsite_id: int) -> int:
+        """Dense bit position of a site, assigned on first use (caller holds the lock)"""
+        slot = self._slot_by_site.get(campsite_id)
+        if slot is None:
+            slot = len(self._site_by_slot)
+            self._site_by_slot.append(campsite_id)
+            self._slot_by_site[campsite_id] = slot
+        return slot
+
+    def _flip_nights(self, campsite_id: int, check_in: date, check_out: date) -> None:
+        """Toggle a site's bit in each night's bitmap (caller holds the lock)"""
+        bit = 1 << self._site_slot(campsite_id)
+        nights = self._nights
+        for night in range(check_in.toordinal(), check_out.toordinal()):
+            remaining = nights.get(night, 0) ^ bit
+            if remaining:
+                nights[night] = remaining
+            else:
+                nights.pop(night, None)
+
+    def book(self, data: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """Check the stay against a calendar snapshot, then compare-and-swap it in"""
+        campsite_id = data["campsite_id"]
+        _, mask = self._night_mask(data["check_in"], data["check_out"])
+        for _ in range(MAX_BOOKING_ATTEMPTS):
+            calendar = self._calendars.get(campsite_id, EMPTY_CALENDAR)
+            if expected_version is not None and calendar.version != expected_version:
+                raise StaleCalendarError(
+                    f"Calendar of campsite {campsite_id} changed (version {calendar.version})"
+                )
+            if calendar.booked & mask:
+                raise ReservationConflict(
+                    f"Campsite {campsite_id} is already booked for some of those nights"
+                )
+            with self._lock:
+                if self._calendars.get(campsite_id, EMPTY_CALENDAR) is not calendar:
+                    continue
+                row = dict(data, id=self._next_id, created_at=datetime.now())
+                self._next_id += 1
+                self._reservations[row["id"]] = row
+                self._by_site[campsite_id] = self._by_site.get(campsite_id, ()) + (row["id"],)
+                self._calendars[campsite_id] = SiteCalendar(calendar.booked | mask, calendar.version + 1)
+                self._flip_nights(campsite_id, row["check_in"], row["check_out"])
+                self._version += 1
+            return row
+        raise ReservationConflict(f"Campsite {campsite_id} is too busy to book right now, try again")
+
+    def cancel(self, reservation_id: int) -> bool:
+        """Remove a reservation and clear its nights"""
+        with self._lock:
+            row = self._reservations.pop(reservation_id, None)
+            if row is None:
+                return False
+            campsite_id = row["campsite_id"]
+            _, mask = self._night_mask(row["check_in"], row["check_out"])
+            calendar = self._calendars[campsite_id]
+            self._calendars[campsite_id] = SiteCalendar(calendar.booked & ~mask, calendar.version + 1)
+            self._by_site[campsite_id] = tuple(
+                other for other in self._by_site[campsite_id] if other != reservation_id
+            )
+            self._flip_nights(campsite_id, row["check_in"], row["check_out"])
+            self._version += 1
+            return True
+
+
+class DatabaseReservationRepository(ReservationRepositoryInterface):
+    """
+    Database reservations sharing the campsite repository's connection pool
+
+    Each site has a row in campsite_calendars holding its version. A
+    booking checks for overlapping stays, then in one transaction bumps the
+    version with `WHERE version = <version it checked against>` and inserts
+    the reservation; if another booking got there first the update matches
+    no row and the booking is re-checked. This holds across processes
+    sharing the database, not just threads.
+    """
+
+    COLUMNS = ("id", "campsite_id", "check_in", "check_out", "guest_name", "total_cost", "created_at")
+    SELECT_ROWS = f"SELECT {', '.join(COLUMNS)} FROM reservations"
+    blocking_io = True
+    STATEMENTS = {
+        "get": SELECT_ROWS + " WHERE id = ?",
+        "for_campsite": SELECT_ROWS + (
+            " WHERE campsite_id = ? AND check_in < ? AND check_out > ? ORDER BY check_in, id"
+        ),
+        "overlaps": (
+            "SELECT COUNT(*) FROM reservations"
+            " WHERE campsite_id = ? AND check_in < ? AND check_out > ?"
+        ),
+        "booked_campsites": (
+            "SELECT DISTINCT campsite_id FROM reservations WHERE check_in < ? AND check_out > ?"
+        ),
+        "calendar_version": "SELECT version FROM campsite_calendars WHERE campsite_id = ?",
+        "create_calendar": (
+            "INSERT INTO campsite_calendars (campsite_id, version) VALUES (?, 0)"
+            " ON CONFLICT (campsite_id) DO NOTHING"
+        ),
+        "bump_calendar": (
+            "UPDATE campsite_calendars SET version = version + 1"
+            " WHERE campsite_id = ? AND version = ?"
+        ),
+        "touch_calendar": (
+            "UPDATE campsite_calendars SET version = version + 1 WHERE campsite_id = ?"
+        ),
+        "insert": (
+            "INSERT INTO reservations (campsite_id, check_in, check_out, guest_name, total_cost, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?) RETURNING id"
+        ),
+        "delete": "DELETE FROM reservations WHERE id = ? RETURNING campsite_id",
+    }
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS reservations (
+            id {id_column},
+            campsite_id INTEGER NOT NULL,
+            check_in TEXT NOT NULL,
+            check_out TEXT NOT NULL,
+            guest_name TEXT NOT NULL,
+            total_cost DOUBLE PRECISION NOT NULL,
+            created_at TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS campsite_calendars (
+            campsite_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_site ON reservations (campsite_id, check_in)",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_check_out ON reservations (check_out, check_in)",
+    )
+
+    def __init__(self, pool: ConnectionPool, driver: DatabaseDriver):
+        """
+        Initialize repository, creating its tables if needed
+
+        Args:
+            pool: Connection pool, usually the campsite repository's
+            driver: Driver the pool was built with
+        """
+        self.pool = pool
+        self.driver = driver
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._statements = {
+            name: driver.prepare(sql) for name, sql in self.STATEMENTS.items()
+        }
+        with pool.connection() as connection:
+            for statement in self.SCHEMA:
+                driver.execute(connection, statement.format(id_column=driver.id_column))
+
+    @property
+    def version(self) -> int:
+        """
+        Bumped after every booking or cancellation made through this
+        repository; writes by other processes are not observed
+        """
+        return self._version
+
+    def _bump_version(self) -> None:
+        with self._version_lock:
+            self._version += 1
+
+    @classmethod
+    def _to_dict(cls, record) -> Dict[str, Any]:
+        row = dict(zip(cls.COLUMNS, record))
+        row["check_in"] = date.fromisoformat(row["check_in"])
+        row["check_out"] = date.fromisoformat(row["check_out"])
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+        return row
+
+    def _fetch_one(self, name: str, params) -> Optional[Any]:
+        with self.pool.connection() as connection:
+            return self.driver.execute(connection, self._statements[name], params).fetchone()
+
+    def get(self, reservation_id: int) -> Optional[Dict[str, Any]]:
+        """Get a reservation by ID"""
+        record = self._fetch_one("get", (reservation_id,))
+        return self._to_dict(record) if record else None
+
+    def for_campsite(self, campsite_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+        """Reservations at a site overlapping [start, end), by check-in"""
+        with self.pool.connection() as connection:
+            records = self.driver.execute(
+                connection, self._statements["for_campsite"],
+                (campsite_id, end.isoformat(), start.isoformat())
+            ).fetchall()
+        return [self._to_dict(record) for record in records]
+
+    def calendar_version(self, campsite_id: int) -> int:
+        """Current version of a site's calendar"""
+        record = self._fetch_one("calendar_version", (campsite_id,))
+        return record[0] if record else 0
+
+    def booked_campsites(self, check_in: date, check_out: date) -> FrozenSet[int]:
+        """Sites with a reservation overlapping the stay, by one range query"""
+        with self.pool.connection() as connection:
+            records = self.driver.execute(
+                connection, self._statements["booked_campsites"],
+                (check_out.isoformat(), check_in.isoformat())
+            ).fetchall()
+        return frozenset(record[0] for record in records)
+
+    def book(self, data: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """Check for overlaps, then commit only if the calendar version is unchanged"""
+        campsite_id = data["campsite_id"]
+        check_in, check_out = data["check_in"].isoformat(), data["check_out"].isoformat()
+        with self.pool.connection() as connection:
+            self.driver.execute(connection, self._statements["create_calendar"], (campsite_id,))
+        for _ in range(MAX_BOOKING_ATTEMPTS):
+            with self.pool.connection() as connection:
+                version = self.driver.execute(
+                    connection, self._statements["calendar_version"], (campsite_id,)
+                ).fetchone()[0]
+                overlapping = self.driver.execute(
+                    connection, self._statements["overlaps"], (campsite_id, check_out, check_in)
+                ).fetchone()[0]
+            if expected_version is not None and version != expected_version:
+                raise StaleCalendarError(
+                    f"Calendar of campsite {campsite_id} changed (version {version})"
+                )
+            if overlapping:
+                raise ReservationConflict(
+                    f"Campsite {campsite_id} is already booked for some of those nights"
+                )
+            created_at = datetime.now()
+            with self.pool.connection() as connection:
+                bumped = self.driver.execute(
+                    connection, self._statements["bump_calendar"], (campsite_id, version)
+                ).rowcount
+                if not bumped:
+                    continue
+                reservation_id = self.driver.execute(
+                    connection, self._statements["insert"],
+                    (campsite_id, check_in, check_out, data["guest_name"],
+                     data["total_cost"], created_at.isoformat())
+                ).fetchone()[0]
+            self._bump_version()
+            return dict(data, id=reservation_id, created_at=created_at)
+        raise ReservationConflict(f"Campsite {campsite_id} is too busy to book right now, try again")
+
+    def cancel(self, reservation_id: int) -> bool:
+        """Delete a reservation and bump its site's calendar in one transaction"""
+        with self.pool.connection() as connection:
+            record = self.driver.execute(
+                connection, self._statements["delete"], (reservation_id,)
+            ).fetchone()
+            if record is None:
+                return False
+            self.driver.execute(connection, self._statements["touch_calendar"], (record[0],))
+        self._bump_version()
+        return True
+
+
+class AsyncReservationAdapter:
+    """
+    Awaitable view of a reservation repository
+    Blocking repositories run in a worker thread, like AsyncRepositoryAdapter
+    """
+
+    def __init__(self, repository: ReservationRepositoryInterface):
+        self.repository = repository
+
+    @property
+    def version(self) -> int:
+        return self.repository.version
+
+    async def _call(self, method, *args):
+        if self.repository.blocking_io:
+            return await to_thread.run_sync(method, *args)
+        return method(*args)
+
+    async def get(self, reservation_id: int) -> Optional[Dict[str, Any]]:
+        return await self._call(self.repository.get, reservation_id)
+
+    async def calendar_version(self, campsite_id: int) -> int:
+        return await self._call(self.repository.calendar_version, campsite_id)
+
+    async def booked_nights(self, campsite_id: int, start: date, end: date) -> List[date]:
+        return await self._call(self.repository.booked_nights, campsite_id, start, end)
+
+    async def booked_campsites(self, check_in: date, check_out: date) -> FrozenSet[int]:
+        return await self._call(self.repository.booked_campsites, check_in, check_out)
+
+    async def book(self, data: Dict[str, Any], expected_version: Optional[int] = None) -> Dict[str, Any]:
+        return await self._call(self.repository.book, data, expected_version)
+
+    async def cancel(self, reservation_id: int) -> bool:
+        return await self._call(self.repository.cancel, reservation_id)
+
+
+class ReservationRepositoryFactory:
+    """Pairs a reservation store with the campsite repository in use"""
+
+    @staticmethod
+    def create_reservation_repository(
+        campsites: CampsiteRepositoryInterface
+    ) -> ReservationRepositoryInterface:
+        """
+        Create the reservation repository matching a campsite repository
+
+        Database catalogs, and snapshots of one, keep reservations in the
+        same database (and pool); in-memory catalogs keep them in memory
+
+        Args:
+            campsites: The application's campsite repository
+
+        Returns:
+            ReservationRepositoryInterface implementation
+        """
+        if isinstance(campsites, SnapshotCampsiteRepository):
+            campsites = campsites.source
+        if isinstance(campsites, DatabaseCampsiteRepository):
+            return DatabaseReservationRepository(campsites.pool, campsites.driver)
+        return InMemoryReservationRepository()
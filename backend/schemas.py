@@ -3,8 +3,9 @@ Pydantic Schemas for Request/Response Validation
 Defines the data models for API validation and documentation
 """
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Union
+from datetime import date, datetime
+from models import normalize_state
 
 
 class CampsiteBase(BaseModel):
@@ -18,13 +19,29 @@ class CampsiteBase(BaseModel):
     has_restrooms: bool = Field(..., description="Restroom facilities availability")
     price_per_night: float = Field(..., ge=0, le=1000, description="Price per night in USD")
     image_url: str = Field(..., description="URL to campsite image")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitude in decimal degrees")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitude in decimal degrees")
+    
+    @validator('latitude', 'longitude', pre=True)
+    def blank_coordinate(cls, v):
+        """Treat blank coordinates (e.g. empty CSV cells) as missing"""
+        if isinstance(v, str) and not v.strip():
+            return None
+        return v
+    
+    @validator('longitude', always=True)
+    def validate_coordinates(cls, v, values):
+        """Require latitude and longitude together"""
+        if 'latitude' in values and (v is None) != (values['latitude'] is None):
+            raise ValueError('latitude and longitude must be given together')
+        return v
     
     @validator('state')
     def validate_state(cls, v):
         """Validate state name format"""
         if not v.strip():
             raise ValueError('State cannot be empty')
-        return v.strip().title()
+        return normalize_state(v)
     
     @validator('price_per_night')
     def validate_price(cls, v):
@@ -54,7 +71,9 @@ class CampsiteResponse(CampsiteBase):
                 "has_electricity": True,
                 "has_restrooms": True,
                 "price_per_night": 25.0,
-                "image_url": "https://example.com/image.jpg"
+                "image_url": "https://example.com/image.jpg",
+                "latitude": 37.3861,
+                "longitude": -122.0839
             }
         }
 
@@ -75,6 +94,24 @@ class CampsiteUpdate(BaseModel):
     has_restrooms: Optional[bool] = None
     price_per_night: Optional[float] = Field(None, ge=0, le=1000)
     image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    
+    @validator('state')
+    def validate_state(cls, v):
+        """Store the state spelled the way CampsiteBase stores it"""
+        if v is None:
+            return v
+        if not v.strip():
+            raise ValueError('State cannot be empty')
+        return normalize_state(v)
+    
+    @validator('longitude', always=True)
+    def validate_coordinates(cls, v, values):
+        """Move a campsite by giving both coordinates"""
+        if 'latitude' in values and (v is None) != (values['latitude'] is None):
+            raise ValueError('latitude and longitude must be given together')
+        return v
 
 
 class CampsiteFilter(BaseModel):
@@ -96,11 +133,43 @@ class CampsiteFilter(BaseModel):
         return v
 
 
+class CampsiteProjection(BaseModel):
+    """Schema for a campsite restricted to the fields requested with `fields=`"""
+    id: int = Field(..., gt=0, description="Unique campsite identifier")
+    name: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    state: Optional[str] = None
+    has_water: Optional[bool] = None
+    has_electricity: Optional[bool] = None
+    has_restrooms: Optional[bool] = None
+    price_per_night: Optional[float] = None
+    image_url: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class PriceBucketCount(BaseModel):
+    """Number of filtered campsites in one price range"""
+    min_price: Optional[float] = Field(None, description="Inclusive lower bound, absent for the lowest bucket")
+    max_price: Optional[float] = Field(None, description="Exclusive upper bound, absent for the highest bucket")
+    count: int = Field(..., ge=0)
+
+
+class FacetCounts(BaseModel):
+    """Facet counts of the filtered campsites; only the requested facets are present"""
+    states: Optional[Dict[str, int]] = Field(None, description="Campsites per state")
+    amenities: Optional[Dict[str, int]] = Field(None, description="Campsites offering each amenity")
+    price_buckets: Optional[List[PriceBucketCount]] = None
+
+
 class CampsiteListResponse(BaseModel):
     """Schema for campsite list response"""
-    campsites: List[CampsiteResponse]
+    campsites: List[Union[CampsiteResponse, CampsiteProjection]]
     total_count: int = Field(..., ge=0, description="Total number of campsites")
     filtered_count: int = Field(..., ge=0, description="Number of campsites after filtering")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, absent on the last page")
+    facets: Optional[FacetCounts] = Field(None, description="Counts requested with `facets=`")
     
     class Config:
         json_schema_extra = {
@@ -179,6 +248,128 @@ class StatsResponse(BaseModel):
     available_states: int = Field(..., ge=0, description="Number of states with campsites")
     states: List[str] = Field(..., description="List of all states")
     price_range: Dict[str, float] = Field(..., description="Price range statistics")
+    price_percentiles: Dict[str, float] = Field(default_factory=dict, description="Nearest-rank price percentiles")
+    campsites_per_state: Dict[str, int] = Field(default_factory=dict, description="Number of campsites in each state")
+
+
+class ReservationCreate(BaseModel):
+    """Schema for booking a stay"""
+    campsite_id: int = Field(..., gt=0, description="Campsite to book")
+    check_in: date = Field(..., description="Arrival date (first night)")
+    check_out: date = Field(..., description="Departure date (the night before is the last one)")
+    guest_name: str = Field(..., min_length=1, max_length=100, description="Name the booking is held under")
+    expected_version: Optional[int] = Field(
+        None, ge=0, description="Calendar version from /availability; the booking fails if it changed since"
+    )
+    
+    @validator('guest_name')
+    def validate_guest_name(cls, v):
+        """Reject blank names"""
+        if not v.strip():
+            raise ValueError('guest_name cannot be blank')
+        return v.strip()
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "campsite_id": 1,
+                "check_in": "2026-07-03",
+                "check_out": "2026-07-06",
+                "guest_name": "Alex Rivera"
+            }
+        }
+
+
+class ReservationResponse(BaseModel):
+    """Schema for a booked stay"""
+    id: int = Field(..., gt=0, description="Unique reservation identifier")
+    campsite_id: int = Field(..., gt=0, description="Booked campsite")
+    check_in: date = Field(..., description="Arrival date")
+    check_out: date = Field(..., description="Departure date")
+    nights: int = Field(..., gt=0, description="Number of nights booked")
+    guest_name: str = Field(..., description="Name the booking is held under")
+    total_cost: float = Field(..., ge=0, description="Total price of the stay in USD")
+    created_at: datetime = Field(..., description="When the booking was made")
+
+
+class AvailabilityResponse(BaseModel):
+    """Schema for a campsite's calendar over a date range"""
+    campsite_id: int = Field(..., gt=0, description="Campsite identifier")
+    start: date = Field(..., description="First night covered")
+    end: date = Field(..., description="Night after the last one covered")
+    available: bool = Field(..., description="Whether every night in the range is free")
+    booked_nights: List[date] = Field(default_factory=list, description="Nights already booked")
+    version: int = Field(..., ge=0, description="Calendar version, to pass as expected_version when booking")
+
+
+class QuoteItem(BaseModel):
+    """Schema for one stay to price"""
+    campsite_id: int = Field(..., gt=0, description="Campsite to price")
+    nights: int = Field(..., gt=0, le=30, description="Number of nights")
+    check_in: Optional[date] = Field(None, description="Arrival date; required when a pricing rule is given")
+
+
+class SeasonRule(BaseModel):
+    """Schema for a seasonal price multiplier"""
+    start: str = Field(..., pattern=r"^\d{2}-\d{2}$", description="First day of the season, 'MM-DD'")
+    end: str = Field(..., pattern=r"^\d{2}-\d{2}$", description="Last day of the season, 'MM-DD' (may wrap over the new year)")
+    multiplier: float = Field(..., ge=0, le=10, description="Multiplier for nights in the season")
+
+
+class PricingRuleSchema(BaseModel):
+    """Schema for per-night pricing: weekend and seasonal multipliers"""
+    weekend_multiplier: float = Field(1.0, ge=0, le=10, description="Multiplier for Friday and Saturday nights")
+    seasons: List[SeasonRule] = Field(default_factory=list, max_length=24, description="Seasons, first match wins")
+
+
+class QuoteRequest(BaseModel):
+    """Schema for pricing many stays in one request"""
+    items: List[QuoteItem] = Field(..., min_length=1, max_length=500, description="Stays to price")
+    pricing: Optional[PricingRuleSchema] = Field(None, description="Optional per-night pricing rule")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"campsite_id": 1, "nights": 3, "check_in": "2026-07-03"},
+                    {"campsite_id": 4, "nights": 2, "check_in": "2026-07-03"}
+                ],
+                "pricing": {
+                    "weekend_multiplier": 1.25,
+                    "seasons": [{"start": "06-15", "end": "09-05", "multiplier": 1.5}]
+                }
+            }
+        }
+
+
+class QuoteLine(BaseModel):
+    """Schema for the price of one stay"""
+    campsite_id: int = Field(..., description="Campsite priced")
+    nights: int = Field(..., description="Number of nights")
+    check_in: Optional[date] = Field(None, description="Arrival date")
+    found: bool = Field(..., description="Whether the campsite exists")
+    price_per_night: Optional[float] = Field(None, description="Base price per night")
+    total_cost: Optional[float] = Field(None, description="Total cost of the stay, absent when not found")
+
+
+class QuoteResponse(BaseModel):
+    """Schema for batch quote results"""
+    quotes: List[QuoteLine] = Field(..., description="One quote per requested stay, in order")
+    total_cost: float = Field(..., ge=0, description="Sum of the found quotes")
+    currency: str = Field("USD", description="Currency of every amount")
+
+
+class ImportErrorDetail(BaseModel):
+    """Schema for a record rejected during bulk import"""
+    line: int = Field(..., description="Line number of the record in the uploaded file")
+    error: str = Field(..., description="Why the record was rejected")
+
+
+class ImportResponse(BaseModel):
+    """Schema for bulk import results"""
+    imported: int = Field(..., ge=0, description="Number of campsites added")
+    failed: int = Field(..., ge=0, description="Number of records rejected")
+    errors: List[ImportErrorDetail] = Field(default_factory=list, description="Details of the first rejected records")
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,220 @@
+"""
+Full-Text Search Index
+Tokenized inverted index with optional trigram postings and BM25 ranking
+Documents are identified by small non-negative integers (repository slots)
+"""
+import math
+import re
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Sequence, Set
+
+TOKEN_PATTERN = re.compile(r"\w+")
+NGRAM_SIZE = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Split lower-cased text into word tokens"""
+    return TOKEN_PATTERN.findall(text)
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Unique character n-grams of a lower-cased string"""
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _insert_sorted(postings: array, doc_id: int) -> None:
+    """Insert a doc id into an ascending postings array"""
+    if not postings or postings[-1] < doc_id:
+        postings.append(doc_id)
+    else:
+        postings.insert(bisect_left(postings, doc_id), doc_id)
+
+
+def _remove_sorted(postings: array, doc_id: int) -> int:
+    """Remove a doc id from an ascending postings array, returning its position"""
+    position = bisect_left(postings, doc_id)
+    del postings[position]
+    return position
+
+
+class TextIndex:
+    """
+    Inverted index over a fixed set of text fields
+
+    Substring search keeps the semantics of `query in field.lower()`: the
+    rarest trigram of the query narrows the candidates, which are then
+    verified against cached lower-cased fields. Queries shorter than a
+    trigram fall back to scanning the cached fields, never re-lowercasing.
+
+    Ranked search scores documents with BM25 over word tokens, treating the
+    last query token as a prefix so partial words still rank.
+    """
+
+    def __init__(self, use_ngrams: bool = True, k1: float = 1.2, b: float = 0.75):
+        self.use_ngrams = use_ngrams
+        self.k1 = k1
+        self.b = b
+        self._fields: List[Optional[Sequence[str]]] = []
+        self._ngram_postings: Dict[str, array] = {}
+        self._term_postings: Dict[str, array] = {}
+        self._term_frequencies: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._doc_lengths: List[int] = []
+        self._total_length = 0
+        self._doc_count = 0
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def add(self, doc_id: int, fields: Sequence[str]) -> None:
+        """Index a document's text fields"""
+        lowered = tuple(value.lower() for value in fields)
+        if doc_id >= len(self._fields):
+            missing = doc_id + 1 - len(self._fields)
+            self._fields.extend([None] * missing)
+            self._doc_lengths.extend([0] * missing)
+        self._fields[doc_id] = lowered
+
+        if self.use_ngrams:
+            grams = set()
+            for value in lowered:
+                grams |= ngrams(value)
+            for gram in grams:
+                postings = self._ngram_postings.get(gram)
+                if postings is None:
+                    self._ngram_postings[gram] = array("I", [doc_id])
+                else:
+                    _insert_sorted(postings, doc_id)
+
+        counts: Dict[str, int] = {}
+        length = 0
+        for value in lowered:
+            for token in tokenize(value):
+                counts[token] = counts.get(token, 0) + 1
+                length += 1
+        for token, frequency in counts.items():
+            postings = self._term_postings.get(token)
+            if postings is None:
+                self._term_postings[token] = array("I", [doc_id])
+                self._term_frequencies[token] = array("I", [frequency])
+                insort(self._vocabulary, token)
+            else:
+                _insert_sorted(postings, doc_id)
+                position = bisect_left(postings, doc_id)
+                self._term_frequencies[token].insert(position, frequency)
+
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        self._doc_count += 1
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a document from every posting list"""
+        lowered = self._fields[doc_id]
+        if lowered is None:
+            return
+
+        if self.use_ngrams:
+            grams = set()
+            for value in lowered:
+                grams |= ngrams(value)
+            for gram in grams:
+                postings = self._ngram_postings[gram]
+                _remove_sorted(postings, doc_id)
+                if not postings:
+                    del self._ngram_postings[gram]
+
+        for token in {token for value in lowered for token in tokenize(value)}:
+            postings = self._term_postings[token]
+            position = _remove_sorted(postings, doc_id)
+            del self._term_frequencies[token][position]
+            if not postings:
+                del self._term_postings[token]
+                del self._term_frequencies[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+        self._total_length -= self._doc_lengths[doc_id]
+        self._doc_lengths[doc_id] = 0
+        self._fields[doc_id] = None
+        self._doc_count -= 1
+
+    def _rarest_ngram_postings(self, query: str) -> Optional[array]:
+        """Smallest trigram posting list for a query, None if it cannot prune"""
+        if not self.use_ngrams or len(query) < NGRAM_SIZE:
+            return None
+        rarest = None
+        for gram in ngrams(query):
+            postings = self._ngram_postings.get(gram)
+            if postings is None:
+                return array("I")
+            if rarest is None or len(postings) < len(rarest):
+                rarest = postings
+        return rarest
+
+    def estimate(self, query: str) -> int:
+        """Upper bound on the number of documents containing a substring"""
+        candidates = self._rarest_ngram_postings(query)
+        return self._doc_count if candidates is None else len(candidates)
+
+    def search(self, query: str) -> List[int]:
+        """
+        Find documents with a field containing a lower-cased substring
+
+        Args:
+            query: Lower-cased search string
+
+        Returns:
+            Ascending list of matching doc ids
+        """
+        fields = self._fields
+        candidates = self._rarest_ngram_postings(query)
+        if candidates is None:
+            candidates = range(len(fields))
+        matches = []
+        for doc_id in candidates:
+            lowered = fields[doc_id]
+            if lowered is not None and any(query in value for value in lowered):
+                matches.append(doc_id)
+        return matches
+
+    def _expand_terms(self, query: str) -> List[str]:
+        """Query tokens, with the last token expanded to every indexed prefix match"""
+        tokens = tokenize(query.lower())
+        if not tokens:
+            return []
+        terms = [token for token in tokens[:-1] if token in self._term_postings]
+        prefix = tokens[-1]
+        position = bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(prefix):
+            terms.append(self._vocabulary[position])
+            position += 1
+        return list(dict.fromkeys(terms))
+
+    def score(self, query: str, doc_ids: Sequence[int]) -> List[float]:
+        """
+        BM25 relevance of each given document for a query
+
+        Args:
+            query: Free-text query
+            doc_ids: Documents to score
+
+        Returns:
+            One score per doc id, in the same order
+        """
+        scores = [0.0] * len(doc_ids)
+        if not self._doc_count:
+            return scores
+        average_length = self._total_length / self._doc_count or 1.0
+        for term in self._expand_terms(query):
+            postings = self._term_postings[term]
+            frequencies = self._term_frequencies[term]
+            document_frequency = len(postings)
+            idf = math.log(1 + (self._doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for index, doc_id in enumerate(doc_ids):
+                position = bisect_left(postings, doc_id)
+                if position == document_frequency or postings[position] != doc_id:
+                    continue
+                frequency = frequencies[position]
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
@@ -0,0 +1,101 @@
+"""
+Fast Response Serialization
+Renders catalog rows straight to JSON bytes for list responses
+
+Rows in a repository were validated when they were written (CampsiteCreate
+at ingest, or the curated seed data), so they are trusted here: no domain
+objects, no pydantic models and no second validation pass. Each full row's
+JSON is cached and reused until the row changes. Null fields are left out,
+as the list endpoint's response_model_exclude_none would.
+"""
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from metrics import CACHE_LOOKUPS
+from schemas import CampsiteProjection, CampsiteResponse
+
+# Key order of the pydantic models, so the bytes match what they would render
+RESPONSE_FIELDS: Tuple[str, ...] = tuple(CampsiteResponse.model_fields)
+PROJECTION_FIELDS: Tuple[str, ...] = tuple(CampsiteProjection.model_fields)
+DEFAULT_MAX_FRAGMENTS = 100_000
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, formatted like FastAPI's JSONResponse"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FragmentCache:
+    """
+    Pre-serialized JSON per campsite, keyed by id
+
+    An entry is reused while the row it was rendered from is the same
+    object or compares equal, so updated rows are re-rendered without any
+    explicit invalidation. Reaching max_entries drops every entry.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_FRAGMENTS):
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[Dict[str, Any], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fragment(self, row: Dict[str, Any]) -> bytes:
+        """JSON for a full row, from cache when the row is unchanged"""
+        entry = self._entries.get(row["id"])
+        if entry is not None and (entry[0] is row or entry[0] == row):
+            return entry[1]
+        body = dumps({name: row[name] for name in RESPONSE_FIELDS if row.get(name) is not None})
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[row["id"]] = (row, body)
+        return body
+
+    def fragments(self, rows: Iterable[Dict[str, Any]]) -> List[bytes]:
+        """Fragments for a page of rows, counting cache hits and misses once per page"""
+        entries = self._entries
+        bodies = []
+        misses = 0
+        for row in rows:
+            entry = entries.get(row["id"])
+            if entry is not None and (entry[0] is row or entry[0] == row):
+                bodies.append(entry[1])
+            else:
+                misses += 1
+                bodies.append(self.fragment(row))
+        CACHE_LOOKUPS.inc("fragment", "hit", amount=len(bodies) - misses)
+        CACHE_LOOKUPS.inc("fragment", "miss", amount=misses)
+        return bodies
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+
+def projection_fragment(row: Dict[str, Any]) -> bytes:
+    """JSON for a projected row (not cached: projections vary per request)"""
+    return dumps({name: row[name] for name in PROJECTION_FIELDS if row.get(name) is not None})
+
+
+def list_response_body(
+    fragments: Iterable[bytes],
+    total_count: int,
+    filtered_count: int,
+    next_cursor: Optional[str] = None,
+    facets: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    Assemble a CampsiteListResponse body from row fragments
+    next_cursor and facets are omitted when None, as with
+    response_model_exclude_none
+    """
+    tail = b'],"total_count":%d,"filtered_count":%d' % (total_count, filtered_count)
+    if next_cursor is not None:
+        tail += b',"next_cursor":' + dumps(next_cursor)
+    if facets is not None:
+        tail += b',"facets":' + dumps(facets)
+    return b'{"campsites":[' + b",".join(fragments) + tail + b"}"
@@ -0,0 +1,81 @@
+"""
+Production Server
+Runs the API in several worker processes that share one catalog snapshot
+
+    CAMPSITE_DATABASE_URL=sqlite:///campsites.db python serve.py --workers 4
+
+The loader (this process) builds the catalog once from the database and
+publishes it as a memory-mapped snapshot; every worker maps that file
+instead of loading and indexing its own copy, so resident memory stays
+flat as workers are added. Writes made through any worker go to the
+database and publish the next snapshot version, which the other workers
+switch to on their next request after the refresh interval.
+
+Publishing rewrites the whole snapshot, so every write costs O(catalog)
+(concurrent writes in a worker share one publish). This layout is meant
+for catalogs that are read far more often than edited; load many rows
+through the import endpoint, which publishes once per import.
+
+Reservations live in the same database and stay conflict-free across
+workers; cached availability responses of other workers may lag a new
+booking by up to the response cache TTL.
+"""
+import argparse
+import os
+import sys
+from data import CAMPSITES
+from registry import REPOSITORY_TYPE_ENV
+from repositories import DATABASE_URL_ENV, DEFAULT_DATABASE_URL, DatabaseCampsiteRepository
+from snapshot import SNAPSHOT_DIR_ENV, publish_lock, publish_snapshot, snapshot_directory
+
+
+def publish_catalog(directory: str, database_url: str) -> int:
+    """
+    Seed the database if it is empty and publish its rows as a new snapshot
+
+    Returns:
+        The published snapshot version
+    """
+    source = DatabaseCampsiteRepository(database_url, seed_data=CAMPSITES)
+    try:
+        with publish_lock(directory):
+            version, _ = publish_snapshot(directory, source.get_all())
+    finally:
+        source.close()
+    return version
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the API from several worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument(
+        "--snapshot-dir", default=snapshot_directory(),
+        help="Where catalog snapshots are published (default: CAMPSITE_SNAPSHOT_DIR or shared memory)"
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    database_url = os.environ.get(DATABASE_URL_ENV, DEFAULT_DATABASE_URL)
+    version = publish_catalog(args.snapshot_dir, database_url)
+    print(f"Published catalog snapshot v{version} to {args.snapshot_dir}", file=sys.stderr)
+
+    # Workers are started by uvicorn with this environment
+    os.environ[REPOSITORY_TYPE_ENV] = "snapshot"
+    os.environ[SNAPSHOT_DIR_ENV] = args.snapshot_dir
+    os.environ[DATABASE_URL_ENV] = database_url
+
+    import uvicorn
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
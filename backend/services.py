@@ -2,27 +2,414 @@
 Campsite Service Layer - Business Logic with Domain Models
 Now uses Domain DTOs instead of dictionaries
 """
-from typing import List, Optional
-from repositories import CampsiteRepositoryInterface, RepositoryFactory
+import heapq
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from aggregates import CatalogSummary
+from bulk import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ERRORS, ImportReport, export_chunks, import_records
+from columnar import ColumnarCatalog
+from facets import FacetRequest, Facets
+from metrics import timed_operation
+from pricing import PricingRule, StayFactors
+from repositories import (
+    CampsiteRepositoryInterface, AsyncCampsiteRepositoryInterface, RepositoryFactory
+)
+from query import (
+    RELEVANCE_SORT, SORT_OPTIONS, Page, PageRequest, PageStream, Predicate, QueryPlan, QueryPlanner,
+    batched, paginate
+)
+from reservations import (
+    AsyncReservationAdapter, InMemoryReservationRepository, ReservationRepositoryInterface
+)
 from models import (
-    Campsite, CampsiteFilter, UserPreferencesDomain, 
-    CampsiteRecommendation, PriceStatistics, DomainMapper
+    Availability, Campsite, CampsiteFilter, Reservation, TripQuote, UserPreferencesDomain, 
+    CampsiteRecommendation, PriceStatistics, DomainMapper, stay_length
 )
 
 
-class CampsiteService:
+class CampsiteRules:
+    """
+    Business rules shared by CampsiteService and AsyncCampsiteService
+
+    Everything here works on data that was already fetched: filter
+    planning, relevance ordering, recommendation scoring and top-k pruning,
+    quote math and stay validation. The two services only fetch (or await)
+    that data and hand it over, so each rule is written once.
+    """
+    
+    def __init__(self, repository: Any, reservations: Any):
+        self.repository = repository
+        self.reservations = reservations
+        self.mapper = DomainMapper()
+        self.planner = QueryPlanner(self.repository)
+    
+    @property
+    def data_version(self) -> int:
+        """Repository data version, used to invalidate cached responses"""
+        return self.repository.version
+    
+    @property
+    def availability_version(self) -> int:
+        """Reservation data version, for responses that depend on bookings"""
+        return self.reservations.version
+    
+    def _plan_excluding(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        booked: Optional[Iterable[int]]
+    ) -> QueryPlan:
+        """
+        Plan a filter, excluding sites already booked during its stay
+        
+        The booked sites become a single negated id predicate, so
+        repositories resolve availability like any other indexed filter
+        """
+        extra = [Predicate("ids", booked, negate=True)] if booked else []
+        return self.planner.plan(filter_criteria, extra)
+    
+    @staticmethod
+    def _order_by_relevance(campsite_dicts: List[dict], scores: Sequence[float]) -> List[dict]:
+        """Reorder rows by BM25 relevance score, keeping catalog order on ties"""
+        order = sorted(range(len(campsite_dicts)), key=lambda index: -scores[index])
+        return [campsite_dicts[index] for index in order]
+    
+    @staticmethod
+    def _wants_ranking(filter_criteria: CampsiteFilter, page_request: PageRequest, ranked: bool) -> bool:
+        """
+        Whether a page is ordered by search relevance
+        
+        Raises:
+            ValueError: if relevance ranking is combined with order_by
+        """
+        if not (ranked and filter_criteria.search_query):
+            return False
+        if page_request.order_by is not None:
+            raise ValueError("ranked results cannot be combined with order_by")
+        return True
+    
+    def _to_campsites(self, campsite_dicts: Iterable[Dict[str, Any]]) -> List[Campsite]:
+        """Map repository rows to domain objects"""
+        return [self.mapper.dict_to_campsite(data) for data in campsite_dicts]
+    
+    def _map_page(self, page: Page, page_request: PageRequest) -> Page:
+        """Materialize full rows of a page as domain objects; projections stay dicts"""
+        if page_request.fields is None:
+            page.items = [self.mapper.dict_to_campsite(data) for data in page.items]
+        return page
+    
+    @staticmethod
+    def _stream_page(page: Page, batch_size: int) -> PageStream:
+        """Hand an already materialized page back in batches"""
+        return PageStream(batched(page.items, batch_size), page.total, page.next_after)
+    
+    @staticmethod
+    def _price_statistics(summary: CatalogSummary) -> PriceStatistics:
+        """Convert a repository summary to the price statistics domain model"""
+        return PriceStatistics(
+            min_price=summary.min_price,
+            max_price=summary.max_price,
+            average_price=summary.average_price,
+            percentiles=summary.percentiles
+        )
+    
+    @staticmethod
+    def _score_campsite(
+        campsite: Campsite, 
+        preferences: UserPreferencesDomain
+    ) -> Optional[CampsiteRecommendation]:
+        """
+        Score a single campsite against user preferences
+        
+        Returns:
+            CampsiteRecommendation, or None when nothing matched
+        """
+        score = 0.0
+        matching_criteria = []
+        
+        # State preference scoring
+        if preferences.preferred_state:
+            if campsite.state.lower() == preferences.preferred_state.lower():
+                score += 3.0
+                matching_criteria.append("Preferred state match")
+        
+        # Budget scoring
+        if preferences.max_budget:
+            if campsite.is_budget_friendly(preferences.max_budget):
+                score += 2.0
+                matching_criteria.append("Within budget")
+                # Bonus for being significantly under budget
+                budget_ratio = campsite.price_per_night / preferences.max_budget
+                if budget_ratio < 0.7:
+                    score += 1.0
+                    matching_criteria.append("Great value")
+        
+        # Amenity scoring using domain method
+        if preferences.required_amenities:
+            if campsite.has_all_amenities(preferences.required_amenities):
+                score += len(preferences.required_amenities) * 1.5
+                matching_criteria.append(f"All {len(preferences.required_amenities)} required amenities")
+            else:
+                # Partial credit for some amenities
+                amenity_map = {
+                    'water': campsite.has_water,
+                    'electricity': campsite.has_electricity,
+                    'restrooms': campsite.has_restrooms
+                }
+                matched = sum(1 for amenity in preferences.required_amenities 
+                            if amenity_map.get(amenity, False))
+                if matched > 0:
+                    score += matched * 0.5
+                    matching_criteria.append(f"{matched} of {len(preferences.required_amenities)} amenities")
+        
+        # Activity matching (simplified for this example)
+        if preferences.preferred_activities:
+            # Check if description mentions activities
+            description_lower = campsite.description.lower()
+            for activity in preferences.preferred_activities:
+                if activity.lower() in description_lower:
+                    score += 0.5
+                    matching_criteria.append(f"Offers {activity}")
+        
+        if score <= 0:
+            return None
+        return CampsiteRecommendation(
+            campsite=campsite,
+            score=score,
+            matching_criteria=matching_criteria
+        )
+    
+    @staticmethod
+    def _recommendation_partitions(
+        preferences: UserPreferencesDomain
+    ) -> List[Tuple[float, QueryPlan]]:
+        """
+        Split the catalog by preferred-state match and budget fit
+        
+        Each partition carries an upper bound on the score any of its rows
+        can reach, so partitions can be visited best-first and skipped once
+        the current top-k cannot be beaten
+        
+        Returns:
+            (score upper bound, query plan) pairs, highest bound first
+        """
+        shared_bound = (len(preferences.required_amenities) * 1.5 
+                        + len(preferences.preferred_activities) * 0.5)
+        state_options: List[Tuple[float, List[Predicate]]] = [(0.0, [])]
+        if preferences.preferred_state:
+            state = Predicate("state", preferences.preferred_state.casefold())
+            state_options = [(3.0, [state]), (0.0, [Predicate(state.field, state.value, negate=True)])]
+        budget_options: List[Tuple[float, List[Predicate]]] = [(0.0, [])]
+        if preferences.max_budget:
+            budget = Predicate("price", (None, preferences.max_budget))
+            budget_options = [(3.0, [budget]), (0.0, [Predicate(budget.field, budget.value, negate=True)])]
+        
+        partitions = [
+            (shared_bound + state_bound + budget_bound, QueryPlan(predicates=state_predicates + budget_predicates))
+            for state_bound, state_predicates in state_options
+            for budget_bound, budget_predicates in budget_options
+        ]
+        partitions.sort(key=lambda partition: -partition[0])
+        return partitions
+    
+    @staticmethod
+    def _push_top_k(heap: list, top_k: int, recommendation: CampsiteRecommendation) -> None:
+        """Keep the top_k best recommendations in a min-heap (ties favour lower ids)"""
+        entry = (recommendation.score, -recommendation.campsite.id, recommendation)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    
+    @staticmethod
+    def _can_stop(heap: list, top_k: int, upper_bound: float) -> bool:
+        """True when no row scoring at most upper_bound can enter the top-k"""
+        return upper_bound <= 0 or (len(heap) == top_k and heap[0][0] > upper_bound)
+    
+    def _score_into(
+        self, 
+        heap: list, 
+        top_k: int, 
+        campsite_dicts: Iterable[Dict[str, Any]], 
+        preferences: UserPreferencesDomain
+    ) -> None:
+        """Score one fetched partition into the top-k heap"""
+        for data in campsite_dicts:
+            recommendation = self._score_campsite(self.mapper.dict_to_campsite(data), preferences)
+            if recommendation:
+                self._push_top_k(heap, top_k, recommendation)
+    
+    @staticmethod
+    def _top_k_results(heap: list) -> List[CampsiteRecommendation]:
+        """Recommendations of a top-k heap, best first (ties by lower id)"""
+        return [entry[2] for entry in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+    
+    def _score_all(
+        self, 
+        campsites: Iterable[Campsite], 
+        preferences: UserPreferencesDomain
+    ) -> List[CampsiteRecommendation]:
+        """Score every campsite, best first"""
+        recommendations = []
+        for campsite in campsites:
+            recommendation = self._score_campsite(campsite, preferences)
+            if recommendation:
+                recommendations.append(recommendation)
+        # Sort by score (highest first) using domain model comparison
+        recommendations.sort(reverse=True)
+        return recommendations
+    
+    @staticmethod
+    def _recommend_columnar(
+        catalog: ColumnarCatalog,
+        preferences: UserPreferencesDomain,
+        top_k: Optional[int]
+    ) -> List[CampsiteRecommendation]:
+        """
+        Score the whole catalog as NumPy columns
+        
+        Produces the same scores, criteria and ordering as the per-object
+        paths; only the returned rows are converted to domain objects
+        """
+        scored = catalog.score(
+            preferences.preferred_state,
+            preferences.max_budget,
+            preferences.required_amenities,
+            preferences.preferred_activities,
+            top_k
+        )
+        return [
+            CampsiteRecommendation(
+                campsite=DomainMapper.dict_to_campsite(row),
+                score=score,
+                matching_criteria=criteria
+            )
+            for row, score, criteria in scored
+        ]
+    
+    @staticmethod
+    def _recommendation_order(
+        recommendations: List[CampsiteRecommendation], 
+        sort: str
+    ) -> Tuple[QueryPlan, PageRequest]:
+        """
+        Query plan and page that list recommended campsites in a stored ordering
+        
+        Raises:
+            ValueError: if sort is not one of SORT_OPTIONS
+        """
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_OPTIONS)}")
+        ids = {recommendation.campsite.id for recommendation in recommendations}
+        return QueryPlan(predicates=[Predicate("ids", ids)]), PageRequest(order_by=sort, fields=("id",))
+    
+    @staticmethod
+    def _apply_order(
+        recommendations: List[CampsiteRecommendation], 
+        page: Page
+    ) -> List[CampsiteRecommendation]:
+        """Arrange recommendations in the order of a page of their ids"""
+        by_id = {recommendation.campsite.id: recommendation for recommendation in recommendations}
+        return [by_id[row["id"]] for row in page.items if row["id"] in by_id]
+    
+    @staticmethod
+    def _price_quotes(
+        stays: Sequence[Tuple[int, int, Optional[date]]],
+        rows: Dict[int, Dict[str, Any]],
+        rule: Optional[PricingRule]
+    ) -> List[TripQuote]:
+        """
+        Price stays against already-fetched rows
+        
+        The rule's multipliers are summed once per distinct stay, so each
+        quote costs one multiplication; quotes without a rule equal
+        calculate_trip_cost exactly
+        """
+        factors = StayFactors(rule)
+        quotes = []
+        for campsite_id, nights, check_in in stays:
+            row = rows.get(campsite_id)
+            if row is None:
+                quotes.append(TripQuote(campsite_id=campsite_id, nights=nights, check_in=check_in))
+                continue
+            price = row["price_per_night"]
+            total = price * factors(check_in, nights)
+            quotes.append(TripQuote(
+                campsite_id=campsite_id,
+                nights=nights,
+                check_in=check_in,
+                price_per_night=price,
+                total_cost=total if rule is None else round(total, 2)
+            ))
+        return quotes
+    
+    @staticmethod
+    def _check_range(start: date, end: date) -> None:
+        """
+        Raises:
+            ValueError: if the date range is empty
+        """
+        if end <= start:
+            raise ValueError("end must be after start")
+    
+    @staticmethod
+    def _stay_nights(check_in: date, check_out: date) -> int:
+        """
+        Nights of a bookable stay
+        
+        Raises:
+            ValueError: if the dates are not a valid future stay
+        """
+        nights = stay_length(check_in, check_out)
+        if check_in < date.today():
+            raise ValueError("check_in cannot be in the past")
+        return nights
+    
+    @staticmethod
+    def _reservation_row(
+        campsite: Campsite, 
+        check_in: date, 
+        check_out: date, 
+        guest_name: str, 
+        nights: int
+    ) -> Dict[str, Any]:
+        """Reservation fields for a stay at a campsite, priced by the campsite"""
+        return {
+            "campsite_id": campsite.id,
+            "check_in": check_in,
+            "check_out": check_out,
+            "guest_name": guest_name,
+            "total_cost": campsite.calculate_total_cost(nights),
+        }
+
+
+class CampsiteService(CampsiteRules):
     """Service class for campsite business logic operations using domain models"""
     
-    def __init__(self, repository: Optional[CampsiteRepositoryInterface] = None):
+    def __init__(
+        self, 
+        repository: Optional[CampsiteRepositoryInterface] = None,
+        reservations: Optional[ReservationRepositoryInterface] = None
+    ):
         """
         Initialize service with repository
         
         Args:
             repository: Data access repository (defaults to in-memory)
+            reservations: Reservation repository (defaults to in-memory)
         """
-        self.repository = repository or RepositoryFactory.create_campsite_repository("memory")
-        self.mapper = DomainMapper()
+        super().__init__(
+            repository or RepositoryFactory.create_campsite_repository("memory"),
+            reservations or InMemoryReservationRepository()
+        )
+    
+    def _plan(self, filter_criteria: CampsiteFilter) -> QueryPlan:
+        """Plan a filter; booked sites come from the reservation calendars in one lookup"""
+        booked = None
+        if filter_criteria.has_stay:
+            booked = self.reservations.booked_campsites(filter_criteria.check_in, filter_criteria.check_out)
+        return self._plan_excluding(filter_criteria, booked)
     
+    @timed_operation
     def get_all_campsites(self) -> List[Campsite]:
         """
         Retrieve all available campsites as domain models
@@ -30,9 +417,9 @@ class CampsiteService:
         Returns:
             List of Campsite domain objects
         """
-        campsite_dicts = self.repository.get_all()
-        return [self.mapper.dict_to_campsite(data) for data in campsite_dicts]
+        return self._to_campsites(self.repository.get_all())
     
+    @timed_operation
     def get_campsite_by_id(self, campsite_id: int) -> Optional[Campsite]:
         """
         Find a specific campsite by its ID
@@ -49,43 +436,133 @@ class CampsiteService:
         campsite_dict = self.repository.get_by_id(campsite_id)
         return self.mapper.dict_to_campsite(campsite_dict) if campsite_dict else None
     
-    def filter_campsites(self, filter_criteria: CampsiteFilter) -> List[Campsite]:
+    def _rank_by_relevance(self, query: str, campsite_dicts: List[dict]) -> List[dict]:
+        """Reorder rows by BM25 relevance to the query, keeping catalog order on ties"""
+        return self._order_by_relevance(campsite_dicts, self.repository.relevance(query, campsite_dicts))
+    
+    @timed_operation
+    def filter_campsites(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        ranked: bool = False
+    ) -> List[Campsite]:
         """
         Filter campsites based on domain filter criteria
         
         Args:
             filter_criteria: CampsiteFilter domain object with filtering rules
+            ranked: Order results by search relevance when a search query is set
             
         Returns:
             List of Campsite domain objects matching the criteria
         """
-        # Get all campsites as domain objects
-        all_campsites = self.get_all_campsites()
+        # Push predicates down to the repository, most selective first
+        plan = self._plan(filter_criteria)
+        campsite_dicts = self.repository.execute(plan)
         
-        # Apply domain-level filtering
-        filtered_campsites = [
-            campsite for campsite in all_campsites
-            if filter_criteria.matches_campsite(campsite)
-        ]
+        if ranked and filter_criteria.search_query:
+            campsite_dicts = self._rank_by_relevance(filter_criteria.search_query, campsite_dicts)
         
-        # Apply search if present
-        if filter_criteria.search_query:
-            query_lower = filter_criteria.search_query.lower()
-            filtered_campsites = [
-                campsite for campsite in filtered_campsites
-                if (query_lower in campsite.name.lower() or
-                    query_lower in campsite.description.lower() or
-                    query_lower in campsite.location.lower())
-            ]
+        # Only rows that survive every predicate become domain objects
+        return self._to_campsites(campsite_dicts)
+    
+    @timed_operation
+    def filter_campsites_page(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        page_request: PageRequest, 
+        ranked: bool = False
+    ) -> Page:
+        """
+        Filter campsites and return a single page of the result
+        
+        Args:
+            filter_criteria: CampsiteFilter domain object with filtering rules
+            page_request: Ordering, keyset/offset position, size and projection
+            ranked: Order by search relevance (offset paging only)
+            
+        Returns:
+            Page of Campsite domain objects, or of projected dicts when
+            the request names specific fields
+        """
+        page = self.filter_campsite_rows_page(filter_criteria, page_request, ranked)
+        return self._map_page(page, page_request)
+    
+    @timed_operation
+    def filter_campsite_rows_page(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        page_request: PageRequest, 
+        ranked: bool = False
+    ) -> Page:
+        """
+        Like filter_campsites_page, but leave the page as repository rows
         
-        return filtered_campsites
+        For serializing already-validated rows straight to the response
+        without building domain objects
+        """
+        plan = self._plan(filter_criteria)
+        if self._wants_ranking(filter_criteria, page_request, ranked):
+            campsite_dicts = self._rank_by_relevance(
+                filter_criteria.search_query, self.repository.execute(plan)
+            )
+            return paginate(campsite_dicts, page_request)
+        return self.repository.execute_page(plan, page_request)
     
-    def search_campsites(self, query: str) -> List[Campsite]:
+    @timed_operation
+    def stream_campsites_page(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        page_request: PageRequest, 
+        ranked: bool = False,
+        batch_size: int = 500
+    ) -> PageStream:
+        """
+        Filter campsites and return a page as batches of row dicts
+        
+        Rows skip the domain model entirely so they can be serialized
+        straight from the repository as the response streams
+        
+        Args:
+            filter_criteria: CampsiteFilter domain object with filtering rules
+            page_request: Ordering, keyset/offset position, size and projection
+            ranked: Order by search relevance (materializes the result)
+            batch_size: Rows per batch
+            
+        Returns:
+            PageStream of (projected) row dicts
+        """
+        plan = self._plan(filter_criteria)
+        if self._wants_ranking(filter_criteria, page_request, ranked):
+            campsite_dicts = self._rank_by_relevance(
+                filter_criteria.search_query, self.repository.execute(plan)
+            )
+            return self._stream_page(paginate(campsite_dicts, page_request), batch_size)
+        return self.repository.stream_page(plan, page_request, batch_size)
+    
+    @timed_operation
+    def get_facets(self, filter_criteria: CampsiteFilter, request: FacetRequest) -> Facets:
+        """
+        Per-state, per-amenity and price-bucket counts of the campsites
+        matching a filter, resolved by the repository in one call
+        
+        Args:
+            filter_criteria: CampsiteFilter domain object with filtering rules
+            request: Facets to count and the price bucket edges
+            
+        Returns:
+            Facets of the filtered campsites
+        """
+        return self.repository.facets(self._plan(filter_criteria), request)
+    
+    @timed_operation
+    def search_campsites(self, query: str, ranked: bool = False) -> List[Campsite]:
         """
         Search campsites using domain models
         
         Args:
             query: Search term
+            ranked: Order results by BM25 relevance instead of catalog order
             
         Returns:
             List of matching Campsite domain objects
@@ -94,8 +571,11 @@ class CampsiteService:
             return self.get_all_campsites()
         
         campsite_dicts = self.repository.search(query.strip())
-        return [self.mapper.dict_to_campsite(data) for data in campsite_dicts]
+        if ranked:
+            campsite_dicts = self._rank_by_relevance(query.strip(), campsite_dicts)
+        return self._to_campsites(campsite_dicts)
     
+    @timed_operation
     def get_available_states(self) -> List[str]:
         """
         Get list of all unique states that have campsites
@@ -105,6 +585,7 @@ class CampsiteService:
         """
         return self.repository.get_states()
     
+    @timed_operation
     def get_campsite_count(self) -> int:
         """
         Get total number of available campsites
@@ -114,16 +595,30 @@ class CampsiteService:
         """
         return self.repository.count()
     
+    @timed_operation
     def get_price_statistics(self) -> PriceStatistics:
         """
         Get price statistics using domain model
         
+        Reads the repository's maintained aggregates rather than mapping
+        the whole catalog
+        
         Returns:
             PriceStatistics domain object
         """
-        campsites = self.get_all_campsites()
-        return PriceStatistics.from_campsites(campsites)
+        return self._price_statistics(self.repository.summary())
     
+    @timed_operation
+    def get_state_counts(self) -> Dict[str, int]:
+        """
+        Get the number of campsites in each state
+        
+        Returns:
+            Mapping of state name to campsite count, in state order
+        """
+        return self.repository.summary().state_counts
+    
+    @timed_operation
     def get_campsites_by_price_range(
         self, 
         min_price: Optional[float] = None, 
@@ -142,82 +637,78 @@ class CampsiteService:
         filter_criteria = CampsiteFilter(min_price=min_price, max_price=max_price)
         return self.filter_campsites(filter_criteria)
     
-    def get_recommended_campsites(
+    @timed_operation
+    def get_top_recommended_campsites(
         self, 
-        preferences: UserPreferencesDomain
+        preferences: UserPreferencesDomain, 
+        top_k: int
     ) -> List[CampsiteRecommendation]:
         """
-        Get recommended campsites based on user preferences using domain models
+        Get the top_k recommendations without scoring the whole catalog
+        
+        Partitions are fetched through the repository's indexes best bound
+        first and scored into a bounded heap, stopping once the remaining
+        partitions cannot beat the current k-th score. Equal scores are
+        ordered by campsite id.
         
         Args:
             preferences: UserPreferencesDomain object
+            top_k: Maximum number of recommendations to return
             
         Returns:
-            List of CampsiteRecommendation objects sorted by score
+            Up to top_k CampsiteRecommendation objects sorted by score
         """
-        all_campsites = self.get_all_campsites()
-        recommendations = []
+        heap: list = []
+        for upper_bound, plan in self._recommendation_partitions(preferences):
+            if self._can_stop(heap, top_k, upper_bound):
+                break
+            self._score_into(heap, top_k, self.repository.execute(plan), preferences)
+        return self._top_k_results(heap)
+    
+    @timed_operation
+    def get_recommended_campsites(
+        self, 
+        preferences: UserPreferencesDomain, 
+        top_k: Optional[int] = None,
+        sort: str = RELEVANCE_SORT
+    ) -> List[CampsiteRecommendation]:
+        """
+        Get recommended campsites based on user preferences using domain models
         
-        for campsite in all_campsites:
-            score = 0.0
-            matching_criteria = []
-            
-            # State preference scoring
-            if preferences.preferred_state:
-                if campsite.state.lower() == preferences.preferred_state.lower():
-                    score += 3.0
-                    matching_criteria.append("Preferred state match")
-            
-            # Budget scoring
-            if preferences.max_budget:
-                if campsite.is_budget_friendly(preferences.max_budget):
-                    score += 2.0
-                    matching_criteria.append("Within budget")
-                    # Bonus for being significantly under budget
-                    budget_ratio = campsite.price_per_night / preferences.max_budget
-                    if budget_ratio < 0.7:
-                        score += 1.0
-                        matching_criteria.append("Great value")
-            
-            # Amenity scoring using domain method
-            if preferences.required_amenities:
-                if campsite.has_all_amenities(preferences.required_amenities):
-                    score += len(preferences.required_amenities) * 1.5
-                    matching_criteria.append(f"All {len(preferences.required_amenities)} required amenities")
-                else:
-                    # Partial credit for some amenities
-                    amenity_map = {
-                        'water': campsite.has_water,
-                        'electricity': campsite.has_electricity,
-                        'restrooms': campsite.has_restrooms
-                    }
-                    matched = sum(1 for amenity in preferences.required_amenities 
-                                if amenity_map.get(amenity, False))
-                    if matched > 0:
-                        score += matched * 0.5
-                        matching_criteria.append(f"{matched} of {len(preferences.required_amenities)} amenities")
-            
-            # Activity matching (simplified for this example)
-            if preferences.preferred_activities:
-                # Check if description mentions activities
-                description_lower = campsite.description.lower()
-                for activity in preferences.preferred_activities:
-                    if activity.lower() in description_lower:
-                        score += 0.5
-                        matching_criteria.append(f"Offers {activity}")
-            
-            if score > 0:
-                recommendations.append(CampsiteRecommendation(
-                    campsite=campsite,
-                    score=score,
-                    matching_criteria=matching_criteria
-                ))
+        top_k always keeps the best scores; another sort then reorders them
+        by paging their ids through the repository's pre-sorted ordering
         
-        # Sort by score (highest first) using domain model comparison
-        recommendations.sort(reverse=True)
+        Args:
+            preferences: UserPreferencesDomain object
+            top_k: Return only the best top_k recommendations
+            sort: "score" (best first) or a stored ordering from SORT_OPTIONS
+            
+        Returns:
+            List of CampsiteRecommendation objects in sort order
         
-        return recommendations
+        Raises:
+            ValueError: if sort is not one of SORT_OPTIONS
+        """
+        recommendations = self._score_recommendations(preferences, top_k)
+        if sort == RELEVANCE_SORT:
+            return recommendations
+        page = self.repository.execute_page(*self._recommendation_order(recommendations, sort))
+        return self._apply_order(recommendations, page)
+    
+    def _score_recommendations(
+        self, 
+        preferences: UserPreferencesDomain, 
+        top_k: Optional[int]
+    ) -> List[CampsiteRecommendation]:
+        """Recommendations sorted by score, through the fastest available path"""
+        catalog = self.repository.columnar()
+        if catalog is not None:
+            return self._recommend_columnar(catalog, preferences, top_k)
+        if top_k is not None:
+            return self.get_top_recommended_campsites(preferences, top_k)
+        return self._score_all(self.get_all_campsites(), preferences)
     
+    @timed_operation
     def calculate_trip_cost(self, campsite_id: int, nights: int) -> Optional[float]:
         """
         Calculate total cost for a trip using domain logic
@@ -230,4 +721,447 @@ class CampsiteService:
             Total cost or None if campsite not found
         """
         campsite = self.get_campsite_by_id(campsite_id)
-        return campsite.calculate_total_cost(nights) if campsite else None
\ No newline at end of file
+        return campsite.calculate_total_cost(nights) if campsite else None
+    
+    @timed_operation
+    def quote_trips(
+        self, 
+        stays: Sequence[Tuple[int, int, Optional[date]]], 
+        rule: Optional[PricingRule] = None
+    ) -> List[TripQuote]:
+        """
+        Price many stays with a single repository multi-get
+        
+        Args:
+            stays: (campsite_id, nights, check_in) triples; check_in may be
+                None when no pricing rule is given
+            rule: Optional weekday/weekend and seasonal pricing rule
+            
+        Returns:
+            One TripQuote per stay, in order; unknown campsites get a quote
+            without a price
+            
+        Raises:
+            ValueError: if a rule is given for a stay without a check_in
+        """
+        rows = self.repository.get_many([campsite_id for campsite_id, _, _ in stays])
+        return self._price_quotes(stays, rows, rule)
+    
+    @timed_operation
+    def get_availability(self, campsite_id: int, start: date, end: date) -> Optional[Availability]:
+        """
+        Booked nights of a campsite over a date range
+        
+        Args:
+            campsite_id: Campsite identifier
+            start: First night to report
+            end: Night after the last one to report
+            
+        Returns:
+            Availability, or None if campsite not found
+        """
+        self._check_range(start, end)
+        if self.repository.get_by_id(campsite_id) is None:
+            return None
+        # Read the version first, so it is never newer than the nights
+        version = self.reservations.calendar_version(campsite_id)
+        return Availability(
+            campsite_id=campsite_id,
+            start=start,
+            end=end,
+            booked_nights=self.reservations.booked_nights(campsite_id, start, end),
+            version=version
+        )
+    
+    @timed_operation
+    def book_campsite(
+        self, 
+        campsite_id: int, 
+        check_in: date, 
+        check_out: date, 
+        guest_name: str,
+        expected_version: Optional[int] = None
+    ) -> Optional[Reservation]:
+        """
+        Reserve a campsite for a stay
+        
+        Args:
+            campsite_id: Campsite identifier
+            check_in: Arrival date (first night)
+            check_out: Departure date
+            guest_name: Name the booking is held under
+            expected_version: Calendar version from a previous availability
+                lookup; the booking fails if the calendar changed since
+            
+        Returns:
+            The new Reservation, or None if campsite not found
+            
+        Raises:
+            ValueError: if the dates are not a valid future stay
+            ReservationConflict: if the site is taken for any of the nights
+        """
+        nights = self._stay_nights(check_in, check_out)
+        campsite = self.get_campsite_by_id(campsite_id)
+        if campsite is None:
+            return None
+        row = self.reservations.book(
+            self._reservation_row(campsite, check_in, check_out, guest_name, nights), expected_version
+        )
+        return self.mapper.dict_to_reservation(row)
+    
+    @timed_operation
+    def get_reservation(self, reservation_id: int) -> Optional[Reservation]:
+        """Find a reservation by its ID"""
+        row = self.reservations.get(reservation_id)
+        return self.mapper.dict_to_reservation(row) if row else None
+    
+    @timed_operation
+    def cancel_reservation(self, reservation_id: int) -> bool:
+        """
+        Cancel a reservation, freeing its nights
+        
+        Returns:
+            True if the reservation existed
+        """
+        return self.reservations.cancel(reservation_id)
+    
+    @timed_operation
+    def create_campsite(self, data: Dict[str, Any]) -> Campsite:
+        """
+        Add a campsite to the catalog
+        
+        Args:
+            data: Campsite fields without an id
+            
+        Returns:
+            The created Campsite with its assigned id
+        """
+        return self.mapper.dict_to_campsite(self.repository.create(data))
+    
+    @timed_operation
+    def update_campsite(self, campsite_id: int, changes: Dict[str, Any]) -> Optional[Campsite]:
+        """
+        Apply partial changes to a campsite
+        
+        Args:
+            campsite_id: Campsite identifier
+            changes: Fields to overwrite
+            
+        Returns:
+            The updated Campsite, or None if campsite not found
+        """
+        row = self.repository.update(campsite_id, changes)
+        return self.mapper.dict_to_campsite(row) if row else None
+    
+    @timed_operation
+    def delete_campsite(self, campsite_id: int) -> bool:
+        """
+        Remove a campsite from the catalog
+        
+        Returns:
+            True if the campsite existed
+        """
+        return self.repository.delete(campsite_id)
+    
+    @timed_operation
+    def import_campsites(
+        self, 
+        records: Iterable[Tuple[int, Any]], 
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_errors: int = DEFAULT_MAX_ERRORS
+    ) -> ImportReport:
+        """
+        Validate and bulk-insert raw campsite records
+        
+        Args:
+            records: (line number, raw record) pairs from bulk.read_records
+            batch_size: Records validated per batch
+            max_errors: Error details kept in the report
+            
+        Returns:
+            ImportReport with imported/failed counts and error details
+        """
+        return import_records(self.repository, records, batch_size, max_errors)
+    
+    @timed_operation
+    def export_campsites(self, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+        """
+        Serialize the whole catalog as NDJSON or CSV text chunks
+        
+        Args:
+            fmt: "ndjson" or "csv"
+            batch_size: Rows serialized per chunk
+        """
+        return export_chunks(self.repository.iter_batches(batch_size), fmt)
+
+
+class AsyncCampsiteService(CampsiteRules):
+    """
+    Asynchronous counterpart of CampsiteService
+    Awaits an AsyncCampsiteRepositoryInterface; every business rule comes
+    from CampsiteRules, so methods here only await data and pass it on
+    """
+    
+    def __init__(
+        self, 
+        repository: AsyncCampsiteRepositoryInterface,
+        reservations: Optional[AsyncReservationAdapter] = None
+    ):
+        """
+        Initialize service with an async repository
+        
+        Args:
+            repository: Asynchronous data access repository
+            reservations: Awaitable reservation repository (defaults to in-memory)
+        """
+        super().__init__(repository, reservations or AsyncReservationAdapter(InMemoryReservationRepository()))
+    
+    async def _plan(self, filter_criteria: CampsiteFilter) -> QueryPlan:
+        """Plan a filter, excluding sites already booked during its stay"""
+        booked = None
+        if filter_criteria.has_stay:
+            booked = await self.reservations.booked_campsites(
+                filter_criteria.check_in, filter_criteria.check_out
+            )
+        return self._plan_excluding(filter_criteria, booked)
+    
+    @timed_operation
+    async def get_all_campsites(self) -> List[Campsite]:
+        """Retrieve all available campsites as domain models"""
+        return self._to_campsites(await self.repository.get_all())
+    
+    @timed_operation
+    async def get_campsite_by_id(self, campsite_id: int) -> Optional[Campsite]:
+        """Find a specific campsite by its ID"""
+        if campsite_id <= 0:
+            return None
+        
+        campsite_dict = await self.repository.get_by_id(campsite_id)
+        return self.mapper.dict_to_campsite(campsite_dict) if campsite_dict else None
+    
+    async def _rank_by_relevance(self, query: str, campsite_dicts: List[dict]) -> List[dict]:
+        """Reorder rows by BM25 relevance to the query, keeping catalog order on ties"""
+        return self._order_by_relevance(campsite_dicts, await self.repository.relevance(query, campsite_dicts))
+    
+    @timed_operation
+    async def filter_campsites(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        ranked: bool = False
+    ) -> List[Campsite]:
+        """Filter campsites based on domain filter criteria"""
+        plan = await self._plan(filter_criteria)
+        campsite_dicts = await self.repository.execute(plan)
+        
+        if ranked and filter_criteria.search_query:
+            campsite_dicts = await self._rank_by_relevance(filter_criteria.search_query, campsite_dicts)
+        
+        return self._to_campsites(campsite_dicts)
+    
+    @timed_operation
+    async def filter_campsites_page(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        page_request: PageRequest, 
+        ranked: bool = False
+    ) -> Page:
+        """Filter campsites and return a single page of the result"""
+        page = await self.filter_campsite_rows_page(filter_criteria, page_request, ranked)
+        return self._map_page(page, page_request)
+    
+    @timed_operation
+    async def filter_campsite_rows_page(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        page_request: PageRequest, 
+        ranked: bool = False
+    ) -> Page:
+        """Filter campsites and return a page of repository rows, without domain mapping"""
+        plan = await self._plan(filter_criteria)
+        if self._wants_ranking(filter_criteria, page_request, ranked):
+            campsite_dicts = await self._rank_by_relevance(
+                filter_criteria.search_query, await self.repository.execute(plan)
+            )
+            return paginate(campsite_dicts, page_request)
+        return await self.repository.execute_page(plan, page_request)
+    
+    @timed_operation
+    async def stream_campsites_page(
+        self, 
+        filter_criteria: CampsiteFilter, 
+        page_request: PageRequest, 
+        ranked: bool = False,
+        batch_size: int = 500
+    ) -> PageStream:
+        """Filter campsites and return a page as batches of row dicts for streaming"""
+        plan = await self._plan(filter_criteria)
+        if self._wants_ranking(filter_criteria, page_request, ranked):
+            campsite_dicts = await self._rank_by_relevance(
+                filter_criteria.search_query, await self.repository.execute(plan)
+            )
+            return self._stream_page(paginate(campsite_dicts, page_request), batch_size)
+        return await self.repository.stream_page(plan, page_request, batch_size)
+    
+    @timed_operation
+    async def get_facets(self, filter_criteria: CampsiteFilter, request: FacetRequest) -> Facets:
+        """Facet counts of the campsites matching a filter"""
+        return await self.repository.facets(await self._plan(filter_criteria), request)
+    
+    @timed_operation
+    async def search_campsites(self, query: str, ranked: bool = False) -> List[Campsite]:
+        """Search campsites using domain models"""
+        if not query or not query.strip():
+            return await self.get_all_campsites()
+        
+        campsite_dicts = await self.repository.search(query.strip())
+        if ranked:
+            campsite_dicts = await self._rank_by_relevance(query.strip(), campsite_dicts)
+        return self._to_campsites(campsite_dicts)
+    
+    @timed_operation
+    async def get_available_states(self) -> List[str]:
+        """Get sorted list of all unique states that have campsites"""
+        return await self.repository.get_states()
+    
+    @timed_operation
+    async def get_campsite_count(self) -> int:
+        """Get total number of available campsites"""
+        return await self.repository.count()
+    
+    @timed_operation
+    async def get_price_statistics(self) -> PriceStatistics:
+        """Get price statistics from the repository's maintained aggregates"""
+        return self._price_statistics(await self.repository.summary())
+    
+    @timed_operation
+    async def get_state_counts(self) -> Dict[str, int]:
+        """Get the number of campsites in each state"""
+        return (await self.repository.summary()).state_counts
+    
+    @timed_operation
+    async def get_campsites_by_price_range(
+        self, 
+        min_price: Optional[float] = None, 
+        max_price: Optional[float] = None
+    ) -> List[Campsite]:
+        """Get campsites within a specific price range using domain logic"""
+        filter_criteria = CampsiteFilter(min_price=min_price, max_price=max_price)
+        return await self.filter_campsites(filter_criteria)
+    
+    @timed_operation
+    async def get_top_recommended_campsites(
+        self, 
+        preferences: UserPreferencesDomain, 
+        top_k: int
+    ) -> List[CampsiteRecommendation]:
+        """Get the top_k recommendations by visiting index partitions best-first"""
+        heap: list = []
+        for upper_bound, plan in self._recommendation_partitions(preferences):
+            if self._can_stop(heap, top_k, upper_bound):
+                break
+            self._score_into(heap, top_k, await self.repository.execute(plan), preferences)
+        return self._top_k_results(heap)
+    
+    @timed_operation
+    async def get_recommended_campsites(
+        self, 
+        preferences: UserPreferencesDomain, 
+        top_k: Optional[int] = None,
+        sort: str = RELEVANCE_SORT
+    ) -> List[CampsiteRecommendation]:
+        """Get recommended campsites, optionally only the top_k, in sort order"""
+        recommendations = await self._score_recommendations(preferences, top_k)
+        if sort == RELEVANCE_SORT:
+            return recommendations
+        page = await self.repository.execute_page(*self._recommendation_order(recommendations, sort))
+        return self._apply_order(recommendations, page)
+    
+    async def _score_recommendations(
+        self, 
+        preferences: UserPreferencesDomain, 
+        top_k: Optional[int]
+    ) -> List[CampsiteRecommendation]:
+        """Recommendations sorted by score, through the fastest available path"""
+        catalog = self.repository.columnar()
+        if catalog is not None:
+            return self._recommend_columnar(catalog, preferences, top_k)
+        if top_k is not None:
+            return await self.get_top_recommended_campsites(preferences, top_k)
+        return self._score_all(await self.get_all_campsites(), preferences)
+    
+    @timed_operation
+    async def calculate_trip_cost(self, campsite_id: int, nights: int) -> Optional[float]:
+        """Calculate total cost for a trip using domain logic"""
+        campsite = await self.get_campsite_by_id(campsite_id)
+        return campsite.calculate_total_cost(nights) if campsite else None
+    
+    @timed_operation
+    async def quote_trips(
+        self, 
+        stays: Sequence[Tuple[int, int, Optional[date]]], 
+        rule: Optional[PricingRule] = None
+    ) -> List[TripQuote]:
+        """Price many stays with a single repository multi-get"""
+        rows = await self.repository.get_many([campsite_id for campsite_id, _, _ in stays])
+        return self._price_quotes(stays, rows, rule)
+    
+    @timed_operation
+    async def get_availability(self, campsite_id: int, start: date, end: date) -> Optional[Availability]:
+        """Booked nights of a campsite over a date range, None if campsite not found"""
+        self._check_range(start, end)
+        if await self.repository.get_by_id(campsite_id) is None:
+            return None
+        version = await self.reservations.calendar_version(campsite_id)
+        return Availability(
+            campsite_id=campsite_id,
+            start=start,
+            end=end,
+            booked_nights=await self.reservations.booked_nights(campsite_id, start, end),
+            version=version
+        )
+    
+    @timed_operation
+    async def book_campsite(
+        self, 
+        campsite_id: int, 
+        check_in: date, 
+        check_out: date, 
+        guest_name: str,
+        expected_version: Optional[int] = None
+    ) -> Optional[Reservation]:
+        """Reserve a campsite for a stay, None if campsite not found"""
+        nights = self._stay_nights(check_in, check_out)
+        campsite = await self.get_campsite_by_id(campsite_id)
+        if campsite is None:
+            return None
+        row = await self.reservations.book(
+            self._reservation_row(campsite, check_in, check_out, guest_name, nights), expected_version
+        )
+        return self.mapper.dict_to_reservation(row)
+    
+    @timed_operation
+    async def get_reservation(self, reservation_id: int) -> Optional[Reservation]:
+        """Find a reservation by its ID"""
+        row = await self.reservations.get(reservation_id)
+        return self.mapper.dict_to_reservation(row) if row else None
+    
+    @timed_operation
+    async def cancel_reservation(self, reservation_id: int) -> bool:
+        """Cancel a reservation, freeing its nights"""
+        return await self.reservations.cancel(reservation_id)
+    
+    @timed_operation
+    async def create_campsite(self, data: Dict[str, Any]) -> Campsite:
+        """Add a campsite to the catalog"""
+        return self.mapper.dict_to_campsite(await self.repository.create(data))
+    
+    @timed_operation
+    async def update_campsite(self, campsite_id: int, changes: Dict[str, Any]) -> Optional[Campsite]:
+        """Apply partial changes to a campsite"""
+        row = await self.repository.update(campsite_id, changes)
+        return self.mapper.dict_to_campsite(row) if row else None
+    
+    @timed_operation
+    async def delete_campsite(self, campsite_id: int) -> bool:
+        """Remove a campsite from the catalog"""
+        return await self.repository.delete(campsite_id)
@@ -0,0 +1,603 @@
+"""
+Shared Catalog Snapshots
+Immutable, versioned catalog files that every worker process maps into
+memory instead of building its own copy of the rows and columns
+
+A snapshot is a compact binary catalog: fixed-width little-endian columns
+(ids, prices, amenity bits, state codes, coordinates), a string heap that
+holds each distinct name, description, location and image URL once, and
+prebuilt index sections (id lookup, a permutation per page ordering,
+per-state postings and the lower-cased text searched by substring), all addressed by offsets in
+a small JSON header. Opening one maps the file and parses the header,
+nothing more, so a cold start takes milliseconds at any catalog size.
+Columns are NumPy views over the mapping, rows are assembled from the
+columns and the heap only when returned, and the operating system pages
+sections in as they are touched and keeps one copy in its page cache
+however many processes read it.
+
+Publishing writes a new file and then atomically replaces a small CURRENT
+pointer naming it. Readers notice the pointer change and switch to the new
+snapshot as a whole, so they never see a half-written catalog. Publishers
+serialize on a lock file, which keeps versions increasing across processes.
+A snapshot can also be written as a standalone catalog file and served
+without a pointer, see write_catalog.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from aggregates import CatalogAggregates, CatalogSummary
+from columnar import AMENITY_FIELD_BITS, ColumnarCatalog, ordering_permutation
+from models import compact_row
+from query import TEXT_FIELDS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+SNAPSHOT_DIR_ENV = "CAMPSITE_SNAPSHOT_DIR"
+# tmpfs when available, so snapshots live in shared memory rather than on disk
+DEFAULT_SNAPSHOT_DIR = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "campsite-catalog"
+)
+POINTER_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+MAGIC = b"CAMPSNAP"
+FORMAT_VERSION = 3
+# Magic, format version, header length
+PREAMBLE = struct.Struct("<8sII")
+# Older snapshots kept for workers that read the pointer but have not opened them yet
+KEEP_PREVIOUS = 2
+
+# Column sections: (name, NumPy dtype)
+COLUMNS = (
+    ("ids", "<i8"),
+    ("prices", "<f8"),
+    ("amenities", "u1"),
+    ("state_codes", "<i4"),
+    ("latitudes", "<f8"),
+    ("longitudes", "<f8"),
+)
+# Text fields kept in the string heap; each has a "<field>_refs" column of
+# heap indexes. States are few and live in the header instead
+STRING_FIELDS = ("name", "description", "location", "image_url")
+STRING_REF_DTYPE = "<u4"
+# Index sections built when the snapshot is written
+INDEXES = (
+    ("sorted_ids", "<i8"),
+    ("id_positions", "<i8"),
+    ("price_order", "<i8"),
+    ("price_desc_order", "<i8"),
+    ("name_order", "<i8"),
+    ("state_order", "<i8"),
+    ("state_offsets", "<i8"),
+    ("state_positions", "<i8"),
+)
+# Index section holding each page ordering (query.ORDERINGS) as positions
+ORDER_SECTIONS = {
+    "id": "id_positions",
+    "price": "price_order",
+    "-price": "price_desc_order",
+    "name": "name_order",
+    "state": "state_order",
+}
+# Start and end of one heap string, read straight from "string_offsets"
+STRING_BOUNDS = struct.Struct("<qq")
+# struct formats reading single values of the fixed-width sections
+SCALARS = {"<i8": "<q", "<f8": "<d", "u1": "<B", "<i4": "<i", STRING_REF_DTYPE: "<I"}
+
+WATER = AMENITY_FIELD_BITS["has_water"]
+ELECTRICITY = AMENITY_FIELD_BITS["has_electricity"]
+RESTROOMS = AMENITY_FIELD_BITS["has_restrooms"]
+
+
+def snapshot_directory() -> str:
+    """Directory holding the snapshots: CAMPSITE_SNAPSHOT_DIR or a shared-memory default"""
+    return os.environ.get(SNAPSHOT_DIR_ENV, DEFAULT_SNAPSHOT_DIR)
+
+
+def _snapshot_name(version: int) -> str:
+    return f"catalog-{version:012d}.snap"
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _records(values: Sequence[bytes]) -> Tuple[bytes, "np.ndarray"]:
+    """Concatenate byte strings, returning the blob and its n+1 boundaries"""
+    offsets = np.zeros(len(values) + 1, dtype="<i8")
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    return b"".join(values), offsets
+
+
+def encode_snapshot(rows: Sequence[Dict[str, Any]], version: int) -> bytes:
+    """
+    Serialize catalog rows into the snapshot format
+
+    Args:
+        rows: Campsite rows in catalog order
+        version: Snapshot version recorded in the header
+
+    Returns:
+        The complete file contents
+    """
+    if np is None:
+        raise RuntimeError("Catalog snapshots require the 'numpy' package")
+    # Normalize states as every writable repository does on write
+    rows = [compact_row(row) for row in rows]
+    count = len(rows)
+    states: Dict[str, int] = {}
+    columns = {
+        "ids": np.fromiter((row["id"] for row in rows), dtype="<i8", count=count),
+        "prices": np.fromiter((row["price_per_night"] for row in rows), dtype="<f8", count=count),
+        "amenities": np.fromiter(
+            (sum(bit for field, bit in AMENITY_FIELD_BITS.items() if row[field]) for row in rows),
+            dtype="u1", count=count
+        ),
+        "state_codes": np.fromiter(
+            (states.setdefault(row["state"], len(states)) for row in rows), dtype="<i4", count=count
+        ),
+    }
+    for column, field in (("latitudes", "latitude"), ("longitudes", "longitude")):
+        columns[column] = np.fromiter(
+            (np.nan if row.get("latitude") is None or row.get("longitude") is None else row[field]
+             for row in rows),
+            dtype="<f8", count=count
+        )
+
+    # String heap: every distinct value once, however many rows share it
+    strings: Dict[str, int] = {}
+    for field in STRING_FIELDS:
+        columns[f"{field}_refs"] = np.fromiter(
+            (strings.setdefault(row[field], len(strings)) for row in rows), dtype=STRING_REF_DTYPE, count=count
+        )
+    heap, string_offsets = _records([value.encode("utf-8") for value in strings])
+
+    # Id index: ids in ascending order and the catalog position of each
+    columns["id_positions"] = np.argsort(columns["ids"], kind="stable").astype("<i8")
+    columns["sorted_ids"] = columns["ids"][columns["id_positions"]]
+    # Positions in every other page ordering, e.g. (price, id) for "price"
+    sort_columns = {
+        "ids": columns["ids"],
+        "prices": columns["prices"],
+        "names": np.array([row["name"] for row in rows], dtype=str),
+        "states": np.array([row["state"] for row in rows], dtype=str),
+    }
+    for order_by, section in ORDER_SECTIONS.items():
+        if section not in columns:
+            columns[section] = ordering_permutation(order_by, sort_columns).astype("<i8")
+    # Per-state postings: positions grouped by state code, in catalog order
+    # within a state, and each state's start in that list
+    columns["state_positions"] = np.argsort(columns["state_codes"], kind="stable").astype("<i8")
+    columns["state_offsets"] = np.zeros(len(states) + 1, dtype="<i8")
+    np.cumsum(np.bincount(columns["state_codes"], minlength=len(states)), out=columns["state_offsets"][1:])
+
+    sections: List[Tuple[str, bytes]] = [(name, columns[name].tobytes()) for name, _ in COLUMNS]
+    sections.extend((f"{field}_refs", columns[f"{field}_refs"].tobytes()) for field in STRING_FIELDS)
+    sections.extend((name, columns[name].tobytes()) for name, _ in INDEXES)
+    sections.append(("string_offsets", string_offsets.tobytes()))
+    sections.append(("strings", heap))
+    for field in TEXT_FIELDS:
+        # A trailing NUL per value keeps a match from spanning two rows
+        blob, offsets = _records([row[field].lower().encode("utf-8") + b"\0" for row in rows])
+        sections.append((f"{field}_offsets", offsets.tobytes()))
+        sections.append((f"{field}_text", blob))
+
+    summary = CatalogAggregates.from_rows(rows).summary()
+    layout: Dict[str, Tuple[int, int]] = {}
+    header = b""
+    # The header records section offsets, which depend on the header's own
+    # length; iterate until the length is stable
+    while True:
+        offset = _align(PREAMBLE.size + len(header))
+        for name, data in sections:
+            layout[name] = (offset, len(data))
+            offset = _align(offset + len(data))
+        candidate = json.dumps({
+            "version": version,
+            "count": count,
+            "states": list(states),
+            "summary": asdict(summary),
+            "sections": layout,
+        }, separators=(",", ":")).encode("utf-8")
+        stable = len(candidate) == len(header)
+        header = candidate
+        if stable:
+            break
+
+    parts = [PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)), header]
+    position = PREAMBLE.size + len(header)
+    for name, data in sections:
+        start = layout[name][0]
+        parts.append(b"\0" * (start - position))
+        parts.append(data)
+        position = start + len(data)
+    return b"".join(parts)
+
+
+def _record(
+    campsite_id: int,
+    name: str,
+    description: str,
+    location: str,
+    state: str,
+    amenities: int,
+    price: float,
+    image_url: str,
+    latitude: float,
+    longitude: float
+) -> Dict[str, Any]:
+    """A catalog row from its decoded values (NaN coordinates mean unlocated)"""
+    located = latitude == latitude and longitude == longitude
+    return {
+        "id": campsite_id,
+        "name": name,
+        "description": description,
+        "location": location,
+        "state": state,
+        "has_water": bool(amenities & WATER),
+        "has_electricity": bool(amenities & ELECTRICITY),
+        "has_restrooms": bool(amenities & RESTROOMS),
+        "price_per_night": price,
+        "image_url": image_url,
+        "latitude": latitude if located else None,
+        "longitude": longitude if located else None,
+    }
+
+
+class SnapshotRows(Sequence):
+    """Read-only row sequence over a snapshot, assembling each row on access"""
+
+    def __init__(self, snapshot: "CatalogSnapshot"):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self.take(np.arange(*position.indices(len(self))))
+        position = int(position)
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("snapshot row index out of range")
+        return self._snapshot.row(position)
+
+    def take(self, positions: Any) -> List[Dict[str, Any]]:
+        """Rows at several positions, decoded column by column"""
+        return self._snapshot.take(positions)
+
+
+class CatalogSnapshot:
+    """A mapped snapshot file: header, zero-copy columns and indexes, lazily assembled rows"""
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file
+
+        Raises:
+            ValueError: if the file is not a snapshot of a supported format
+        """
+        if np is None:
+            raise RuntimeError("Catalog snapshots require the 'numpy' package")
+        with open(path, "rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, header_length = PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} catalog snapshot")
+        header = json.loads(buffer[PREAMBLE.size:PREAMBLE.size + header_length])
+        self.path = path
+        self.version: int = header["version"]
+        self.count: int = header["count"]
+        self.states: List[str] = header["states"]
+        self.summary = CatalogSummary(**header["summary"])
+        self._buffer = buffer
+        self._sections: Dict[str, Tuple[int, int]] = {
+            name: tuple(bounds) for name, bounds in header["sections"].items()
+        }
+        self.columns = {name: self._array(name, dtype) for name, dtype in COLUMNS}
+        self._refs = {field: self._array(f"{field}_refs", STRING_REF_DTYPE) for field in STRING_FIELDS}
+        self._indexes = {name: self._array(name, dtype) for name, dtype in INDEXES}
+        # (section start, reader) of every fixed-width value a row needs, in
+        # the order row() unpacks them
+        self._scalars = [
+            (self._sections[section][0], struct.Struct(SCALARS[dtype]))
+            for section, dtype in (
+                list(COLUMNS) + [(f"{field}_refs", STRING_REF_DTYPE) for field in STRING_FIELDS]
+            )
+        ]
+        self._string_offsets = self._sections["string_offsets"][0]
+        self._heap = self._sections["strings"][0]
+        self.rows = SnapshotRows(self)
+        self._text = {
+            field: (self._array(f"{field}_offsets", "<i8"), self._sections[f"{field}_text"])
+            for field in TEXT_FIELDS
+        }
+
+    def _array(self, name: str, dtype: str) -> "np.ndarray":
+        offset, length = self._sections[name]
+        return np.frombuffer(self._buffer, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+    def string(self, index: int) -> str:
+        """A string of the heap by index"""
+        start, end = STRING_BOUNDS.unpack_from(self._buffer, self._string_offsets + 8 * index)
+        return self._buffer[self._heap + start:self._heap + end].decode("utf-8")
+
+    def row(self, position: int) -> Dict[str, Any]:
+        """Assemble the row at a catalog position from single-value reads"""
+        buffer = self._buffer
+        (
+            campsite_id, price, amenities, state_code, latitude, longitude,
+            name, description, location, image_url
+        ) = [reader.unpack_from(buffer, offset + reader.size * position)[0] for offset, reader in self._scalars]
+        string = self.string
+        return _record(
+            campsite_id, string(name), string(description), string(location), self.states[state_code],
+            amenities, price, string(image_url), latitude, longitude
+        )
+
+    def take(self, positions: Any) -> List[Dict[str, Any]]:
+        """Rows at several catalog positions, in the order given"""
+        positions = np.asarray(positions, dtype=np.intp)
+        columns, buffer, heap = self.columns, self._buffer, self._heap
+        read_bounds, bounds = STRING_BOUNDS.unpack_from, self._string_offsets
+        # Rows often share strings; each is decoded once per call
+        decoded: Dict[int, str] = {}
+        text = {}
+        for field in STRING_FIELDS:
+            values = []
+            for index in self._refs[field][positions].tolist():
+                value = decoded.get(index)
+                if value is None:
+                    start, end = read_bounds(buffer, bounds + 8 * index)
+                    value = decoded[index] = buffer[heap + start:heap + end].decode("utf-8")
+                values.append(value)
+            text[field] = values
+        states = self.states
+        return [
+            _record(*values) for values in zip(
+                columns["ids"][positions].tolist(), text["name"], text["description"], text["location"],
+                [states[code] for code in columns["state_codes"][positions].tolist()],
+                columns["amenities"][positions].tolist(), columns["prices"][positions].tolist(),
+                text["image_url"], columns["latitudes"][positions].tolist(),
+                columns["longitudes"][positions].tolist()
+            )
+        ]
+
+    def all_rows(self) -> List[Dict[str, Any]]:
+        """Assemble every row"""
+        return self.take(np.arange(self.count))
+
+    def position_of(self, campsite_id: int) -> Optional[int]:
+        """Catalog position of one id, None if absent"""
+        sorted_ids = self._indexes["sorted_ids"]
+        found = int(sorted_ids.searchsorted(campsite_id))
+        if found < len(sorted_ids) and sorted_ids[found] == campsite_id:
+            return int(self._indexes["id_positions"][found])
+        return None
+
+    def positions_of(self, campsite_ids: Sequence[int]) -> "np.ndarray":
+        """Catalog positions of the given ids that exist, in the order given"""
+        sorted_ids = self._indexes["sorted_ids"]
+        wanted = np.asarray(campsite_ids, dtype="<i8")
+        found = np.searchsorted(sorted_ids, wanted)
+        found[found == len(sorted_ids)] = 0
+        hit = sorted_ids[found] == wanted if len(sorted_ids) else np.zeros(len(wanted), dtype=bool)
+        return self._indexes["id_positions"][found[hit]]
+
+    def state_positions(self, state: str) -> "np.ndarray":
+        """Catalog positions of a state's rows (compared case-insensitively), in catalog order"""
+        offsets, postings = self._indexes["state_offsets"], self._indexes["state_positions"]
+        wanted = state.casefold()
+        parts = [
+            postings[offsets[code]:offsets[code + 1]]
+            for code, name in enumerate(self.states) if name.casefold() == wanted
+        ]
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype="<i8")
+
+    def ordering(self, order_by: str) -> Optional["np.ndarray"]:
+        """Every catalog position in a page ordering, when the snapshot has it prebuilt"""
+        section = ORDER_SECTIONS.get(order_by)
+        return None if section is None else self._indexes[section]
+
+    def contains(self, field: str, needle: str) -> "np.ndarray":
+        """
+        Boolean mask of rows whose lower-cased field contains needle,
+        found by scanning the mapped text (no per-row Python strings)
+        """
+        mask = np.zeros(self.count, dtype=bool)
+        offsets, (base, length) = self._text[field]
+        pattern = needle.lower().encode("utf-8")
+        if not pattern:
+            mask[:] = True
+            return mask
+        buffer, end, locate = self._buffer, base + length, offsets.searchsorted
+        position = buffer.find(pattern, base, end)
+        while position != -1:
+            row = int(locate(position - base, side="right")) - 1
+            mask[row] = True
+            # At most one hit per row: resume at the next row's text
+            position = buffer.find(pattern, base + int(offsets[row + 1]), end)
+        return mask
+
+
+class SnapshotColumns(ColumnarCatalog):
+    """
+    ColumnarCatalog over a mapped snapshot
+
+    Filters and recommendation scoring run unchanged, on columns shared by
+    every process; text matching scans the mapped text sections and rows
+    are decoded only for the positions returned
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self.rows = snapshot.rows
+        for name, _ in COLUMNS:
+            setattr(self, name, snapshot.columns[name])
+        self._state_lookup = {name: code for code, name in enumerate(snapshot.states)}
+        self._activity_masks: Dict[str, Any] = {}
+        self.snapshot = snapshot
+
+    def _contains(self, field: str, needle: str) -> Any:
+        return self.snapshot.contains(field, needle)
+
+    def ordering(self, order_by: str) -> Optional["np.ndarray"]:
+        return self.snapshot.ordering(order_by)
+
+    def positions(self, predicates) -> "np.ndarray":
+        """Catalog positions satisfying every predicate"""
+        return np.flatnonzero(self.mask(predicates))
+
+    def filter(self, predicates) -> List[Dict[str, Any]]:
+        """Rows satisfying every predicate, decoded in one batch"""
+        return self.rows.take(self.positions(predicates))
+
+
+@contextmanager
+def publish_lock(directory: str) -> Iterator[None]:
+    """Exclusive lock across processes publishing into a snapshot directory"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def read_pointer(directory: str) -> Optional[Tuple[int, str]]:
+    """(version, path) of the current snapshot, or None if none was published"""
+    try:
+        with open(os.path.join(directory, POINTER_FILE), encoding="utf-8") as handle:
+            pointer = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return None
+    return pointer["version"], os.path.join(directory, pointer["file"])
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """Write a file under a temporary name and rename it into place"""
+    directory = os.path.dirname(path)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            handle.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def publish_snapshot(directory: str, rows: Sequence[Dict[str, Any]]) -> Tuple[int, str]:
+    """
+    Write rows as the next snapshot version and point CURRENT at it
+
+    The caller must hold publish_lock when other processes may publish,
+    and should read `rows` while holding it so a newer version never
+    carries older data
+
+    Returns:
+        (version, path) of the published snapshot
+    """
+    current = read_pointer(directory)
+    version = 1 if current is None else current[0] + 1
+    name = _snapshot_name(version)
+    path = os.path.join(directory, name)
+    _write_atomically(path, encode_snapshot(rows, version))
+    _write_atomically(
+        os.path.join(directory, POINTER_FILE),
+        json.dumps({"version": version, "file": name}).encode("utf-8")
+    )
+    # Unlinking is safe for processes that still have an old file mapped
+    for entry in os.listdir(directory):
+        if entry.startswith("catalog-") and entry < _snapshot_name(version - KEEP_PREVIOUS):
+            os.remove(os.path.join(directory, entry))
+    return version, path
+
+
+def write_catalog(path: str, rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Write rows as a standalone catalog file, served as-is by
+    SnapshotHolder(path=...) without a pointer or publishing lock
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    _write_atomically(os.path.abspath(path), encode_snapshot(rows, 1))
+
+
+class SnapshotHolder:
+    """
+    The snapshot a process currently reads, re-checking the CURRENT pointer
+    at most once per refresh interval and switching atomically on change
+    """
+
+    def __init__(self, directory: str, refresh_interval: float = 0.1, path: Optional[str] = None):
+        """
+        Initialize holder
+
+        Args:
+            directory: Snapshot directory whose CURRENT pointer is followed
+            refresh_interval: Seconds between pointer checks
+            path: A single catalog file to serve instead of following the
+                pointer; it is mapped on first use
+        """
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+        self.path = path
+        # A single reference, so readers never pair one version's rows with
+        # another's columns
+        self._columns: Optional[SnapshotColumns] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def current(self, now: float) -> SnapshotColumns:
+        """
+        Columns of the latest published snapshot
+
+        Args:
+            now: time.monotonic() reading used to rate-limit pointer checks
+
+        Raises:
+            FileNotFoundError: if nothing was published to the directory,
+                or the catalog file does not exist
+        """
+        columns = self._columns
+        if columns is not None and (self.path is not None or now < self._next_check):
+            return columns
+        with self._lock:
+            if self.path is not None:
+                if self._columns is None:
+                    self.attach(self.path)
+                return self._columns
+            self._next_check = now + self.refresh_interval
+            pointer = read_pointer(self.directory)
+            if pointer is None:
+                if self._columns is None:
+                    raise FileNotFoundError(f"No catalog snapshot published in {self.directory}")
+            elif self._columns is None or pointer[0] != self._columns.version:
+                self.attach(pointer[1])
+            return self._columns
+
+    def attach(self, path: str) -> SnapshotColumns:
+        """Switch to the snapshot at path (older mappings close once unreferenced)"""
+        self._columns = SnapshotColumns(CatalogSnapshot(path))
+        return self._columns
@@ -0,0 +1,221 @@
+"""
+Spatial Indexing
+Great-circle distances, bounding boxes and a uniform latitude/longitude
+grid index for radius, bounding-box and nearest-neighbor queries
+"""
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+# Farthest any two points on the globe can be apart
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+DEFAULT_CELL_DEGREES = 0.25
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres between two points in degrees"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(lon2 - lon1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _wrap_longitude(lon: float) -> float:
+    """Normalize a longitude into [-180, 180)"""
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    """
+    Latitude/longitude rectangle, edges inclusive
+
+    A box whose west edge is east of its east edge crosses the
+    antimeridian (e.g. west=170, east=-170 spans 20 degrees)
+    """
+    south: float
+    west: float
+    north: float
+    east: float
+
+    def __post_init__(self):
+        if not -90 <= self.south <= self.north <= 90:
+            raise ValueError("Bounding box latitudes must satisfy -90 <= south <= north <= 90")
+        if not (-180 <= self.west <= 180 and -180 <= self.east <= 180):
+            raise ValueError("Bounding box longitudes must be within [-180, 180]")
+
+    @classmethod
+    def around(cls, lat: float, lon: float, radius_km: float) -> "BoundingBox":
+        """
+        Smallest box containing every point within radius_km of (lat, lon)
+
+        Spans all longitudes when the circle reaches a pole
+        """
+        angle = radius_km / EARTH_RADIUS_KM
+        south = lat - math.degrees(angle)
+        north = lat + math.degrees(angle)
+        if south <= -90 or north >= 90 or math.sin(angle) >= math.cos(math.radians(lat)):
+            return cls(max(south, -90.0), -180.0, min(north, 90.0), 180.0)
+        spread = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+        if spread >= 180:
+            return cls(south, -180.0, north, 180.0)
+        return cls(south, _wrap_longitude(lon - spread), north, _wrap_longitude(lon + spread))
+
+    @property
+    def wraps(self) -> bool:
+        """Whether the box crosses the antimeridian"""
+        return self.west > self.east
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Whether a point lies inside the box"""
+        if not self.south <= lat <= self.north:
+            return False
+        if self.wraps:
+            return lon >= self.west or lon <= self.east
+        return self.west <= lon <= self.east
+
+    def longitude_ranges(self) -> List[Tuple[float, float]]:
+        """The box's longitude span as one or two non-wrapping ranges"""
+        if self.wraps:
+            return [(self.west, 180.0), (-180.0, self.east)]
+        return [(self.west, self.east)]
+
+
+class GridIndex:
+    """
+    Uniform grid of latitude/longitude cells holding point keys
+
+    Box and radius queries visit only the cells overlapping the query
+    (or every occupied cell, when that is fewer); nearest-neighbor queries
+    search a growing radius until enough accepted points are inside it,
+    which keeps them proportional to the neighborhood rather than the
+    catalog
+    """
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        if cell_degrees <= 0:
+            raise ValueError("Grid cells must have a positive size")
+        self.cell_degrees = cell_degrees
+        self._columns = math.ceil(360 / cell_degrees)
+        self._rows = math.ceil(180 / cell_degrees)
+        # cell -> key -> (lat, lon, lat in radians, cosine of lat)
+        self._cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float, float, float]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        row = min(int((lat + 90) // self.cell_degrees), self._rows - 1)
+        column = int((_wrap_longitude(lon) + 180) // self.cell_degrees) % self._columns
+        return row, column
+
+    def add(self, key: int, lat: float, lon: float) -> None:
+        """Index a point under a key"""
+        phi = math.radians(lat)
+        self._cells.setdefault(self._cell(lat, lon), {})[key] = (lat, lon, phi, math.cos(phi))
+        self._size += 1
+
+    def remove(self, key: int, lat: float, lon: float) -> None:
+        """Remove a point previously added with the same key and position"""
+        cell = self._cell(lat, lon)
+        points = self._cells[cell]
+        del points[key]
+        if not points:
+            del self._cells[cell]
+        self._size -= 1
+
+    def _cells_for(self, box: BoundingBox) -> Iterator[Dict[int, Tuple[float, float, float, float]]]:
+        """Occupied cells overlapping a box"""
+        low_row, _ = self._cell(box.south, 0.0)
+        high_row, _ = self._cell(box.north, 0.0)
+        columns: Set[int] = set()
+        for west, east in box.longitude_ranges():
+            first = int((west + 180) // self.cell_degrees)
+            last = min(int((east + 180) // self.cell_degrees), self._columns - 1)
+            columns.update(range(first, last + 1))
+        if (high_row - low_row + 1) * len(columns) > len(self._cells):
+            for (row, column), points in self._cells.items():
+                if low_row <= row <= high_row and column in columns:
+                    yield points
+            return
+        for row in range(low_row, high_row + 1):
+            for column in columns:
+                points = self._cells.get((row, column))
+                if points:
+                    yield points
+
+    def within_box(self, box: BoundingBox) -> List[int]:
+        """Keys of points inside a box"""
+        return [
+            key
+            for points in self._cells_for(box)
+            for key, (lat, lon, _, _) in points.items()
+            if box.contains(lat, lon)
+        ]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, int]]:
+        """
+        (distance_km, key) for points within radius_km of (lat, lon), unordered
+
+        Distances are computed with the same arithmetic as haversine_km, so
+        they equal it exactly; points are rejected on the haversine term
+        before paying for the arcsine
+        """
+        phi = math.radians(lat)
+        cos_phi = math.cos(phi)
+        limit = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2 * (1 + 1e-9)
+        found = []
+        # Widen the box a hair so rounding cannot drop points right on the circle
+        box = BoundingBox.around(lat, lon, radius_km * (1 + 1e-9))
+        for points in self._cells_for(box):
+            for key, (_, point_lon, point_phi, point_cos_phi) in points.items():
+                half_dphi = (point_phi - phi) / 2
+                half_dlambda = math.radians(point_lon - lon) / 2
+                a = math.sin(half_dphi) ** 2 + cos_phi * point_cos_phi * math.sin(half_dlambda) ** 2
+                if a > limit:
+                    continue
+                distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+                if distance <= radius_km:
+                    found.append((distance, key))
+        return found
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        count: int,
+        accept: Optional[Callable[[int, float], bool]] = None,
+        min_radius_km: float = 0.0,
+        max_radius_km: float = MAX_DISTANCE_KM
+    ) -> List[Tuple[float, int]]:
+        """
+        The accepted points nearest to (lat, lon)
+
+        Every accepted point within the final search radius is returned,
+        so the result is at least `count` long unless fewer points exist,
+        and its `count` nearest entries are the true nearest neighbors
+
+        Args:
+            lat, lon: Query point in degrees
+            count: Accepted points wanted
+            accept: Optional (key, distance_km) filter
+            min_radius_km: Radius to start from, e.g. the distance of the
+                last point already returned when resuming
+            max_radius_km: Radius never to search beyond
+
+        Returns:
+            (distance_km, key) sorted by distance
+        """
+        radius = min(max(min_radius_km, self.cell_degrees * 111.2), max_radius_km)
+        while True:
+            found = [
+                (distance, key) for distance, key in self.within_radius(lat, lon, radius)
+                if accept is None or accept(key, distance)
+            ]
+            if len(found) >= count or radius >= max_radius_km:
+                return sorted(found)
+            radius = min(radius * 2, max_radius_km)
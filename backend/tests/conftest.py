@@ -0,0 +1,118 @@
+"""
+Shared Test Fixtures
+Synthetic catalogs, a repository of every RepositoryFactory kind built
+over them, and TestClients serving a chosen repository type
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.catalog import generate_campsites
+from data import CAMPSITES
+from repositories import (
+    CATALOG_PATH_ENV, DATABASE_URL_ENV, CatalogFileRepository, DatabaseCampsiteRepository,
+    IndexedCampsiteRepository, InMemoryCampsiteRepository, SnapshotCampsiteRepository
+)
+from snapshot import write_catalog
+
+BACKENDS = ("memory", "indexed", "database", "snapshot", "catalog")
+WRITABLE_BACKENDS = ("memory", "indexed", "database", "snapshot")
+
+
+def catalog_rows():
+    """Synthetic rows whose states are spelled in mixed case"""
+    rows = generate_campsites(120, seed=7)
+    spellings = (str.upper, str.lower, lambda state: f" {state} ", str)
+    for position, row in enumerate(rows):
+        row["state"] = spellings[position % len(spellings)](row["state"])
+    # Shared prices exercise the id tie-break of every ordering
+    for row in rows[:10]:
+        row["price_per_night"] = 40.0
+    return rows
+
+
+def build_repository(kind, rows, directory):
+    """A repository of the given RepositoryFactory kind holding copies of rows"""
+    os.makedirs(directory, exist_ok=True)
+    rows = [dict(row) for row in rows]
+    if kind == "memory":
+        repository = InMemoryCampsiteRepository(rows)
+    elif kind == "indexed":
+        repository = IndexedCampsiteRepository(rows)
+    elif kind == "database":
+        repository = DatabaseCampsiteRepository(f"sqlite:///{directory}/campsites.db", seed_data=rows)
+    elif kind == "snapshot":
+        source = DatabaseCampsiteRepository(f"sqlite:///{directory}/source.db", seed_data=rows)
+        repository = SnapshotCampsiteRepository(os.path.join(directory, "snapshots"), source=source)
+        os.makedirs(repository.directory)
+    else:
+        path = os.path.join(directory, "campsites.catalog")
+        write_catalog(path, rows)
+        repository = CatalogFileRepository(path)
+    repository.warm_up()
+    return repository
+
+
+@pytest.fixture
+def rows():
+    return catalog_rows()
+
+
+@pytest.fixture
+def reference(rows):
+    """In-memory repository every other backend must agree with"""
+    return InMemoryCampsiteRepository([dict(row) for row in rows])
+
+
+@pytest.fixture
+def build(tmp_path):
+    """Build a repository of a given kind over given rows"""
+    built = []
+
+    def build_kind(kind, rows):
+        repository = build_repository(kind, rows, tmp_path / kind)
+        built.append(repository)
+        return repository
+
+    yield build_kind
+    for repository in built:
+        repository.close()
+
+
+@pytest.fixture(params=BACKENDS)
+def repository(request, rows, build):
+    return build(request.param, rows)
+
+
+@pytest.fixture(params=WRITABLE_BACKENDS)
+def writable(request, rows, build):
+    return build(request.param, rows)
+
+
+@pytest.fixture
+def client_for(tmp_path, monkeypatch):
+    """Open a TestClient serving the given repository type"""
+    monkeypatch.setenv(DATABASE_URL_ENV, f"sqlite:///{tmp_path}/campsites.db")
+    monkeypatch.setenv(CATALOG_PATH_ENV, str(tmp_path / "campsites.catalog"))
+    clients = []
+
+    def open_client(repo_type):
+        monkeypatch.setattr(main.registry, "repo_type", repo_type)
+        client = TestClient(main.app)
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield open_client
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+@pytest.fixture
+def new_campsite():
+    """Request body of a new campsite, with the given fields changed"""
+    def body(**changes):
+        return {**{key: value for key, value in CAMPSITES[0].items() if key != "id"}, **changes}
+    return body
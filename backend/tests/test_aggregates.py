@@ -0,0 +1,55 @@
+"""
+Aggregate Statistics Tests
+Incrementally maintained counts, price bounds and percentiles against a
+recomputation from the live rows
+"""
+import math
+import random
+
+import pytest
+
+from aggregates import CatalogAggregates, PriceMultiset
+
+
+def test_aggregates_follow_adds_and_removes():
+    rng = random.Random(3)
+    rows = [
+        {"price_per_night": rng.choice([round(rng.uniform(0, 3000), 2), 40.0, 0.5]), "state": rng.choice("ABC")}
+        for _ in range(300)
+    ]
+    aggregates = CatalogAggregates.from_rows(rows[:150])
+    live = rows[:150]
+    for row in rows[150:]:
+        if rng.random() < 0.4:
+            removed = live.pop(rng.randrange(len(live)))
+            aggregates.remove(removed)
+        else:
+            aggregates.add(row)
+            live.append(row)
+        prices = sorted(row["price_per_night"] for row in live)
+        assert (aggregates.count, aggregates.min_price, aggregates.max_price) == (len(prices), prices[0], prices[-1])
+        for percent in (25, 50, 90, 100):
+            assert aggregates.percentile(percent) == prices[max(math.ceil(percent / 100 * len(prices)), 1) - 1]
+
+
+def test_price_multiset_rejects_unknown_prices_and_ranks():
+    prices = PriceMultiset([5.0, 5.0, 2_000_000.0])
+    assert [prices.kth(rank) for rank in (1, 2, 3)] == [5.0, 5.0, 2_000_000.0]
+    with pytest.raises(KeyError):
+        prices.remove(6.0)
+    with pytest.raises(IndexError):
+        prices.kth(4)
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+def test_stats_follow_writes(client_for, new_campsite, repo_type):
+    client = client_for(repo_type)
+    before = client.get("/stats").json()
+    response = client.post("/campsites", json=new_campsite(state="Alaska", price_per_night=999.0))
+    assert response.status_code == 201
+    stats = client.get("/stats").json()
+    assert stats["total_campsites"] == before["total_campsites"] + 1
+    assert stats["campsites_per_state"]["Alaska"] == 1
+    assert stats["price_range"]["max_price"] == 999.0
+    client.delete(f"/campsites/{response.json()['id']}")
+    assert client.get("/stats").json() == before
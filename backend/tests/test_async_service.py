@@ -0,0 +1,61 @@
+"""
+Async Service Tests
+AsyncCampsiteService over AsyncRepositoryAdapter answers as the blocking
+service does, running blocking repositories in worker threads
+"""
+import threading
+
+import anyio
+import pytest
+
+from models import CampsiteFilter, UserPreferencesDomain
+from repositories import AsyncRepositoryAdapter
+from reservations import AsyncReservationAdapter, InMemoryReservationRepository
+from services import AsyncCampsiteService, CampsiteService
+
+
+def async_service(repository):
+    return AsyncCampsiteService(
+        AsyncRepositoryAdapter(repository), AsyncReservationAdapter(InMemoryReservationRepository())
+    )
+
+
+@pytest.mark.parametrize("criteria", [CampsiteFilter(has_water=True, max_price=60), CampsiteFilter(search_query="lake")])
+def test_async_service_answers_like_the_blocking_one(repository, criteria):
+    blocking = CampsiteService(repository)
+    preferences = UserPreferencesDomain(preferred_state="Utah", preferred_activities=["hiking"])
+
+    async def answers():
+        service = async_service(repository)
+        return (
+            await service.filter_campsites(criteria),
+            await service.get_campsite_count(),
+            await service.get_recommended_campsites(preferences)
+        )
+
+    assert anyio.run(answers) == (
+        blocking.filter_campsites(criteria),
+        blocking.get_campsite_count(),
+        blocking.get_recommended_campsites(preferences)
+    )
+
+
+@pytest.mark.parametrize("kind,offloaded", [("memory", False), ("indexed", False), ("database", True)])
+def test_only_blocking_repositories_leave_the_event_loop(rows, build, monkeypatch, kind, offloaded):
+    repository = build(kind, rows)
+    adapter = AsyncRepositoryAdapter(repository)
+    threads = []
+    get_all = repository.get_all
+
+    def recording_get_all():
+        threads.append(threading.get_ident())
+        return get_all()
+
+    monkeypatch.setattr(repository, "get_all", recording_get_all)
+
+    async def call():
+        loop_thread = threading.get_ident()
+        await adapter.get_all()
+        return loop_thread
+
+    assert (anyio.run(call) != threads[0]) == offloaded
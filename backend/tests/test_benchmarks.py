@@ -0,0 +1,26 @@
+"""
+Benchmark Harness Tests
+Latency summaries, baseline comparison, and smoke runs of the micro and
+load benchmarks on a tiny catalog
+"""
+from benchmarks import load, micro
+from benchmarks.harness import compare, load_results, save_results, summarize
+
+
+def test_summary_and_regression_flags(tmp_path):
+    summary = summarize([0.001] * 98 + [0.002, 0.010])
+    assert (summary["ops"], summary["p50_us"], summary["p99_us"], summary["max_us"]) == (100, 1000.0, 2000.0, 10000.0)
+    path = str(tmp_path / "baseline.json")
+    save_results(path, {"indexed/100/case": summary}, {"rows": 100})
+    baseline = load_results(path)
+    slower = {"indexed/100/case": dict(summary, p50_us=1300.0), "indexed/100/new": summary}
+    assert compare(slower, baseline) == [("indexed/100/case", 1000.0, 1300.0, 1.3, True)]
+    assert compare({"indexed/100/case": summary}, baseline)[0][4] is False
+
+
+def test_micro_and_load_benchmarks_run(capsys):
+    results = micro.run([60], ["indexed"], ["get_by_id", "quote_trips"], iterations=2, max_seconds=1.0, seed=3)
+    assert results and all(summary["ops"] >= 2 for summary in results.values())
+    results = load.run(60, "indexed", concurrency=2, duration=5.0, requests=20, seed=3)
+    assert results["indexed/60/all"]["errors"] == 0
+    assert results["indexed/60/all"]["ops"] == 20
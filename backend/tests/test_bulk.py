@@ -0,0 +1,81 @@
+"""
+Bulk Import and Export Tests
+All-or-nothing bulk writes and the streaming NDJSON/CSV routes
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from bulk import import_records
+from data import CAMPSITES
+
+
+@pytest.mark.parametrize("ids", [(500, 500), (500, 5)])
+def test_bulk_create_rejects_duplicate_ids_atomically(writable, ids):
+    template = writable.get_by_id(1)
+    before = writable.get_all()
+    with pytest.raises(ValueError):
+        writable.bulk_create([{**template, "id": campsite_id} for campsite_id in ids])
+    assert writable.get_all() == before
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+def test_import_reports_invalid_lines(client_for, new_campsite, repo_type):
+    client = client_for(repo_type)
+    body = "\n".join([
+        json.dumps(new_campsite(name="Imported One", state="oregon")),
+        json.dumps(new_campsite(price_per_night=-5)),
+        json.dumps(new_campsite(name="Imported Two")),
+    ]) + "\n"
+    report = client.post("/campsites/import", content=body).json()
+    assert (report["imported"], report["failed"]) == (2, 1)
+    assert [error["line"] for error in report["errors"]] == [2]
+    imported = client.get("/campsites", params={"search": "Imported"}).json()["campsites"]
+    assert len({campsite["id"] for campsite in imported}) == 2
+    assert "Oregon" in [campsite["state"] for campsite in imported]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_streams_every_campsite(client_for, fmt):
+    client = client_for("indexed")
+    body = client.get("/campsites/export", params={"format": fmt, "batch_size": 2}).text
+    if fmt == "ndjson":
+        exported = [json.loads(line) for line in body.splitlines()]
+    else:
+        exported = list(csv.DictReader(io.StringIO(body)))
+    assert [int(row["id"]) for row in exported] == [campsite["id"] for campsite in CAMPSITES]
+
+
+def test_bulk_create_batches_is_all_or_nothing(writable):
+    template = {**writable.get_by_id(1), "id": None}
+    before = writable.get_all()
+    batches = iter([[template, template], [{**template, "id": 900}], [{**template, "id": 900}]])
+    with pytest.raises(ValueError):
+        writable.bulk_create_batches(batches)
+    assert writable.get_all() == before
+    assert writable.bulk_create_batches(iter([[template], [template, template]])) == 3
+    assert len(writable.get_all()) == len(before) + 3
+
+
+def test_database_import_writes_each_batch_as_it_is_validated(rows, build, new_campsite, monkeypatch):
+    database = build("database", rows)
+    pulled, inserted = [], []
+
+    def records():
+        for line in range(1, 26):
+            pulled.append(line)
+            yield line, new_campsite(name=f"Streamed {line}")
+
+    insert_batch = database._insert_batch
+
+    def recording_insert(connection, created, seen):
+        inserted.append((len(pulled), len(created)))
+        return insert_batch(connection, created, seen)
+
+    monkeypatch.setattr(database, "_insert_batch", recording_insert)
+    report = import_records(database, records(), batch_size=10)
+    assert report.imported == 25
+    assert inserted == [(10, 10), (20, 10), (25, 5)]
+    assert len(database.search("Streamed")) == 25
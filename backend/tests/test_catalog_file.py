@@ -0,0 +1,36 @@
+"""
+Catalog File Tests
+The compact memory-mapped catalog format and the read-only repository
+serving it
+"""
+import json
+
+import pytest
+
+from repositories import ReadOnlyRepositoryError
+from snapshot import CatalogSnapshot
+
+
+def test_catalog_file_is_read_only(rows, build):
+    repository = build("catalog", rows)
+    with pytest.raises(ReadOnlyRepositoryError):
+        repository.create(dict(rows[0], id=None))
+    with pytest.raises(ReadOnlyRepositoryError):
+        repository.bulk_create([dict(rows[0], id=None)])
+
+
+def test_writes_to_a_catalog_file_are_not_allowed(client_for, new_campsite):
+    client = client_for("catalog")
+    assert client.post("/campsites", json=new_campsite()).status_code == 405
+    assert client.patch("/campsites/1", json={"name": "Renamed"}).status_code == 405
+    assert client.delete("/campsites/1").status_code == 405
+    response = client.post("/campsites/import", content=json.dumps(new_campsite()) + "\n")
+    assert response.status_code == 405
+    assert client.get("/campsites/1").status_code == 200
+
+
+def test_catalog_file_rejects_other_files(tmp_path):
+    path = tmp_path / "campsites.json"
+    path.write_text(json.dumps({"campsites": []}) + " " * 64)
+    with pytest.raises(ValueError):
+        CatalogSnapshot(str(path))
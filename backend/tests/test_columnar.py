@@ -0,0 +1,46 @@
+"""
+Columnar Scoring Tests
+Batched NumPy recommendation scoring against the per-object rules it
+vectorizes, on every backend that keeps a columnar snapshot
+"""
+import pytest
+
+from columnar import KNOWN_ACTIVITIES
+from models import DomainMapper, UserPreferencesDomain
+from services import CampsiteService
+
+PREFERENCES = [
+    UserPreferencesDomain(preferred_state="california", max_budget=60.0),
+    UserPreferencesDomain(required_amenities=["water", "restrooms"], preferred_activities=["hiking", "lake"]),
+    UserPreferencesDomain(max_budget=30.0, required_amenities=["electricity"], preferred_activities=["Fishing"]),
+]
+
+
+@pytest.fixture
+def columns(repository):
+    catalog = repository.columnar()
+    if catalog is None:
+        pytest.skip("backend keeps no columnar snapshot")
+    return catalog
+
+
+@pytest.mark.parametrize("preferences", PREFERENCES)
+def test_scores_match_per_object_scoring(columns, reference, preferences):
+    expected = {}
+    for row in reference.get_all():
+        recommendation = CampsiteService._score_campsite(DomainMapper.dict_to_campsite(row), preferences)
+        if recommendation:
+            expected[row["id"]] = (recommendation.score, recommendation.matching_criteria)
+    scored = columns.score(
+        preferences.preferred_state, preferences.max_budget,
+        preferences.required_amenities, preferences.preferred_activities
+    )
+    assert {row["id"]: (score, criteria) for row, score, criteria in scored} == expected
+    assert [score for _, score, _ in scored] == sorted((score for score, _ in expected.values()), reverse=True)
+
+
+def test_only_known_activities_are_cached(columns):
+    for activity in ("lake", "Sunset", "x" * 50, "hiking"):
+        columns.activity_mask(activity)
+    assert set(columns._activity_masks) <= set(KNOWN_ACTIVITIES)
+    assert "hiking" in columns._activity_masks
@@ -0,0 +1,35 @@
+"""
+Database Repository Tests
+Concurrent writes through the pooled SQL repository
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture
+def database(rows, build):
+    return build("database", rows)
+
+
+def test_concurrent_creates_get_distinct_ids(database):
+    template = {**database.get_by_id(1), "id": None}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = list(pool.map(lambda number: database.create(dict(template, name=f"Site {number}")), range(80)))
+    ids = [row["id"] for row in created]
+    assert len(set(ids)) == len(ids)
+    assert all(database.get_by_id(campsite_id) for campsite_id in ids)
+
+
+def test_concurrent_updates_of_different_columns_are_kept(database):
+    changes = [{"name": f"Renamed {number}"} if number % 2 else {"price_per_night": float(number)}
+               for number in range(40)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda change: database.update(9, change), changes))
+    row = database.get_by_id(9)
+    assert row["name"].startswith("Renamed") and row["price_per_night"] % 2 == 0
+
+
+def test_update_rejects_unknown_columns(database):
+    with pytest.raises(ValueError):
+        database.update(9, {"id = 1; --": 1})
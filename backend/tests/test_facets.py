@@ -0,0 +1,40 @@
+"""
+Facet Tests
+Single-pass facet counts on every backend, and the normalized state names
+they group by
+"""
+import pytest
+
+from facets import FacetRequest, count_facets
+from models import CampsiteFilter
+from query import QueryPlanner
+
+FILTERS = [
+    CampsiteFilter(),
+    CampsiteFilter(has_water=True),
+    CampsiteFilter(state="california"),
+    CampsiteFilter(min_price=25, max_price=70, has_electricity=False),
+    CampsiteFilter(search_query="lake"),
+    CampsiteFilter(near=(40.0, -100.0), radius_km=900),
+]
+
+
+@pytest.mark.parametrize("criteria", FILTERS)
+@pytest.mark.parametrize("request_", [FacetRequest(), FacetRequest(("price",), (10.0, 40.0, 55.5))])
+def test_facets_match_reference(repository, reference, criteria, request_):
+    plan = QueryPlanner(reference).plan(criteria)
+    expected = count_facets(reference.execute(plan), request_)
+    assert repository.facets(plan, request_).to_dict() == expected.to_dict()
+
+
+def test_states_are_stored_normalized(repository):
+    states = {row["state"] for row in repository.get_all()}
+    assert states == {state.strip().title() for state in states}
+
+
+def test_writes_normalize_states(writable):
+    created = writable.create({**writable.get_by_id(1), "id": None, "state": "nEW yORK "})
+    assert created["state"] == "New York"
+    updated = writable.update(created["id"], {"state": "oregon"})
+    assert updated["state"] == "Oregon"
+    assert writable.get_by_id(created["id"])["state"] == "Oregon"
@@ -0,0 +1,29 @@
+"""
+Metrics Tests
+Per-route request counters on /metrics and the opt-in Server-Timing
+breakdown
+"""
+import re
+
+
+def sample(client, series):
+    """Value of one series on /metrics, 0 when it has not been recorded"""
+    match = re.search("^" + re.escape(series) + r" (\S+)$", client.get("/metrics").text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_are_counted_per_route_template(client_for):
+    client = client_for("indexed")
+    series = 'campsite_http_requests_total{method="GET",route="/campsites/{campsite_id}",status="200"}'
+    before = sample(client, series)
+    for campsite_id in (1, 2, 3):
+        client.get(f"/campsites/{campsite_id}")
+    assert sample(client, series) == before + 3
+    assert client.get("/metrics").headers["content-type"].startswith("text/plain")
+
+
+def test_server_timing_is_sent_only_on_request(client_for):
+    client = client_for("indexed")
+    assert "server-timing" not in client.get("/campsites").headers
+    timing = client.get("/campsites", headers={"X-Server-Timing": "1"}).headers["server-timing"]
+    assert [entry.split(";")[0].strip() for entry in timing.split(",")] == ["repo", "service", "serialize", "total"]
@@ -0,0 +1,34 @@
+"""
+Domain Model Tests
+"""
+import dataclasses
+
+from models import Campsite
+
+
+def campsite(**changes):
+    fields = dict(
+        id=1, name="Pine", description="Tall pines", location="Mountain View", state="California",
+        has_water=True, has_electricity=False, has_restrooms=True, price_per_night=25.0, image_url="u"
+    )
+    fields.update(changes)
+    return Campsite(**fields)
+
+
+def test_campsite_is_a_slotted_dataclass_of_its_columns():
+    site = campsite()
+    fields = {field.name: field for field in dataclasses.fields(Campsite)}
+    assert list(fields)[5:8] == ["has_water", "has_electricity", "has_restrooms"]
+    assert fields["has_water"].default is dataclasses.MISSING and fields["latitude"].default is None
+    assert not hasattr(site, "__dict__")
+    assert "has_water=True" in repr(site) and dataclasses.asdict(site)["has_electricity"] is False
+    changed = dataclasses.replace(site, has_water=False)
+    assert (changed.has_water, changed.has_restrooms, changed.amenities) == (False, True, 4)
+    assert changed != site and site == campsite()
+
+
+def test_campsite_interns_shared_strings_and_matches_amenities():
+    first, second = (campsite(state="".join(["Ut", "ah"])) for _ in range(2))
+    assert first.state is second.state
+    assert first.has_all_amenities(["water", "restrooms"])
+    assert not first.has_all_amenities(["electricity"]) and not first.has_all_amenities(["wifi"])
@@ -0,0 +1,68 @@
+"""
+Paging Tests
+limit/offset and keyset cursors on every backend and through /campsites,
+including cursors that were tampered with
+"""
+import base64
+import json
+
+import pytest
+
+from data import CAMPSITES
+from models import CampsiteFilter
+from query import ORDERINGS, PageRequest, QueryPlanner, decode_cursor, encode_cursor, paginate
+
+
+def forged_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("order_by", list(ORDERINGS))
+def test_keyset_pages_cover_the_ordering(repository, reference, order_by):
+    plan = QueryPlanner(reference).plan(CampsiteFilter(has_restrooms=True))
+    expected = paginate(reference.execute(plan), PageRequest(order_by=order_by)).items
+    seen, after = [], None
+    while True:
+        page = repository.execute_page(plan, PageRequest(limit=7, order_by=order_by, after=after))
+        seen.extend(page.items)
+        if page.next_after is None:
+            break
+        # Cursors survive the trip through their opaque encoding
+        _, after = decode_cursor(encode_cursor(order_by, page.next_after))
+    assert seen == expected
+
+
+@pytest.mark.parametrize("order_by,key", [("id", (4,)), ("price", (25.5, 4)), ("state", ("Utah", "Pine", 4))])
+def test_cursor_round_trip(order_by, key):
+    assert decode_cursor(encode_cursor(order_by, key)) == (order_by, key)
+
+
+@pytest.mark.parametrize("order_by,key", [("price", ("x",)), ("id", ()), ("id", (True,)), ("name", ("a", 1.5))])
+def test_cursor_with_wrong_key_shape_is_rejected(order_by, key):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(order_by, key))
+
+
+@pytest.mark.parametrize("repo_type", ["indexed", "database"])
+@pytest.mark.parametrize("payload", [["price", ["x"]], ["id", []], ["name", ["a", True]], ["bogus", [1]]])
+def test_malformed_cursor_is_a_bad_request(client_for, repo_type, payload):
+    client = client_for(repo_type)
+    response = client.get("/campsites", params={"limit": 2, "order_by": "price", "cursor": forged_cursor(payload)})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+def test_cursor_pages_through_every_campsite(client_for, repo_type):
+    client = client_for(repo_type)
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 2, "order_by": "price"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/campsites", params=params).json()
+        ids.extend(campsite["id"] for campsite in body["campsites"])
+        cursor = body.get("next_cursor")
+        if not cursor:
+            break
+    prices = {campsite["id"]: campsite["price_per_night"] for campsite in CAMPSITES}
+    assert ids == sorted(prices, key=lambda campsite_id: (prices[campsite_id], campsite_id))
@@ -0,0 +1,36 @@
+"""
+Query Planner Tests
+Pushed-down filters must select what CampsiteFilter.matches_campsite
+selects, with the most selective predicate first
+"""
+import pytest
+
+from models import CampsiteFilter, DomainMapper
+from query import QueryPlanner
+from services import CampsiteService
+
+FILTERS = [
+    CampsiteFilter(state="CALIFORNIA", has_water=True),
+    CampsiteFilter(has_electricity=False, has_restrooms=True, max_price=60),
+    CampsiteFilter(min_price=30, max_price=45),
+    CampsiteFilter(near=(38.0, -110.0), radius_km=600, has_water=False),
+]
+
+
+@pytest.mark.parametrize("criteria", FILTERS)
+def test_filter_selects_what_the_domain_rule_selects(repository, reference, criteria):
+    expected = [
+        row["id"] for row in reference.get_all()
+        if criteria.matches_campsite(DomainMapper.dict_to_campsite(row))
+    ]
+    assert [campsite.id for campsite in CampsiteService(repository).filter_campsites(criteria)] == expected
+
+
+@pytest.mark.parametrize("criteria", FILTERS)
+def test_plan_puts_the_most_selective_predicate_first(rows, build, criteria):
+    indexed = build("indexed", rows)
+    plan = QueryPlanner(indexed).plan(criteria)
+    assert plan.estimates == sorted(plan.estimates)
+    for predicate, estimate in zip(plan.predicates, plan.estimates):
+        if predicate.field != "near":
+            assert estimate == sum(predicate.matches(row) for row in indexed.get_all())
@@ -0,0 +1,48 @@
+"""
+Trip Quote Tests
+Batch quotes with weekend and seasonal pricing, priced from one multi-get
+"""
+from datetime import date
+
+import pytest
+
+from data import CAMPSITES
+from pricing import PricingRule, Season, stay_factor
+
+PRICES = {campsite["id"]: campsite["price_per_night"] for campsite in CAMPSITES}
+
+
+def test_stay_factor_applies_weekend_then_season():
+    rule = PricingRule(weekend_multiplier=1.25, seasons=(Season((12, 20), (1, 5), 2.0),))
+    # Thursday 2026-07-02: Thu, Fri (weekend), Sat (weekend), Sun
+    assert stay_factor(rule, date(2026, 7, 2), 4) == 1 + 1.25 + 1.25 + 1
+    # The season wraps over the new year
+    assert stay_factor(rule, date(2026, 12, 31), 2) == 2.0 * 1 + 2.0 * 1.25
+    assert stay_factor(None, None, 3) == 3
+    with pytest.raises(ValueError):
+        stay_factor(rule, None, 3)
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+def test_batch_quote_prices_every_stay(client_for, repo_type):
+    client = client_for(repo_type)
+    response = client.post("/campsites/quotes", json={
+        "items": [
+            {"campsite_id": 1, "nights": 3, "check_in": "2026-07-02"},
+            {"campsite_id": 999, "nights": 2, "check_in": "2026-07-02"},
+            {"campsite_id": 2, "nights": 3, "check_in": "2026-07-02"},
+        ],
+        "pricing": {"weekend_multiplier": 1.5, "seasons": [{"start": "07-01", "end": "08-31", "multiplier": 2.0}]}
+    }).json()
+    factor = (1 + 1.5 + 1.5) * 2.0
+    assert [quote["found"] for quote in response["quotes"]] == [True, False, True]
+    assert [quote.get("total_cost") for quote in response["quotes"]] == [PRICES[1] * factor, None, PRICES[2] * factor]
+    assert response["total_cost"] == PRICES[1] * factor + PRICES[2] * factor
+
+
+def test_pricing_rule_needs_check_in(client_for):
+    client = client_for("indexed")
+    response = client.post("/campsites/quotes", json={
+        "items": [{"campsite_id": 1, "nights": 2}], "pricing": {"weekend_multiplier": 1.5}
+    })
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+"""
+Recommendation Tests
+Top-k recommendations keep exactly the best scores of a full scoring pass,
+ties going to the lower campsite id
+"""
+import pytest
+
+from models import DomainMapper, UserPreferencesDomain
+from services import CampsiteService
+
+PREFERENCES = [
+    UserPreferencesDomain(preferred_state="Oregon", max_budget=50.0, required_amenities=["water"]),
+    UserPreferencesDomain(required_amenities=["electricity", "restrooms"], preferred_activities=["fishing"]),
+    UserPreferencesDomain(max_budget=20.0),
+]
+
+
+def ranked(recommendations):
+    return [(recommendation.campsite.id, recommendation.score) for recommendation in recommendations]
+
+
+@pytest.mark.parametrize("preferences", PREFERENCES)
+@pytest.mark.parametrize("top_k", [1, 5, 40])
+def test_top_k_keeps_the_best_scores(repository, reference, preferences, top_k):
+    scored = [CampsiteService._score_campsite(DomainMapper.dict_to_campsite(row), preferences)
+              for row in reference.get_all()]
+    expected = sorted(ranked(filter(None, scored)), key=lambda entry: (-entry[1], entry[0]))[:top_k]
+    service = CampsiteService(repository)
+    assert ranked(service.get_top_recommended_campsites(preferences, top_k)) == expected
+    assert ranked(service.get_recommended_campsites(preferences, top_k=top_k)) == expected
+
+
+def test_recommendations_can_be_reordered_by_a_stored_ordering(repository):
+    service = CampsiteService(repository)
+    recommendations = service.get_recommended_campsites(PREFERENCES[0], top_k=10, sort="price")
+    keys = [(recommendation.campsite.price_per_night, recommendation.campsite.id) for recommendation in recommendations]
+    assert len(keys) == 10 and keys == sorted(keys)
@@ -0,0 +1,29 @@
+"""
+Service Registry Tests
+Repositories and services are built once per application lifespan and
+shared by every request
+"""
+import main
+from registry import ServiceRegistry
+
+
+def test_services_are_built_once_and_share_a_repository(rows, build):
+    repository = build("indexed", rows)
+    registry = ServiceRegistry("indexed")
+    registry.startup(repository)
+    service, async_service = registry.get_service(), registry.get_async_service()
+    registry.startup()
+    assert registry.get_service() is service and registry.get_async_service() is async_service
+    assert registry.repository is repository
+    assert service.repository.repository is repository
+    registry.shutdown()
+    assert registry.service is None and registry.async_service is None
+
+
+def test_requests_reuse_the_registry_services(client_for):
+    client = client_for("indexed")
+    service, repository = main.registry.async_service, main.registry.repository
+    assert service is not None
+    for path in ("/campsites", "/stats", "/campsites/1"):
+        assert client.get(path).status_code == 200
+    assert main.registry.async_service is service and main.registry.repository is repository
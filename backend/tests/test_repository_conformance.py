@@ -0,0 +1,49 @@
+"""
+Repository Conformance Tests
+Every backend RepositoryFactory can create must answer the same queries
+with the same rows as the in-memory reference repository
+"""
+import os
+
+import pytest
+
+from conftest import BACKENDS
+from models import CampsiteFilter
+from query import Predicate, QueryPlanner
+from repositories import CATALOG_PATH_ENV, DATABASE_URL_ENV, RepositoryFactory
+from snapshot import SNAPSHOT_DIR_ENV
+
+FILTERS = [
+    CampsiteFilter(),
+    CampsiteFilter(has_water=True),
+    CampsiteFilter(state="california"),
+    CampsiteFilter(min_price=25, max_price=70, has_electricity=False),
+    CampsiteFilter(search_query="lake"),
+    CampsiteFilter(near=(40.0, -100.0), radius_km=900),
+]
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_factory_creates_every_backend(kind, tmp_path, monkeypatch):
+    monkeypatch.setenv(DATABASE_URL_ENV, f"sqlite:///{tmp_path}/factory.db")
+    monkeypatch.setenv(CATALOG_PATH_ENV, str(tmp_path / "factory.catalog"))
+    monkeypatch.setenv(SNAPSHOT_DIR_ENV, str(tmp_path / "snapshots"))
+    os.makedirs(tmp_path / "snapshots")
+    repository = RepositoryFactory.create_campsite_repository(kind)
+    try:
+        repository.warm_up()
+        assert [row["id"] for row in repository.get_all()] == [1, 2, 3, 4, 5]
+    finally:
+        repository.close()
+
+
+def test_rows_match_reference(repository, reference):
+    assert repository.get_all() == reference.get_all()
+    assert repository.get_by_id(17) == reference.get_by_id(17)
+    assert repository.get_by_id(10_000) is None
+
+
+@pytest.mark.parametrize("criteria", FILTERS)
+def test_execute_matches_reference(repository, reference, criteria):
+    plan = QueryPlanner(reference).plan(criteria, [Predicate("ids", {1, 2, 3}, negate=True)])
+    assert repository.execute(plan) == reference.execute(plan)
@@ -0,0 +1,96 @@
+"""
+Reservation Tests
+Optimistic booking, availability and calendar lookups of every
+reservation store
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from data import CAMPSITES
+from repositories import DatabaseCampsiteRepository
+from reservations import (
+    InMemoryReservationRepository, ReservationConflict, ReservationRepositoryFactory, StaleCalendarError
+)
+
+TODAY = date.today()
+
+
+def stay(campsite_id, first_night, nights):
+    check_in = TODAY + timedelta(days=first_night)
+    return {
+        "campsite_id": campsite_id,
+        "check_in": check_in,
+        "check_out": check_in + timedelta(days=nights),
+        "guest_name": "Guest",
+        "total_cost": 10.0 * nights,
+    }
+
+
+@pytest.fixture(params=["memory", "database"])
+def reservations(request, tmp_path):
+    if request.param == "memory":
+        store = InMemoryReservationRepository()
+        yield store
+        return
+    campsites = DatabaseCampsiteRepository(f"sqlite:///{tmp_path}/campsites.db", seed_data=CAMPSITES)
+    store = ReservationRepositoryFactory.create_reservation_repository(campsites)
+    yield store
+    campsites.close()
+
+
+def test_overlapping_stays_conflict(reservations):
+    reservations.book(stay(1, 5, 3))
+    with pytest.raises(ReservationConflict):
+        reservations.book(stay(1, 7, 2))
+    # Back-to-back stays share no night
+    reservations.book(stay(1, 8, 2))
+    reservations.book(stay(2, 6, 2))
+
+
+def test_stale_calendar_version_is_rejected(reservations):
+    version = reservations.calendar_version(3)
+    reservations.book(stay(3, 1, 1), expected_version=version)
+    with pytest.raises(StaleCalendarError):
+        reservations.book(stay(3, 10, 1), expected_version=version)
+
+
+def test_cancel_frees_the_nights(reservations):
+    booked = reservations.book(stay(4, 2, 2))
+    assert reservations.booked_nights(4, TODAY, TODAY + timedelta(days=10)) == [
+        TODAY + timedelta(days=2), TODAY + timedelta(days=3)
+    ]
+    assert reservations.cancel(booked["id"]) is True
+    assert reservations.booked_nights(4, TODAY, TODAY + timedelta(days=10)) == []
+    reservations.book(stay(4, 2, 2))
+
+
+def test_booked_campsites_with_sparse_ids():
+    reservations = InMemoryReservationRepository()
+    sparse_id = 10 ** 12
+    reservations.book(stay(sparse_id, 3, 2))
+    reservations.book(stay(7, 4, 1))
+    window = (TODAY + timedelta(days=3), TODAY + timedelta(days=5))
+    assert reservations.booked_campsites(*window) == {sparse_id, 7}
+    assert reservations.booked_campsites(TODAY + timedelta(days=3), TODAY + timedelta(days=4)) == {sparse_id}
+    # Night bitmaps are as wide as the number of booked sites, not the ids
+    assert max(bitmap.bit_length() for bitmap in reservations._nights.values()) <= 2
+
+
+def test_overlapping_booking_is_a_conflict_and_hides_the_site(client_for):
+    client = client_for("indexed")
+    check_in = TODAY + timedelta(days=7)
+    booking = {
+        "campsite_id": 2,
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=3)).isoformat(),
+        "guest_name": "Guest"
+    }
+    assert client.post("/reservations", json=booking).status_code == 201
+    overlap = dict(booking, check_in=(check_in + timedelta(days=2)).isoformat(),
+                   check_out=(check_in + timedelta(days=4)).isoformat())
+    assert client.post("/reservations", json=overlap).status_code == 409
+    available = client.get("/campsites", params={
+        "check_in": booking["check_in"], "check_out": booking["check_out"]
+    }).json()["campsites"]
+    assert 2 not in [campsite["id"] for campsite in available]
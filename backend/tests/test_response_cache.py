@@ -0,0 +1,33 @@
+"""
+Response Cache Tests
+ETags on read endpoints and their invalidation by writes
+"""
+from cache import ResponseCache, cache_key, etag_matches
+
+
+def test_unchanged_listing_answers_not_modified(client_for):
+    client = client_for("indexed")
+    first = client.get("/campsites", params={"state": "California"})
+    etag = first.headers["etag"]
+    assert client.get("/campsites", params={"state": "California"}, headers={"If-None-Match": etag}).status_code == 304
+    client.patch("/campsites/1", json={"price_per_night": 31.0})
+    assert client.get("/campsites", params={"state": "California"}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_cache_evicts_least_recently_used_and_stale_versions():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1, b"A")
+    cache.put("b", 1, b"B")
+    assert cache.get("a", 1).body == b"A"
+    cache.put("c", 1, b"C")
+    assert cache.get("b", 1) is None and len(cache) == 2
+    assert cache.get("a", 2) is None and len(cache) == 1
+
+
+def test_etags_match_weakly_and_keys_ignore_parameter_order():
+    etag = ResponseCache().put("a", 1, b"A").etag
+    assert etag_matches(f'"other", W/{etag}', etag) and etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert cache_key("/campsites", [("state", "Utah"), ("limit", "2")]) == cache_key(
+        "/campsites", [("limit", "2"), ("state", "Utah")]
+    )
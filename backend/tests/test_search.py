@@ -0,0 +1,18 @@
+"""
+Full-Text Search Tests
+Text index lookups and BM25 relevance ranking
+"""
+
+
+def test_search_matches_every_term_prefix(repository, reference):
+    assert repository.search("lak") == reference.search("lak")
+    assert repository.search("") == reference.get_all()
+
+
+def test_relevance_scores_rows_deleted_after_the_search(writable):
+    rows = writable.search("lake")
+    assert len(rows) > 1
+    writable.delete(rows[0]["id"])
+    scores = writable.relevance("lake", rows)
+    assert len(scores) == len(rows)
+    assert all(score > 0 for score in scores[1:])
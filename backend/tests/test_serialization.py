@@ -0,0 +1,28 @@
+"""
+Serialization Tests
+Row fragments render the bytes the pydantic response models would, and
+are re-rendered when their row changes
+"""
+import json
+
+from schemas import CampsiteListResponse, CampsiteResponse
+from serialization import FragmentCache, list_response_body
+
+
+def test_fragments_match_the_response_models(reference):
+    rows = reference.get_all()
+    fragments = FragmentCache().fragments(rows[:20])
+    for row, fragment in zip(rows, fragments):
+        assert fragment.decode() == CampsiteResponse(**row).model_dump_json(exclude_none=True)
+    body = json.loads(list_response_body(fragments, len(rows), 20, next_cursor="abc"))
+    assert body == CampsiteListResponse(
+        campsites=[CampsiteResponse(**row) for row in rows[:20]],
+        total_count=len(rows), filtered_count=20, next_cursor="abc"
+    ).model_dump(exclude_none=True)
+
+
+def test_changed_rows_are_rendered_again(rows):
+    cache = FragmentCache()
+    first = cache.fragment(rows[0])
+    assert cache.fragment(dict(rows[0])) is first
+    assert json.loads(cache.fragment({**rows[0], "name": "Renamed"}))["name"] == "Renamed"
@@ -0,0 +1,54 @@
+"""
+Shared Snapshot Tests
+Workers mapping one snapshot directory see each other's writes, and
+concurrent writers share publishes
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from repositories import DatabaseCampsiteRepository, SnapshotCampsiteRepository
+
+
+@pytest.fixture
+def workers(rows, tmp_path):
+    """A writing worker and a read-only worker sharing one snapshot directory"""
+    directory = str(tmp_path / "snapshots")
+    os.makedirs(directory)
+    source = DatabaseCampsiteRepository(f"sqlite:///{tmp_path}/source.db", seed_data=rows)
+    writer = SnapshotCampsiteRepository(directory, source=source, refresh_interval=0)
+    reader = SnapshotCampsiteRepository(directory, refresh_interval=0)
+    writer.warm_up()
+    reader.warm_up()
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_other_workers_see_published_writes(workers):
+    writer, reader = workers
+    created = writer.create({**writer.get_by_id(1), "id": None, "name": "Shared Site"})
+    writer.update(2, {"price_per_night": 77.0})
+    assert reader.get_by_id(created["id"])["name"] == "Shared Site"
+    assert reader.get_by_id(2)["price_per_night"] == 77.0
+    assert reader.get_all() == writer.get_all()
+
+
+def test_concurrent_writes_share_publishes(workers, monkeypatch):
+    writer, reader = workers
+    publishes = []
+    publish = writer.publish
+
+    def slow_publish():
+        publishes.append(True)
+        time.sleep(0.02)
+        return publish()
+
+    monkeypatch.setattr(writer, "publish", slow_publish)
+    template = {**writer.get_by_id(1), "id": None}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda number: writer.create(dict(template, name=f"Queued {number}")), range(24)))
+    assert len(publishes) < 24
+    assert len(reader.search("Queued")) == 24
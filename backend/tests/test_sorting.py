@@ -0,0 +1,37 @@
+"""
+Sorting Tests
+sort= orders /campsites from the stored orderings, pages with cursors and
+ranks search results by relevance
+"""
+import pytest
+
+SORT_KEYS = {
+    "price": lambda campsite: (campsite["price_per_night"], campsite["id"]),
+    "-price": lambda campsite: (-campsite["price_per_night"], campsite["id"]),
+    "name": lambda campsite: (campsite["name"], campsite["id"]),
+    "state": lambda campsite: (campsite["state"], campsite["name"], campsite["id"]),
+}
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+def test_sort_pages_through_the_ordering(client_for, repo_type, sort):
+    client = client_for(repo_type)
+    everything = client.get("/campsites").json()["campsites"]
+    seen, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/campsites", params=params).json()
+        seen.extend(body["campsites"])
+        cursor = body.get("next_cursor")
+        if not cursor:
+            break
+    assert seen == sorted(everything, key=SORT_KEYS[sort])
+
+
+def test_score_sort_ranks_search_results(client_for):
+    client = client_for("indexed")
+    matches = client.get("/campsites", params={"search": "lake"}).json()["campsites"]
+    ranked = client.get("/campsites", params={"search": "lake", "sort": "score"}).json()["campsites"]
+    assert ranked and sorted(campsite["id"] for campsite in ranked) == sorted(campsite["id"] for campsite in matches)
+    assert client.get("/campsites", params={"sort": "score", "order_by": "price"}).status_code == 400
@@ -0,0 +1,56 @@
+"""
+Geospatial Tests
+Grid index lookups against brute-force haversine, and radius, bounding-box
+and distance-ordered search on every backend
+"""
+import random
+
+import pytest
+
+from models import CampsiteFilter
+from query import PageRequest, QueryPlanner
+from spatial import BoundingBox, GridIndex, haversine_km
+
+
+@pytest.fixture
+def points():
+    rng = random.Random(11)
+    return {key: (rng.uniform(-89, 89), rng.uniform(-180, 180)) for key in range(2000)}
+
+
+@pytest.fixture
+def grid(points):
+    index = GridIndex()
+    for key, (lat, lon) in points.items():
+        index.add(key, lat, lon)
+    return index
+
+
+@pytest.mark.parametrize("origin,radius_km", [((40.0, -100.0), 1500), ((10.0, 179.5), 800), ((88.0, 0.0), 600)])
+def test_grid_lookups_match_brute_force(grid, points, origin, radius_km):
+    distances = {key: haversine_km(*origin, lat, lon) for key, (lat, lon) in points.items()}
+    assert sorted(grid.within_radius(*origin, radius_km)) == sorted(
+        (distance, key) for key, distance in distances.items() if distance <= radius_km
+    )
+    assert grid.nearest(*origin, 5)[:5] == sorted((distance, key) for key, distance in distances.items())[:5]
+    box = BoundingBox(-10.0, 170.0, 30.0, -170.0)
+    assert sorted(grid.within_box(box)) == sorted(key for key, point in points.items() if box.contains(*point))
+
+
+@pytest.mark.parametrize("criteria", [
+    CampsiteFilter(near=(40.0, -100.0), radius_km=700),
+    CampsiteFilter(bbox=BoundingBox(30.0, -120.0, 45.0, -95.0), has_water=True),
+])
+def test_spatial_filters_match_reference(repository, reference, criteria):
+    plan = QueryPlanner(reference).plan(criteria)
+    assert repository.execute(plan) == reference.execute(plan)
+
+
+def test_distance_ordering_pages_nearest_first(repository, reference):
+    origin = (40.0, -100.0)
+    plan = QueryPlanner(reference).plan(CampsiteFilter(near=origin, radius_km=1200))
+    request = PageRequest(limit=10, order_by="distance", origin=origin)
+    page = repository.execute_page(plan, request)
+    assert page.items == reference.execute_page(plan, request).items
+    distances = [haversine_km(*origin, row["latitude"], row["longitude"]) for row in page.items]
+    assert len(distances) == 10 and distances == sorted(distances)
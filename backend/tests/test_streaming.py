@@ -0,0 +1,35 @@
+"""
+Streaming Response Tests
+NDJSON listings carry the same rows as the JSON body, with counts and the
+next cursor in headers
+"""
+import json
+
+import pytest
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+@pytest.mark.parametrize("params", [{}, {"has_water": "true", "order_by": "price"}, {"fields": "id,name"}])
+def test_ndjson_listing_matches_the_json_body(client_for, repo_type, params):
+    client = client_for(repo_type)
+    body = client.get("/campsites", params=params).json()
+    response = client.get("/campsites", params=params, headers=NDJSON)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == body["campsites"]
+    assert int(response.headers["x-filtered-count"]) == body["filtered_count"]
+
+
+def test_ndjson_pages_follow_the_cursor_header(client_for):
+    client = client_for("indexed")
+    first = client.get("/campsites", params={"limit": 2, "order_by": "price"}, headers=NDJSON)
+    cursor = first.headers["x-next-cursor"]
+    second = client.get("/campsites", params={"limit": 2, "order_by": "price", "cursor": cursor}, headers=NDJSON)
+    expected = client.get("/campsites", params={"limit": 4, "order_by": "price"}).json()["campsites"]
+    assert [json.loads(line) for line in (first.text + second.text).splitlines()] == expected
+
+
+def test_ndjson_rejects_facets(client_for):
+    client = client_for("indexed")
+    assert client.get("/campsites", params={"facets": "state"}, headers=NDJSON).status_code == 400
@@ -0,0 +1,60 @@
+"""
+Write Path Tests
+Create, update and delete on every writable backend, directly and through
+the HTTP routes
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def test_create_assigns_unique_ids(writable):
+    first = writable.create({**writable.get_by_id(1), "id": None, "name": "First"})
+    second = writable.create({**writable.get_by_id(1), "id": None, "name": "Second"})
+    assert first["id"] != second["id"]
+    assert writable.get_by_id(second["id"])["name"] == "Second"
+
+
+def test_create_rejects_existing_id(writable):
+    with pytest.raises(ValueError):
+        writable.create(dict(writable.get_by_id(5)))
+
+
+def test_update_and_delete(writable):
+    version = writable.version
+    updated = writable.update(3, {"price_per_night": 99.5})
+    assert updated["price_per_night"] == 99.5 and updated["name"] == writable.get_by_id(3)["name"]
+    assert writable.version != version
+    assert writable.update(10_000, {"price_per_night": 1.0}) is None
+    assert writable.delete(3) is True
+    assert writable.get_by_id(3) is None
+    assert writable.delete(3) is False
+
+
+@pytest.mark.parametrize("repo_type", ["memory", "indexed", "database"])
+def test_writes_are_visible_to_indexed_queries(client_for, new_campsite, repo_type):
+    client = client_for(repo_type)
+    created = client.post("/campsites", json=new_campsite(name="Quiet Fjord", state="Alaska")).json()
+    assert [site["id"] for site in client.get("/campsites", params={"search": "fjord"}).json()["campsites"]] == [
+        created["id"]
+    ]
+    client.patch(f"/campsites/{created['id']}", json={"state": "Maine"})
+    assert client.get("/campsites", params={"state": "Alaska"}).json()["campsites"] == []
+    assert client.delete(f"/campsites/{created['id']}").status_code == 204
+    assert client.get(f"/campsites/{created['id']}").status_code == 404
+    assert client.get("/campsites", params={"search": "fjord"}).json()["campsites"] == []
+
+
+def test_writers_leave_the_columnar_snapshot_current(rows, build):
+    indexed = build("indexed", rows)
+    template = {**indexed.get_by_id(1), "id": None}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        created = list(pool.map(lambda number: indexed.create(dict(template, name=f"Site {number}")), range(20)))
+    indexed.update(2, {"price_per_night": 12.5})
+    indexed.delete(3)
+    indexed.bulk_create([dict(template, name="Bulk")])
+    # Readers find the snapshot the last writer built instead of rebuilding it
+    catalog = indexed._columnar
+    assert catalog.version == indexed.version and indexed.columnar() is catalog
+    assert catalog.rows == indexed.get_all()
+    assert {row["id"] for row in created} <= set(catalog.ids.tolist())